@@ -1,38 +1,16 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import os
 import sys
-import urllib.parse
+import time
+
+rerun_started = time.perf_counter()
 
 # Adicionar diretório atual ao PYTHONPATH, se necessário
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Verificação do ambiente
-try:
-    import data
-    print(f"Módulo data encontrado: {data.__file__}")
-except ImportError as e:
-    print(f"Erro ao importar o módulo data: {e}")
-    print(f"PYTHONPATH: {sys.path}")
-    print(f"Conteúdo do diretório atual: {os.listdir('.')}")
-    raise
-
-# Agora importamos os componentes
-from components.home import display_home
-from components.add_edit import display_add_edit_form
-from components.view_details import display_detail_view
-from components.client_view import display_client_view
-from components.share import display_share_interface, validate_share_token
-from components.settings import display_settings
-from components.auth import display_login, display_user_management, init_auth_state, logout
-from components.archived import display_archived_processes
-from data import load_data, save_data
-from assets.stock_photos import get_random_image
-import sheets_to_html
-
 # Page configuration
 st.set_page_config(
     page_title="Sistema de Acompanhamento de Importação",
@@ -40,6 +18,47 @@ st.set_page_config(
     layout="wide",
 )
 
+from metrics import start_metrics_server, record_rerun
+
+# Check URL parameters for client view mode
+# Links de compartilhamento usam um caminho rápido: apenas o token é validado e
+# somente o processo compartilhado é carregado, sem CSS, autenticação ou
+# carregamento completo dos dados na sessão
+if "token" in st.query_params:
+    from components.share import validate_share_token
+    
+    process_id = validate_share_token(st.query_params["token"])
+    
+    if process_id:
+        # Só um link válido carrega a visualização (e data/pandas)
+        from components.client_view import display_client_view
+        
+        # Display client view for this process
+        st.image("assets/images/jgr_logo.png", width=150)
+        st.title("JGR BROKER - Sistema de Acompanhamento de Importação")
+        
+        display_client_view(process_id)
+        
+        # Footer for client view
+        st.divider()
+        st.caption(f"© {datetime.now().year} JGR BROKER - Todos os direitos reservados")
+        
+        record_rerun("client_view", rerun_started)
+        # Exit the app here to prevent showing the admin interface
+        st.stop()
+    else:
+        st.error("Link de compartilhamento inválido ou expirado!")
+
+# Apenas a autenticação é importada aqui; os demais componentes (e pandas,
+# html_generator etc.) são importados quando a página correspondente é aberta,
+# para que a tela de login apareça o mais rápido possível.
+# Use `python startup_profile.py` para medir o tempo de inicialização.
+from components.auth import display_login, display_user_management, init_auth_state, logout, get_client_process_ids, client_has_process
+
+# Servidor de métricas Prometheus em porta lateral (METRICS_PORT); iniciado uma vez por
+# processo, fora do caminho rápido dos links de compartilhamento
+start_metrics_server()
+
 # Carregar estilos CSS personalizados
 def load_css():
     css_file = "assets/custom.css"
@@ -53,8 +72,6 @@ def load_css():
 load_css()
 
 # Initialize session state
-if 'data' not in st.session_state:
-    st.session_state.data = load_data()
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "home"
 if 'selected_process' not in st.session_state:
@@ -66,28 +83,6 @@ if 'filter_value' not in st.session_state:
 # Inicializa o estado de autenticação
 init_auth_state()
 
-# Check URL parameters for client view mode
-query_params = st.query_params
-if "token" in query_params:
-    token = query_params["token"]
-    process_id = validate_share_token(token)
-    
-    if process_id:
-        # Display client view for this process
-        st.image("assets/images/jgr_logo.png", width=150)
-        st.title("JGR BROKER - Sistema de Acompanhamento de Importação")
-        
-        display_client_view(process_id)
-        
-        # Footer for client view
-        st.divider()
-        st.caption(f"© {datetime.now().year} JGR BROKER - Todos os direitos reservados")
-        
-        # Exit the app here to prevent showing the admin interface
-        st.stop()
-    else:
-        st.error("Link de compartilhamento inválido ou expirado!")
-
 # Navigation functions
 def navigate_to(page, process_id=None):
     st.session_state.current_page = page
@@ -98,8 +93,20 @@ def navigate_to(page, process_id=None):
 # Verificar autenticação para acessar o sistema
 if not st.session_state.authenticated:
     display_login()
+    record_rerun("login", rerun_started)
     st.stop()
 
+# Os dados só são carregados após o login, e recarregados quando data.json muda (gravações
+# de outras sessões e réplicas, agendador, scripts externos): a verificação é um os.stat
+# por rerun, e só os processos alterados no arquivo são recarregados (ver data_watcher.py)
+from data import sync_session_data
+sync_session_data()
+
+# Virada diária dos períodos de armazenagem em segundo plano (uma thread por servidor),
+# iniciada só após o login: links de compartilhamento não disparam a manutenção
+import scheduler
+scheduler.start_scheduler()
+
 # Header with logo and navigation
 col1, col2, col3 = st.columns([1, 3, 1])
 
@@ -124,7 +131,7 @@ with col3:
 
 # Navigation bar - Mostra todos os botões para administradores
 if st.session_state.user_role == "admin":
-    nav_col1, nav_col2, nav_col3, nav_col4, nav_col5, nav_col6, nav_col7 = st.columns(7)
+    nav_col1, nav_col2, nav_col3, nav_col4, nav_col5, nav_col6, nav_col7, nav_col8 = st.columns(8)
     with nav_col1:
         if st.button("📋 Painel", use_container_width=True):
             navigate_to("home")
@@ -147,6 +154,9 @@ if st.session_state.user_role == "admin":
     with nav_col7:
         if st.button("👥 Usuários", use_container_width=True):
             navigate_to("users")
+    with nav_col8:
+        if st.button("⏱️ Desempenho", use_container_width=True):
+            navigate_to("performance")
 else:
     # Para clientes, apenas mostrar o botão de painel
     if st.button("📋 Painel", use_container_width=True):
@@ -156,28 +166,32 @@ st.divider()
 
 # Display the current page
 if st.session_state.current_page == "home":
+    from components.home import display_home
     # Cliente só vê seus processos
     if st.session_state.user_role == 'client':
-        display_home(navigate_to, filter_ids=st.session_state.client_processes)
+        display_home(navigate_to, filter_ids=get_client_process_ids(st.session_state.user_id))
     else:
         display_home(navigate_to)
 elif st.session_state.current_page == "add_edit":
     # Somente admin pode adicionar/editar
     if st.session_state.user_role == 'admin':
+        from components.add_edit import display_add_edit_form
         display_add_edit_form(navigate_to)
     else:
         st.error("Você não tem permissão para acessar esta página.")
         navigate_to("home")
 elif st.session_state.current_page == "view_details":
     # Cliente só pode ver seus processos
-    if st.session_state.user_role == 'client' and st.session_state.selected_process not in st.session_state.client_processes:
+    if st.session_state.user_role == 'client' and not client_has_process(st.session_state.user_id, st.session_state.selected_process):
         st.error("Você não tem permissão para visualizar este processo.")
         navigate_to("home")
     else:
+        from components.view_details import display_detail_view
         display_detail_view(navigate_to)
 elif st.session_state.current_page == "share":
     # Somente admin pode compartilhar
     if st.session_state.user_role == 'admin':
+        from components.share import display_share_interface
         display_share_interface()
     else:
         st.error("Você não tem permissão para acessar esta página.")
@@ -185,6 +199,7 @@ elif st.session_state.current_page == "share":
 elif st.session_state.current_page == "reports":
     # Somente admin pode acessar relatórios
     if st.session_state.user_role == 'admin':
+        import sheets_to_html
         st.header("Importação de Planilha")
         
         tab1, tab2 = st.tabs(["Converter Planilha", "Baixar Modelo"])
@@ -200,6 +215,7 @@ elif st.session_state.current_page == "reports":
 elif st.session_state.current_page == "settings":
     # Somente admin pode acessar configurações
     if st.session_state.user_role == 'admin':
+        from components.settings import display_settings
         display_settings()
     else:
         st.error("Você não tem permissão para acessar esta página.")
@@ -211,9 +227,18 @@ elif st.session_state.current_page == "users":
     else:
         st.error("Você não tem permissão para acessar esta página.")
         navigate_to("home")
+elif st.session_state.current_page == "performance":
+    # Somente admin pode ver o painel de desempenho
+    if st.session_state.user_role == 'admin':
+        from components.performance import display_performance
+        display_performance()
+    else:
+        st.error("Você não tem permissão para acessar esta página.")
+        navigate_to("home")
 elif st.session_state.current_page == "archived":
     # Somente admin pode ver processos arquivados
     if st.session_state.user_role == 'admin':
+        from components.archived import display_archived_processes
         display_archived_processes(navigate_to)
     else:
         st.error("Você não tem permissão para acessar esta página.")
@@ -223,3 +248,5 @@ elif st.session_state.current_page == "archived":
 st.divider()
 current_year = datetime.now().year
 st.caption(f"© {current_year} JGR BROKER - Todos os direitos reservados")
+
+record_rerun(st.session_state.current_page, rerun_started)
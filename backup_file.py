@@ -0,0 +1,345 @@
+"""
+Arquivo de backup para download e restauração (página Configurações)
+
+Formato: JSON Lines comprimido com gzip (backup_importacao_*.json.gz). A
+primeira linha é um cabeçalho com os campos de data.json que não são
+processos (config, company_info, ...) e a quantidade de processos; cada linha
+seguinte é um processo, inclusive os da partição fria (com "archived": true).
+
+- Exportação (export_backup): lê data.json e a partição fria sob a trava de
+  data.json e comprime processo a processo em um arquivo temporário; a página
+  Configurações só gera o arquivo quando o botão é clicado e entrega os bytes
+  ao st.download_button.
+- Restauração (restore_backup): descomprime e decodifica linha a linha, valida
+  cada processo (validate_process) e grava data.json e a partição fria em
+  arquivos temporários à medida que lê. Só se o arquivo inteiro for válido os
+  temporários substituem os arquivos de dados (partição fria primeiro, depois
+  data.json), sob a trava de data.json e após um backup do estado atual
+  (backups.PRE_RESTORE_LABEL). Com qualquer erro, nada é alterado.
+
+Backups antigos (um único documento JSON, como os data_backup_*.json, com ou
+sem gzip) continuam aceitos; esses são decodificados de uma vez.
+
+Uso:
+    python backup_file.py exportar backup_importacao.json.gz
+    python backup_file.py restaurar backup_importacao.json.gz
+"""
+
+import gzip
+import io
+import os
+import re
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+
+import backups
+import json_codec
+from data import ARCHIVE_FILE, DATA_FILE, PROCESS_SCHEMA
+from file_lock import file_lock
+from migrations import current_schema_version, get_schema_version, migrate
+
+BACKUP_FORMAT = "jgr-backup"
+BACKUP_FORMAT_VERSION = 1
+
+# Acima disso o arquivo de exportação vai da memória para o disco
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+# Compressão do download: nível 3 leva metade do tempo do 6 com arquivo ~15% maior
+EXPORT_COMPRESS_LEVEL = 3
+
+# Processos por bloco ao comprimir/migrar (menos chamadas pequenas ao gzip)
+CHUNK_SIZE = 1000
+
+# Erros de validação guardados para exibição (os demais só são contados)
+MAX_REPORTED_ERRORS = 50
+
+# Campos de data.json que são recalculados na restauração
+_DERIVED_KEYS = ("processes", "archived_ids", "_revision")
+
+_DATE_PATTERN = re.compile(r"\d{2}/\d{2}/\d{2}(\d{2})?")
+
+
+class InvalidBackupError(ValueError):
+    """Arquivo de backup rejeitado; `errors` traz até MAX_REPORTED_ERRORS mensagens e `total` a contagem"""
+
+    def __init__(self, errors, total=None):
+        self.errors = list(errors)
+        self.total = total if total is not None else len(self.errors)
+        super().__init__(f"Backup inválido: {self.total} erro(s)")
+
+
+def validate_process(process):
+    """Confere um processo (dicionário lido do backup) com o esquema; retorna a lista de erros
+
+    Verifica o ID, o tipo dos campos de PROCESS_SCHEMA (datas DD/MM/AA ou DD/MM/AAAA),
+    "archived", "_rev" e a lista de eventos. Campos fora do esquema são aceitos como estão.
+    """
+    if not isinstance(process, dict):
+        return ["não é um objeto JSON"]
+    errors = []
+    process_id = process.get("id")
+    if not isinstance(process_id, str) or not process_id.strip():
+        errors.append("sem 'id'")
+    for field, kind in PROCESS_SCHEMA.items():
+        value = process.get(field)
+        if value is None or value == "" or field == "id":
+            continue
+        if kind == "date":
+            if not isinstance(value, str) or not _valid_date(value):
+                errors.append(f"'{field}' não é uma data DD/MM/AAAA: {value!r}")
+        elif kind == "int":
+            if isinstance(value, bool) or not (isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit())):
+                errors.append(f"'{field}' não é um número inteiro: {value!r}")
+        elif isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            errors.append(f"'{field}' não é texto: {value!r}")
+    if not isinstance(process.get("archived", False), bool):
+        errors.append("'archived' não é verdadeiro/falso")
+    rev = process.get("_rev", 0)
+    if isinstance(rev, bool) or not isinstance(rev, int):
+        errors.append("'_rev' não é um número inteiro")
+    events = process.get("events", [])
+    if not isinstance(events, list):
+        errors.append("'events' não é uma lista")
+    else:
+        for position, event in enumerate(events, 1):
+            if not isinstance(event, dict) or not isinstance(event.get("description", ""), str):
+                errors.append(f"evento {position} inválido")
+    return errors
+
+
+@lru_cache(maxsize=4096)
+def _valid_date(value):
+    # Poucas datas distintas se repetem em milhares de processos
+    if not _DATE_PATTERN.fullmatch(value):
+        return False
+    try:
+        datetime.strptime(value, "%d/%m/%Y" if len(value) == 10 else "%d/%m/%y")
+    except ValueError:
+        return False
+    return True
+
+
+def _without_rev(process):
+    return {key: value for key, value in process.items() if key != "_rev"}
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def export_backup():
+    """Gera o backup de data.json e da partição fria; retorna um arquivo (gzip) posicionado no início"""
+    with file_lock(DATA_FILE):
+        data = json_codec.load_file(DATA_FILE) if os.path.exists(DATA_FILE) else {"processes": []}
+        archive = json_codec.load_file(ARCHIVE_FILE) if os.path.exists(ARCHIVE_FILE) else {"processes": []}
+    # Backup sempre na versão atual do esquema
+    migrate(data)
+    migrate(archive)
+    processes = data.get("processes", [])
+    archived = archive.get("processes", [])
+    header = {
+        "format": BACKUP_FORMAT,
+        "version": BACKUP_FORMAT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "data": {key: value for key, value in data.items() if key not in _DERIVED_KEYS},
+        "processes": len(processes) + len(archived),
+    }
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    dumps = json_codec.dumps
+    with gzip.GzipFile(fileobj=output, mode="wb", compresslevel=EXPORT_COMPRESS_LEVEL, mtime=0) as gz:
+        gz.write(dumps(header) + b"\n")
+        for items in (processes, archived):
+            for chunk in _chunks(items):
+                gz.write(b"".join(dumps(process) + b"\n" for process in chunk))
+    output.seek(0)
+    return output
+
+
+def _open_backup(fileobj):
+    """Retorna (cabeçalho, iterador de (posição, processo, erro de leitura)) de um backup enviado
+
+    Backups no formato JSON Lines são lidos linha a linha; documentos JSON inteiros
+    (formato antigo) são decodificados de uma vez e recebem um cabeçalho equivalente.
+    """
+    if fileobj.read(2) == b"\x1f\x8b":
+        fileobj.seek(0)
+        stream = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    else:
+        fileobj.seek(0)
+        stream = io.BufferedReader(fileobj) if not isinstance(fileobj, io.BufferedIOBase) else fileobj
+
+    first_line = stream.readline()
+    try:
+        header = json_codec.loads(first_line)
+    except ValueError:
+        header = None
+    if isinstance(header, dict) and header.get("format") == BACKUP_FORMAT:
+        if header.get("version", 0) > BACKUP_FORMAT_VERSION:
+            raise InvalidBackupError([f"Formato de backup {header['version']} mais novo que o suportado ({BACKUP_FORMAT_VERSION})"])
+
+        def lines():
+            for number, line in enumerate(stream, 2):
+                if line.strip():
+                    try:
+                        yield f"linha {number}", json_codec.loads(line), None
+                    except ValueError as e:
+                        yield f"linha {number}", None, f"JSON inválido ({e})"
+        return header, lines()
+
+    # Formato antigo: um único documento com "processes"
+    document = json_codec.loads(first_line + stream.read())
+    if not isinstance(document, dict) or not isinstance(document.get("processes"), list):
+        raise InvalidBackupError(["O arquivo não tem a lista de processos ('processes')"])
+    processes = document.pop("processes")
+    header = {
+        "format": BACKUP_FORMAT,
+        "version": 0,
+        "data": {key: value for key, value in document.items() if key not in _DERIVED_KEYS},
+        "processes": len(processes),
+    }
+    return header, ((f"processo {number}", process, None) for number, process in enumerate(processes, 1))
+
+
+def restore_backup(fileobj):
+    """Restaura data.json e a partição fria a partir de um backup enviado (arquivo binário)
+
+    Processos iguais aos do data.json atual são mantidos como estão (mesma revisão,
+    mesmos bytes: não aparecem como alterados no histórico de backups nem são
+    recarregados pelas sessões). Os diferentes recebem uma revisão (_rev) acima da
+    atual, e o arquivo um "_revision" novo, para que as sessões abertas recarreguem e nenhuma
+    gravação baseada na versão anterior passe por cima da restauração.
+
+    Returns:
+        dict: {"processes": processos ativos restaurados, "archived": arquivados}
+
+    Raises:
+        InvalidBackupError: arquivo ilegível, truncado ou com processos inválidos;
+        nesse caso os arquivos de dados não são alterados
+    """
+    errors = []
+    total_errors = 0
+
+    def report(location, message):
+        nonlocal total_errors
+        total_errors += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(f"{location}: {message}")
+
+    with file_lock(DATA_FILE):
+        current = json_codec.load_file(DATA_FILE) if os.path.exists(DATA_FILE) else {"processes": []}
+        current_by_id = {process["id"]: process for process in current.get("processes", [])}
+        current_revision = current.get("_revision", 0)
+        del current
+
+        try:
+            header, entries = _open_backup(fileobj)
+        except (OSError, EOFError, ValueError) as e:
+            if isinstance(e, InvalidBackupError):
+                raise
+            raise InvalidBackupError([f"Arquivo ilegível: {e}"]) from e
+
+        meta = dict(header.get("data") or {})
+        schema_version = get_schema_version(meta)
+        meta["schema_version"] = current_schema_version()
+        meta["_revision"] = max(current_revision, meta.get("_revision", 0)) + 1
+        dumps = json_codec.dumps
+        seen = set()
+        archived_ids = []
+        counts = {"processes": 0, "archived": 0}
+
+        with json_codec.atomic_file(DATA_FILE) as hot, json_codec.atomic_file(ARCHIVE_FILE) as cold_file:
+            # Mesmo formato de json_codec.dump_file / data._write_archive_file, gravado aos poucos
+            hot.write(dumps(meta)[:-1] + b',"processes":[')
+            cold = gzip.GzipFile(fileobj=cold_file, mode="wb", compresslevel=6, mtime=0)
+            cold.write(dumps({"schema_version": meta["schema_version"]})[:-1] + b',"processes":[')
+
+            batch = []
+
+            def flush():
+                # Migrações pendentes do backup, aplicadas por bloco de processos
+                migrate({"schema_version": schema_version, "processes": batch})
+                for process in batch:
+                    if process.get("archived"):
+                        target, key = cold, "archived"
+                        archived_ids.append(process["id"])
+                    else:
+                        target, key = hot, "processes"
+                        existing = current_by_id.get(process["id"])
+                        if existing is not None:
+                            if _without_rev(process) == _without_rev(existing):
+                                process = existing
+                            else:
+                                process["_rev"] = max(existing.get("_rev", 0), process.get("_rev", 0)) + 1
+                    target.write((b"," if counts[key] else b"") + dumps(process))
+                    counts[key] += 1
+                batch.clear()
+
+            try:
+                for location, process, error in entries:
+                    if error:
+                        report(location, error)
+                        continue
+                    problems = validate_process(process)
+                    if not problems and process["id"] in seen:
+                        problems = ["ID repetido"]
+                    if problems:
+                        process_id = process.get("id") if isinstance(process, dict) else None
+                        report(f"{location} ({process_id})" if process_id else location, "; ".join(problems))
+                        continue
+                    seen.add(process["id"])
+                    if not total_errors:
+                        batch.append(process)
+                        if len(batch) >= CHUNK_SIZE:
+                            flush()
+            except (OSError, EOFError) as e:
+                report("arquivo", f"ilegível ou incompleto ({e})")
+
+            expected = header.get("processes")
+            read = len(seen) + total_errors
+            if not total_errors and expected is not None and read != expected:
+                report("arquivo", f"incompleto: {read} de {expected} processo(s)")
+            if not seen and not total_errors:
+                report("arquivo", "nenhum processo encontrado")
+            if total_errors:
+                cold.close()
+                # Descarta os temporários: os arquivos de dados ficam como estavam
+                raise InvalidBackupError(errors, total_errors)
+
+            flush()
+            hot.write(b'],"archived_ids":' + dumps(archived_ids) + b"}")
+            cold.write(b"]}")
+            cold.close()
+            # O estado atual vira um backup antes de ser substituído
+            backups.create_backup(label=backups.PRE_RESTORE_LABEL)
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+    import shutil
+
+    parser = argparse.ArgumentParser(description="Exporta ou restaura o arquivo de backup da página Configurações")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    exportar = comandos.add_parser("exportar", help="grava o backup dos dados atuais")
+    exportar.add_argument("destino")
+    restaurar = comandos.add_parser("restaurar", help="valida e restaura um arquivo de backup")
+    restaurar.add_argument("origem")
+    args = parser.parse_args()
+
+    if args.comando == "exportar":
+        with export_backup() as origem, open(args.destino, "wb") as destino:
+            shutil.copyfileobj(origem, destino)
+        print(f"{args.destino}: {os.path.getsize(args.destino)} bytes")
+    else:
+        try:
+            with open(args.origem, "rb") as origem:
+                restaurados = restore_backup(origem)
+        except InvalidBackupError as e:
+            print(f"{e}; nada foi alterado")
+            for erro in e.errors:
+                print(f"- {erro}")
+        else:
+            print(f"Restaurados {restaurados['processes']} processo(s) e {restaurados['archived']} arquivado(s)")
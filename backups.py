@@ -0,0 +1,581 @@
+"""
+Backups incrementais e deduplicados dos dados
+
+Substitui as cópias completas de data.json (data_backup_*.json,
+data_pre_restauracao_*.json). Estrutura do diretório BACKUP_DIR (padrão
+"backups/"):
+
+- objects/ab/abcdef....json.gz: um processo (JSON compacto, gzip), endereçado
+  pelo hash do conteúdo (o mesmo de data_watcher.process_fingerprints).
+  Processos que não mudam entre backups são gravados uma única vez.
+- snapshots/<id>.json.gz: manifesto de um backup, com os campos que não são
+  processos (config, archived_ids, ...) e, por arquivo de dados, o hash de cada
+  processo. Um manifesto "full" lista todos os processos; um "delta" lista só
+  os processos novos/alterados e os excluídos em relação ao "full" em que se
+  baseia. Um novo "full" é criado quando o delta passa de FULL_SNAPSHOT_RATIO
+  dos processos.
+
+Entram no backup data.json e a partição fria (data_archived.json.gz).
+
+Restaurar um backup lê no máximo dois manifestos e só os objetos dos processos
+que diferem dos arquivos atuais; os demais são mantidos como estão. Antes de
+restaurar, o estado atual vira um backup (rótulo PRE_RESTORE_LABEL).
+
+Histórico: diff_snapshots compara dois backups (ou um backup e o estado
+atual) pelos hashes dos manifestos, indexados por ID, sem ler objetos;
+diff_process mostra os campos alterados de um processo, e restore_process
+restaura só esse processo a partir de um backup.
+
+Retenção (prune): mantém o backup mais recente de cada uma das últimas 24
+horas, 7 dias e 4 semanas (RETENTION), além do mais recente de todos; objetos
+que nenhum manifesto mantido usa são apagados. O agendador (scheduler.py)
+cria um backup por hora e aplica a retenção.
+
+Uso:
+    python backups.py criar [--rotulo TEXTO]
+    python backups.py listar
+    python backups.py restaurar [ID]      # padrão: o mais recente
+    python backups.py comparar ID [ID2]   # processos alterados (padrão: até o estado atual)
+    python backups.py restaurar-processo ID PROCESSO
+    python backups.py podar
+    python backups.py importar data_backup_*.json   # cópias completas antigas
+"""
+
+import os
+import re
+from datetime import datetime
+
+import json_codec
+from data_watcher import process_fingerprints
+from file_lock import file_lock
+
+BACKUP_DIR = os.environ.get("BACKUP_DIR", "backups")
+
+# Arquivos de dados incluídos no backup (ver data.DATA_FILE e data.ARCHIVE_FILE). Os
+# manifestos usam só o nome; o arquivo fica no diretório de dados (DATA_DIR, como em data.py)
+DATA_DIR = os.environ.get("DATA_DIR", ".")
+BACKED_UP_FILES = ("data.json", "data_archived.json.gz")
+
+# Quantos backups manter por camada: o mais recente de cada hora/dia/semana
+RETENTION = {"hourly": 24, "daily": 7, "weekly": 4}
+
+# Fração de processos alterados a partir da qual o backup é completo, e não delta
+FULL_SNAPSHOT_RATIO = 0.2
+
+PRE_RESTORE_LABEL = "pre-restauracao"
+
+# Versão do hash dos processos nos manifestos ("hash_format"). Manifestos sem o campo
+# usam o hash antigo (JSON na ordem do arquivo, dependente do orjson); process_hashes
+# os converte para comparar com os atuais.
+HASH_FORMAT = 2
+
+_BUCKETS = {
+    "hourly": lambda created: created.strftime("%Y%m%d%H"),
+    "daily": lambda created: created.strftime("%Y%m%d"),
+    "weekly": lambda created: "%d-%02d" % created.isocalendar()[:2],
+}
+
+
+def data_path(name):
+    """Caminho de um arquivo de dados de BACKED_UP_FILES no diretório de dados"""
+    return os.path.join(DATA_DIR, name)
+
+
+def _lock(backup_dir):
+    """Trava do diretório de backups (réplicas e scripts criando/podando ao mesmo tempo)"""
+    os.makedirs(backup_dir, exist_ok=True)
+    return file_lock(os.path.join(backup_dir, "backups"))
+
+
+def _snapshots_dir(backup_dir):
+    return os.path.join(backup_dir, "snapshots")
+
+
+def _object_path(backup_dir, digest):
+    return os.path.join(backup_dir, "objects", digest[:2], digest + ".json.gz")
+
+
+def _manifest_path(backup_dir, snapshot_id):
+    return os.path.join(_snapshots_dir(backup_dir), snapshot_id + ".json.gz")
+
+
+def snapshot_ids(backup_dir=BACKUP_DIR):
+    """IDs dos backups (data e hora de criação), do mais antigo para o mais recente"""
+    directory = _snapshots_dir(backup_dir)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(".json.gz")] for name in os.listdir(directory) if name.endswith(".json.gz"))
+
+
+def _created(snapshot_id):
+    return datetime.strptime(snapshot_id[:15], "%Y%m%d_%H%M%S")
+
+
+def list_snapshots(backup_dir=BACKUP_DIR):
+    """Manifestos dos backups, do mais antigo para o mais recente"""
+    return [load_snapshot(snapshot_id, backup_dir) for snapshot_id in snapshot_ids(backup_dir)]
+
+
+def load_snapshot(snapshot_id, backup_dir=BACKUP_DIR):
+    return json_codec.load_file(_manifest_path(backup_dir, snapshot_id))
+
+
+def resolve_snapshot(manifest, backup_dir=BACKUP_DIR):
+    """Conteúdo de um backup: {arquivo: (campos, [(id, hash), ...])}
+
+    Para um delta, aplica as alterações sobre o manifesto "full" de base.
+    """
+    if manifest["kind"] == "full":
+        return {
+            name: (entry["meta"], list(entry["processes"].items()))
+            for name, entry in manifest["files"].items()
+        }
+    base = resolve_snapshot(load_snapshot(manifest["base"], backup_dir), backup_dir)
+    resolved = {}
+    for name, entry in manifest["files"].items():
+        changed = entry["processes"]
+        deleted = set(entry["deleted"])
+        base_processes = base.get(name, ({}, []))[1]
+        base_ids = {process_id for process_id, _ in base_processes}
+        processes = [
+            (process_id, changed.get(process_id, digest))
+            for process_id, digest in base_processes if process_id not in deleted
+        ]
+        processes += [(process_id, digest) for process_id, digest in changed.items() if process_id not in base_ids]
+        resolved[name] = (entry["meta"], processes)
+    return resolved
+
+
+def _read_documents(files):
+    documents = {}
+    for name in files:
+        if os.path.exists(data_path(name)):
+            documents[name] = json_codec.load_file(data_path(name))
+    return documents
+
+
+def _hashes(document):
+    processes = document.get("processes", [])
+    return {process_id: digest.hex() for process_id, digest in process_fingerprints(processes).items()}
+
+
+def _store_objects(backup_dir, document, hashes, known=frozenset()):
+    """Grava os processos que ainda não estão no diretório de objetos; retorna quantos
+
+    `known` são hashes já referenciados pelo backup anterior (existem com certeza).
+    """
+    written = 0
+    for process in document.get("processes", []):
+        digest = hashes[process["id"]]
+        if digest in known:
+            continue
+        path = _object_path(backup_dir, digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            json_codec.dump_file(path, process)
+            written += 1
+    return written
+
+
+def _new_snapshot_id(backup_dir, created):
+    snapshot_id = created.strftime("%Y%m%d_%H%M%S")
+    suffix = 1
+    while os.path.exists(_manifest_path(backup_dir, snapshot_id)):
+        snapshot_id = f"{created.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        suffix += 1
+    return snapshot_id
+
+
+def create_backup(label="", backup_dir=BACKUP_DIR, files=BACKED_UP_FILES, documents=None, created=None):
+    """Cria um backup dos arquivos de dados atuais (ou de `documents`, {arquivo: dados})
+
+    Se o conteúdo é igual ao do backup mais recente, nenhum backup novo é criado.
+
+    Returns:
+        str | None: ID do backup criado (ou do mais recente, se não houve mudança);
+        None se não há dados para copiar.
+    """
+    with _lock(backup_dir):
+        if documents is None:
+            documents = _read_documents(files)
+        if not documents:
+            return None
+        created = created or datetime.now()
+
+        metas = {}
+        hashes = {}
+        for name, document in documents.items():
+            metas[name] = {key: value for key, value in document.items() if key != "processes"}
+            hashes[name] = _hashes(document)
+
+        ids = snapshot_ids(backup_dir)
+        latest = load_snapshot(ids[-1], backup_dir) if ids else None
+        if latest is not None and latest.get("hash_format") != HASH_FORMAT:
+            # Hashes antigos não se comparam com os atuais: novo backup completo
+            latest = None
+        known = set()
+        if latest is not None:
+            latest_content = {
+                name: (meta, dict(processes))
+                for name, (meta, processes) in resolve_snapshot(latest, backup_dir).items()
+            }
+            if latest_content == {name: (metas[name], hashes[name]) for name in documents}:
+                return latest["id"]
+            for _, processes in latest_content.values():
+                known.update(processes.values())
+
+        for name, document in documents.items():
+            _store_objects(backup_dir, document, hashes[name], known)
+
+        manifest = {"id": _new_snapshot_id(backup_dir, created), "created": created.isoformat(timespec="seconds"),
+                    "label": label, "kind": "full", "base": None, "files": {}, "hash_format": HASH_FORMAT}
+        base = None
+        if latest is not None:
+            base = latest if latest["kind"] == "full" else load_snapshot(latest["base"], backup_dir)
+        if base is not None:
+            delta = _delta(base, metas, hashes)
+            changes = sum(len(entry["processes"]) + len(entry["deleted"]) for entry in delta.values())
+            total = sum(len(entry) for entry in hashes.values())
+            if changes <= FULL_SNAPSHOT_RATIO * max(total, 1):
+                manifest.update(kind="delta", base=base["id"], files=delta)
+        if manifest["kind"] == "full":
+            manifest["files"] = {
+                name: {"meta": metas[name], "processes": hashes[name]} for name in documents
+            }
+
+        os.makedirs(_snapshots_dir(backup_dir), exist_ok=True)
+        json_codec.dump_file(_manifest_path(backup_dir, manifest["id"]), manifest)
+        return manifest["id"]
+
+
+def _delta(base, metas, hashes):
+    delta = {}
+    for name, current in hashes.items():
+        base_processes = base["files"].get(name, {}).get("processes", {})
+        delta[name] = {
+            "meta": metas[name],
+            "processes": {pid: digest for pid, digest in current.items() if base_processes.get(pid) != digest},
+            "deleted": [pid for pid in base_processes if pid not in current],
+        }
+    return delta
+
+
+def restore_snapshot(snapshot_id, backup_dir=BACKUP_DIR):
+    """Restaura os arquivos de dados para o estado de um backup
+
+    Só os processos que diferem dos arquivos atuais são lidos do backup. Os
+    processos restaurados recebem uma revisão (_rev) acima da atual, e o arquivo
+    um "_revision" novo, para que as sessões abertas recarreguem e nenhuma
+    gravação baseada na versão anterior passe por cima da restauração. Um arquivo de
+    dados que não existia no backup (ex.: a partição fria, criada depois) fica sem
+    processos.
+
+    Returns:
+        dict: {arquivo: número de processos lidos do backup}
+    """
+    manifest = load_snapshot(snapshot_id, backup_dir)
+    resolved = resolve_snapshot(manifest, backup_dir)
+    restored = {}
+    with file_lock(data_path(BACKED_UP_FILES[0])):
+        create_backup(label=PRE_RESTORE_LABEL, backup_dir=backup_dir)
+        for name, (meta, processes) in resolved.items():
+            path = data_path(name)
+            current = json_codec.load_file(path) if os.path.exists(path) else {"processes": []}
+            current_by_id = {process["id"]: process for process in current.get("processes", [])}
+            current_hashes = _hashes(current)
+            document = dict(meta)
+            document["processes"] = []
+            read = 0
+            for process_id, digest in processes:
+                process = current_by_id.get(process_id)
+                if process is None or current_hashes[process_id] != digest:
+                    restored_process = json_codec.load_file(_object_path(backup_dir, digest))
+                    if process is not None:
+                        restored_process["_rev"] = max(process.get("_rev", 0), restored_process.get("_rev", 0)) + 1
+                    process = restored_process
+                    read += 1
+                document["processes"].append(process)
+            document["_revision"] = max(current.get("_revision", 0), meta.get("_revision", 0)) + 1
+            json_codec.dump_file(path, document)
+            restored[name] = read
+        for name in BACKED_UP_FILES:
+            # Arquivo que não existia no backup (partição fria ainda vazia): volta a ficar vazio
+            path = data_path(name)
+            if name in resolved or not os.path.exists(path):
+                continue
+            current = json_codec.load_file(path)
+            if current.get("processes"):
+                document = {key: value for key, value in current.items() if key != "processes"}
+                document["processes"] = []
+                document["_revision"] = current.get("_revision", 0) + 1
+                json_codec.dump_file(path, document)
+            restored[name] = 0
+    return restored
+
+
+def process_hashes(snapshot_id=None, backup_dir=BACKUP_DIR):
+    """{ID do processo: (arquivo, hash)} de um backup, ou dos arquivos atuais com snapshot_id=None"""
+    if snapshot_id is None:
+        return {
+            process_id: (name, digest)
+            for name, document in _read_documents(BACKED_UP_FILES).items()
+            for process_id, digest in _hashes(document).items()
+        }
+    resolved = resolve_snapshot(load_snapshot(snapshot_id, backup_dir), backup_dir)
+    return {
+        process_id: (name, digest)
+        for name, (_, processes) in resolved.items()
+        for process_id, digest in processes
+    }
+
+
+def _comparable_hashes(snapshot_id, backup_dir):
+    """process_hashes no formato atual (HASH_FORMAT), para comparar backups entre si
+
+    Manifestos com hashes antigos têm os hashes recalculados a partir dos objetos
+    (que continuam endereçados pelo hash antigo).
+    """
+    hashes = process_hashes(snapshot_id, backup_dir)
+    if snapshot_id is None or load_snapshot(snapshot_id, backup_dir).get("hash_format") == HASH_FORMAT:
+        return hashes
+    converted = {}
+    for process_id, (name, digest) in hashes.items():
+        if digest not in converted:
+            process = json_codec.load_file(_object_path(backup_dir, digest))
+            converted[digest] = _hashes({"processes": [process]})[process_id]
+        hashes[process_id] = (name, converted[digest])
+    return hashes
+
+
+def diff_snapshots(old_id, new_id=None, backup_dir=BACKUP_DIR):
+    """Processos que mudaram de um backup para outro (new_id=None: estado atual)
+
+    Compara só os hashes dos manifestos, indexados por ID (uma passada por lado);
+    nenhum processo é lido do diretório de objetos, exceto para backups com hashes
+    antigos (ver HASH_FORMAT).
+
+    Returns:
+        dict: {ID do processo: mudança}, com mudança "incluido", "excluido",
+        "alterado", "arquivado" ou "reativado" (processo que trocou de partição)
+    """
+    old = _comparable_hashes(old_id, backup_dir)
+    new = _comparable_hashes(new_id, backup_dir)
+    archive_file = BACKED_UP_FILES[1]
+    changes = {}
+    for process_id, (name, digest) in new.items():
+        previous = old.get(process_id)
+        if previous is None:
+            changes[process_id] = "incluido"
+        elif previous[0] != name:
+            changes[process_id] = "arquivado" if name == archive_file else "reativado"
+        elif previous[1] != digest:
+            changes[process_id] = "alterado"
+    for process_id in old.keys() - new.keys():
+        changes[process_id] = "excluido"
+    return changes
+
+
+def load_process(snapshot_id, process_id, backup_dir=BACKUP_DIR):
+    """Um processo como estava em um backup (snapshot_id=None: arquivos atuais), ou None"""
+    if snapshot_id is None:
+        for document in _read_documents(BACKED_UP_FILES).values():
+            for process in document.get("processes", []):
+                if process["id"] == process_id:
+                    return process
+        return None
+    entry = process_hashes(snapshot_id, backup_dir).get(process_id)
+    if entry is None:
+        return None
+    return json_codec.load_file(_object_path(backup_dir, entry[1]))
+
+
+def diff_process(old, new):
+    """Campos diferentes entre duas versões de um processo: {campo: (antes, depois)}
+
+    A revisão (_rev) não conta como alteração; processo ausente é tratado como vazio.
+    """
+    old = old or {}
+    new = new or {}
+    return {
+        key: (old.get(key), new.get(key))
+        for key in dict.fromkeys([*old, *new])
+        if key != "_rev" and old.get(key) != new.get(key)
+    }
+
+
+def restore_process(snapshot_id, process_id, backup_dir=BACKUP_DIR):
+    """Restaura um único processo como estava em um backup, sem tocar nos demais
+
+    O processo volta para a partição em que estava no backup (ativo ou arquivado),
+    saindo da outra se tiver mudado de partição desde então, com uma revisão (_rev)
+    acima da atual para que as sessões abertas recarreguem só ele. Antes, o estado
+    atual vira um backup (rótulo PRE_RESTORE_LABEL).
+
+    Returns:
+        str: arquivo de dados em que o processo foi gravado
+
+    Raises:
+        KeyError: o processo não existe no backup
+    """
+    entry = process_hashes(snapshot_id, backup_dir).get(process_id)
+    if entry is None:
+        raise KeyError(f"Processo {process_id} não encontrado no backup {snapshot_id}")
+    target, digest = entry
+    restored_process = json_codec.load_file(_object_path(backup_dir, digest))
+    data_file = BACKED_UP_FILES[0]
+    with file_lock(data_path(data_file)):
+        create_backup(label=PRE_RESTORE_LABEL, backup_dir=backup_dir)
+        documents = _read_documents(BACKED_UP_FILES)
+        documents.setdefault(target, {"processes": []})
+        current_rev = 0
+        position = None
+        changed = set()
+        for name, document in documents.items():
+            processes = document.get("processes", [])
+            for i, process in enumerate(processes):
+                if process["id"] != process_id:
+                    continue
+                current_rev = max(current_rev, process.get("_rev", 0))
+                if name == target:
+                    position = i
+                else:
+                    del processes[i]
+                    changed.add(name)
+                break
+        restored_process["_rev"] = max(current_rev, restored_process.get("_rev", 0)) + 1
+        processes = documents[target].setdefault("processes", [])
+        if position is None:
+            processes.append(restored_process)
+        else:
+            processes[position] = restored_process
+        changed.add(target)
+        
+        # data.json guarda os IDs da partição fria (ver data.move_archived_to_cold)
+        if data_file in documents and "archived_ids" in documents[data_file]:
+            archived_ids = [pid for pid in documents[data_file]["archived_ids"] if pid != process_id]
+            if target != data_file:
+                archived_ids.append(process_id)
+            if archived_ids != documents[data_file]["archived_ids"]:
+                documents[data_file]["archived_ids"] = archived_ids
+                changed.add(data_file)
+        
+        # Partição fria primeiro: quem detecta a mudança em data.json já encontra as duas gravadas
+        for name in sorted(changed, key=lambda name: name == data_file):
+            document = documents[name]
+            document["_revision"] = document.get("_revision", 0) + 1
+            json_codec.dump_file(data_path(name), document)
+    return target
+
+
+def latest_snapshot_id(backup_dir=BACKUP_DIR, exclude_labels=(PRE_RESTORE_LABEL,)):
+    """ID do backup mais recente (ignorando os rótulos informados), ou None"""
+    for snapshot_id in reversed(snapshot_ids(backup_dir)):
+        if load_snapshot(snapshot_id, backup_dir).get("label") not in exclude_labels:
+            return snapshot_id
+    return None
+
+
+def prune(backup_dir=BACKUP_DIR, retention=None):
+    """Aplica a retenção por camadas; retorna (manifestos removidos, objetos removidos)"""
+    retention = retention or RETENTION
+    with _lock(backup_dir):
+        ids = snapshot_ids(backup_dir)
+        if not ids:
+            return 0, 0
+        keep = {ids[-1]}
+        for tier, count in retention.items():
+            buckets = []
+            for snapshot_id in reversed(ids):
+                bucket = _BUCKETS[tier](_created(snapshot_id))
+                if bucket in buckets:
+                    continue
+                if len(buckets) == count:
+                    break
+                buckets.append(bucket)
+                keep.add(snapshot_id)
+        # Os "full" usados pelos deltas mantidos também ficam
+        kept = {snapshot_id: load_snapshot(snapshot_id, backup_dir) for snapshot_id in keep}
+        for manifest in list(kept.values()):
+            if manifest["base"] and manifest["base"] not in kept:
+                kept[manifest["base"]] = load_snapshot(manifest["base"], backup_dir)
+
+        removed = [snapshot_id for snapshot_id in ids if snapshot_id not in kept]
+        for snapshot_id in removed:
+            os.remove(_manifest_path(backup_dir, snapshot_id))
+
+        # Objetos que nenhum manifesto mantido referencia
+        referenced = set()
+        for manifest in kept.values():
+            for entry in manifest["files"].values():
+                referenced.update(entry["processes"].values())
+        removed_objects = 0
+        objects_dir = os.path.join(backup_dir, "objects")
+        for directory, _, names in os.walk(objects_dir):
+            for name in names:
+                if name.endswith(".json.gz") and name[:-len(".json.gz")] not in referenced:
+                    os.remove(os.path.join(directory, name))
+                    removed_objects += 1
+        return len(removed), removed_objects
+
+
+def import_legacy_backup(path, backup_dir=BACKUP_DIR):
+    """Importa uma cópia completa antiga (data_backup_AAAAMMDD_HHMMSS.json) como backup"""
+    match = re.search(r"(\d{8}_\d{6})", os.path.basename(path))
+    if match:
+        created = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+    else:
+        created = datetime.fromtimestamp(os.path.getmtime(path))
+    label = PRE_RESTORE_LABEL if "pre_restauracao" in os.path.basename(path) else os.path.basename(path)
+    return create_backup(label=label, backup_dir=backup_dir,
+                         documents={BACKED_UP_FILES[0]: json_codec.load_file(path)}, created=created)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backups incrementais dos dados")
+    parser.add_argument("--diretorio", default=BACKUP_DIR)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    criar = comandos.add_parser("criar", help="cria um backup dos dados atuais")
+    criar.add_argument("--rotulo", default="")
+    comandos.add_parser("listar", help="lista os backups")
+    restaurar = comandos.add_parser("restaurar", help="restaura um backup (padrão: o mais recente)")
+    restaurar.add_argument("id", nargs="?")
+    comparar = comandos.add_parser("comparar", help="lista os processos alterados entre dois backups")
+    comparar.add_argument("id")
+    comparar.add_argument("id2", nargs="?", help="padrão: o estado atual dos dados")
+    restaurar_processo = comandos.add_parser("restaurar-processo", help="restaura um único processo de um backup")
+    restaurar_processo.add_argument("id")
+    restaurar_processo.add_argument("processo")
+    comandos.add_parser("podar", help="aplica a retenção e remove objetos sem uso")
+    importar = comandos.add_parser("importar", help="importa cópias completas antigas (data_backup_*.json)")
+    importar.add_argument("arquivos", nargs="+")
+    args = parser.parse_args()
+
+    if args.comando == "criar":
+        print(f"Backup: {create_backup(label=args.rotulo, backup_dir=args.diretorio)}")
+    elif args.comando == "listar":
+        for manifesto in list_snapshots(args.diretorio):
+            alterados = sum(len(entrada["processes"]) for entrada in manifesto["files"].values())
+            print(f"{manifesto['id']}  {manifesto['kind']:<5}  {alterados:>7} processo(s)  {manifesto.get('label', '')}")
+    elif args.comando == "restaurar":
+        snapshot_id = args.id or latest_snapshot_id(args.diretorio)
+        if snapshot_id is None:
+            print("Nenhum backup encontrado!")
+        else:
+            for arquivo, lidos in restore_snapshot(snapshot_id, args.diretorio).items():
+                print(f"{arquivo}: {lidos} processo(s) restaurado(s) do backup {snapshot_id}")
+    elif args.comando == "comparar":
+        mudancas = diff_snapshots(args.id, args.id2, args.diretorio)
+        for processo, mudanca in sorted(mudancas.items()):
+            print(f"{processo}  {mudanca}")
+        print(f"{len(mudancas)} processo(s) diferente(s) entre {args.id} e {args.id2 or 'o estado atual'}")
+    elif args.comando == "restaurar-processo":
+        arquivo = restore_process(args.id, args.processo, args.diretorio)
+        print(f"Processo {args.processo} restaurado do backup {args.id} em {arquivo}")
+    elif args.comando == "podar":
+        manifestos, objetos = prune(args.diretorio)
+        print(f"{manifestos} backup(s) e {objetos} objeto(s) removido(s)")
+    elif args.comando == "importar":
+        for arquivo in sorted(args.arquivos):
+            print(f"{arquivo} -> {import_legacy_backup(arquivo, args.diretorio)}")
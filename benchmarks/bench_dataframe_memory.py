@@ -0,0 +1,78 @@
+"""
+Benchmark de memória do DataFrame de processos
+
+Compara, para N processos sintéticos (padrão 100 mil), a montagem antiga
+(pd.DataFrame dos dicionários, tudo como texto, datas formatadas e uma cópia
+extra) com data.build_processes_frame (categorias, datetime64, inteiros,
+montado uma única vez): memória do DataFrame (memory_usage(deep=True)),
+pico de alocação (tracemalloc) e tempo de montagem.
+
+Uso:
+    python benchmarks/bench_dataframe_memory.py [--processos 100000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pandas as pd
+
+from data import PROCESS_DISPLAY_COLUMNS, build_processes_frame
+from gerar_dados_sinteticos import gerar_processos
+
+
+def montagem_antiga(processos):
+    """Reproduz a montagem anterior de get_processes_df (colunas object, datas como texto)"""
+    df = pd.DataFrame(processos).astype(object)
+    for coluna in PROCESS_DISPLAY_COLUMNS:
+        if coluna not in df.columns:
+            df[coluna] = ""
+    completo = df.copy()
+    if "storage_days" in completo.columns:
+        completo["storage_days"] = pd.to_numeric(completo["storage_days"], errors="coerce").fillna(0).astype(int)
+    return completo[PROCESS_DISPLAY_COLUMNS]
+
+
+def medir(funcao, processos):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    df = funcao(processos)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, {
+        "memoria_dataframe_mb": round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2),
+        "pico_alocacao_mb": round(pico / 1024 ** 2, 2),
+        "montagem_s": round(duracao, 3),
+    }
+
+
+def executar(processos=100000, semente=42):
+    registros = list(gerar_processos(processos, semente=semente))
+
+    _, antigo = medir(montagem_antiga, registros)
+    df, tipado = medir(lambda itens: build_processes_frame(itens, PROCESS_DISPLAY_COLUMNS), registros)
+
+    return {
+        "processos": processos,
+        "antigo": antigo,
+        "tipado": tipado,
+        "reducao_memoria": round(1 - tipado["memoria_dataframe_mb"] / antigo["memoria_dataframe_mb"], 3),
+        "tipos": {coluna: str(tipo) for coluna, tipo in df.dtypes.items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, default=100000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(executar(args.processos, args.semente), indent=2, ensure_ascii=False))
@@ -0,0 +1,132 @@
+"""
+Benchmark da fila de emails (email_queue) contra um servidor SMTP local
+
+Usa o aiosmtpd, se instalado; caso contrário, sobe um servidor SMTP mínimo
+em memória que apenas aceita e conta as mensagens. Nenhum email sai da máquina.
+
+Uso:
+    python benchmarks/bench_email_queue.py [--mensagens 500] [--workers 2] [--lote 20]
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from email_queue import EmailQueue, SMTPConfig
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Implementação mínima do protocolo SMTP: aceita tudo e conta as mensagens"""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        self.reply("220 localhost SMTP de teste")
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line in (b".\r\n", b".\n"):
+                    in_data = False
+                    self.server.count_message()
+                    self.reply("250 OK")
+                continue
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250 localhost")
+            elif command.startswith("DATA"):
+                in_data = True
+                self.reply("354 Fim com <CRLF>.<CRLF>")
+            elif command.startswith("QUIT"):
+                self.reply("221 Tchau")
+                return
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPSinkHandler)
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def count_message(self):
+        with self._lock:
+            self.received += 1
+
+
+def iniciar_servidor():
+    """Inicia o servidor SMTP local e retorna (porta, função que conta recebidos, função de parada)"""
+    try:
+        from aiosmtpd.controller import Controller
+
+        class Contador:
+            received = 0
+
+            async def handle_DATA(self, server, session, envelope):
+                Contador.received += 1
+                return "250 OK"
+
+        controller = Controller(Contador(), hostname="127.0.0.1", port=0)
+        controller.start()
+        port = controller.server.sockets[0].getsockname()[1]
+        return port, lambda: Contador.received, controller.stop
+    except ImportError:
+        sink = SMTPSink()
+        threading.Thread(target=sink.serve_forever, daemon=True).start()
+        return sink.server_address[1], lambda: sink.received, sink.shutdown
+
+
+def executar(mensagens=500, workers=2, lote=20):
+    """Envia as mensagens pela fila e retorna as estatísticas de vazão"""
+    porta, recebidos, parar = iniciar_servidor()
+    try:
+        config = SMTPConfig(server="127.0.0.1", port=porta, from_email="bench@localhost", use_tls=False)
+        fila = EmailQueue(workers=workers, batch_size=lote)
+
+        inicio = time.perf_counter()
+        fila.enqueue_many(config, [f"cliente{i}@localhost" for i in range(mensagens)],
+                          "Atualização do processo", "Seu processo foi atualizado.")
+        tempo_enfileiramento = time.perf_counter() - inicio
+        fila.wait_until_idle(timeout=300)
+        duracao = time.perf_counter() - inicio
+        fila.close()
+
+        stats = fila.stats()
+        return {
+            "mensagens": mensagens,
+            "workers": workers,
+            "lote": lote,
+            "recebidas_pelo_servidor": recebidos(),
+            "enviadas": stats["sent"],
+            "falhas": stats["failed"],
+            "enfileiramento_ms": round(tempo_enfileiramento * 1000, 2),
+            "mensagens_por_segundo": round(mensagens / duracao, 2) if duracao else None
+        }
+    finally:
+        parar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mensagens", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--lote", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(executar(args.mensagens, args.workers, args.lote), indent=2))
@@ -0,0 +1,115 @@
+"""
+Benchmark da codificação do arquivo de dados
+
+Compara, para N processos sintéticos (padrão 10 mil e 100 mil), o tempo de
+leitura e gravação e o tamanho do arquivo em três formatos:
+
+- json_indent4: formato anterior (json da biblioteca padrão, indent=4)
+- json_compacto: json da biblioteca padrão, sem espaços (fallback do json_codec)
+- orjson_compacto: orjson, sem espaços (caminho rápido do json_codec, se instalado)
+
+A leitura inclui a decodificação do arquivo; a gravação parte dos registros
+compactos (records.Process), como save_data faz. Tudo roda em um diretório
+temporário.
+
+Uso:
+    python benchmarks/bench_json_codec.py [--tamanhos 10000 100000] [--repeticoes 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import json_codec
+from gerar_dados_sinteticos import gerar_processos
+from records import compact_processes, to_json
+
+
+def _gravar_indent4(caminho, dados):
+    with open(caminho, "w") as f:
+        json.dump(dados, f, indent=4, default=to_json)
+
+
+def _ler_indent4(caminho):
+    with open(caminho, "r") as f:
+        return json.load(f)
+
+
+def _formatos():
+    formatos = {"json_indent4": (_gravar_indent4, _ler_indent4)}
+    # O fallback do json_codec, forçado mesmo com orjson instalado
+    formatos["json_compacto"] = (_sem_orjson(json_codec.dump_file), _sem_orjson(json_codec.load_file))
+    if json_codec.HAS_ORJSON:
+        formatos["orjson_compacto"] = (json_codec.dump_file, json_codec.load_file)
+    return formatos
+
+
+def _sem_orjson(funcao):
+    def executar(*args):
+        orjson = json_codec.orjson
+        json_codec.orjson = None
+        try:
+            return funcao(*args)
+        finally:
+            json_codec.orjson = orjson
+    return executar
+
+
+def _mediana(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tempos), 4)
+
+
+def executar_tamanho(quantidade, repeticoes, semente, diretorio):
+    dados = {
+        "config": {"storage_days_per_period": 30},
+        "processes": compact_processes(list(gerar_processos(quantidade, semente=semente))),
+    }
+    resultado = {}
+    for nome, (gravar, ler) in _formatos().items():
+        caminho = os.path.join(diretorio, f"{nome}_{quantidade}.json")
+        gravacao = _mediana(lambda: gravar(caminho, dados), repeticoes)
+        leitura = _mediana(lambda: ler(caminho), repeticoes)
+        resultado[nome] = {
+            "gravacao_s": gravacao,
+            "leitura_s": leitura,
+            "tamanho_mb": round(os.path.getsize(caminho) / 1024 ** 2, 2),
+        }
+        os.remove(caminho)
+    base = resultado["json_indent4"]
+    for nome, medidas in resultado.items():
+        medidas["reducao_tamanho"] = round(1 - medidas["tamanho_mb"] / base["tamanho_mb"], 3)
+    return resultado
+
+
+def executar(tamanhos, repeticoes=3, semente=42):
+    with tempfile.TemporaryDirectory() as diretorio:
+        return {
+            "orjson": json_codec.HAS_ORJSON,
+            "resultados": {
+                str(quantidade): executar_tamanho(quantidade, repeticoes, semente, diretorio)
+                for quantidade in tamanhos
+            },
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(executar(args.tamanhos, args.repeticoes, args.semente), indent=2, ensure_ascii=False))
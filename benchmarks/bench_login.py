@@ -0,0 +1,83 @@
+"""
+Benchmark de vazão de login (components.auth.authenticate)
+
+Mede logins por segundo com um fator de trabalho de hash fixo, separando:
+- login "frio": a senha precisa ser verificada com PBKDF2
+- login "quente": a verificação vem do cache de sessões verificadas
+
+Uso:
+    python benchmarks/bench_login.py [--usuarios 50] [--iteracoes 100000] [--logins 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Permitir importar os módulos da aplicação a partir da raiz do repositório
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from components import auth
+
+
+def preparar_usuarios(pasta, quantidade, iteracoes):
+    """Cria um users.json temporário com senhas já em hash"""
+    auth.USERS_FILE = os.path.join(pasta, "users.json")
+    auth.PASSWORD_HASH_ITERATIONS = iteracoes
+
+    usuarios = []
+    for i in range(quantidade):
+        usuarios.append({
+            "id": f"user-{i:04d}",
+            "name": f"Usuário {i}",
+            "email": f"usuario{i}@teste.com",
+            "password": auth.get_password_hash(f"senha-{i}", iteracoes),
+            "role": "client",
+            "processes": []
+        })
+    auth.save_users({"users": usuarios})
+    return usuarios
+
+
+def medir_logins(quantidade_usuarios, total_logins):
+    """Executa logins em sequência e retorna logins por segundo"""
+    inicio = time.perf_counter()
+    for i in range(total_logins):
+        n = i % quantidade_usuarios
+        if not auth.authenticate(f"usuario{n}@teste.com", f"senha-{n}"):
+            raise RuntimeError(f"Falha no login do usuário {n}")
+    duracao = time.perf_counter() - inicio
+    return total_logins / duracao if duracao else float("inf")
+
+
+def executar(quantidade_usuarios=50, iteracoes=100000, total_logins=200):
+    """Executa o benchmark e retorna os resultados em um dicionário"""
+    with tempfile.TemporaryDirectory() as pasta:
+        preparar_usuarios(pasta, quantidade_usuarios, iteracoes)
+        auth._verification_cache.clear()
+
+        # Primeira passada: cada usuário verifica o hash uma vez (cache vazio)
+        frio = medir_logins(quantidade_usuarios, quantidade_usuarios)
+        # Passadas seguintes: verificações reaproveitadas do cache
+        quente = medir_logins(quantidade_usuarios, total_logins)
+
+    return {
+        "usuarios": quantidade_usuarios,
+        "iteracoes_hash": iteracoes,
+        "logins_por_segundo_frio": round(frio, 2),
+        "logins_por_segundo_cache": round(quente, 2)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--iteracoes", type=int, default=100000, help="Fator de trabalho do PBKDF2")
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(executar(args.usuarios, args.iteracoes, args.logins), indent=2))
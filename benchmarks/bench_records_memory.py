@@ -0,0 +1,69 @@
+"""
+Benchmark de memória do armazenamento em memória dos processos
+
+Compara, para N processos sintéticos com eventos (padrão 100 mil), a memória
+ocupada pela lista de dicionários lida do JSON com a dos registros compactos
+(records.Process/records.Event), medida com tracemalloc, e confere que a
+conversão de volta para JSON é sem perdas.
+
+Uso:
+    python benchmarks/bench_records_memory.py [--processos 100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from gerar_dados_sinteticos import gerar_processos
+from records import compact_processes, to_json
+
+
+def medir(funcao):
+    """Executa a função e retorna (resultado, memória retida em MB, tempo em s)"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, atual / 1024 ** 2, duracao
+
+
+def executar(processos=100000, semente=42):
+    texto = json.dumps(list(gerar_processos(processos, semente=semente)), ensure_ascii=False)
+
+    dicionarios, memoria_dict, tempo_dict = medir(lambda: json.loads(texto))
+    eventos = sum(len(processo.get("events", [])) for processo in dicionarios)
+    del dicionarios
+
+    registros, memoria_registros, tempo_registros = medir(lambda: compact_processes(json.loads(texto)))
+    sem_perdas = json.loads(json.dumps(registros, default=to_json, ensure_ascii=False)) == json.loads(texto)
+
+    return {
+        "processos": processos,
+        "eventos": eventos,
+        "dicionarios_mb": round(memoria_dict, 1),
+        "registros_mb": round(memoria_registros, 1),
+        "reducao_memoria": round(1 - memoria_registros / memoria_dict, 3),
+        "carga_dicionarios_s": round(tempo_dict, 3),
+        "carga_registros_s": round(tempo_registros, 3),
+        "conversao_sem_perdas": sem_perdas,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, default=100000)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(executar(args.processos, args.semente), indent=2, ensure_ascii=False))
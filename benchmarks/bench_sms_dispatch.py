@@ -0,0 +1,63 @@
+"""
+Benchmark do despachante de SMS (sms_dispatcher) com transporte falso
+
+Mede o tempo para notificar N clientes com latência simulada por envio e
+confere que a taxa observada respeita o limite configurado. Não usa rede.
+
+Uso:
+    python benchmarks/bench_sms_dispatch.py [--mensagens 100] [--taxa 20] [--workers 4] [--latencia 0.2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from sms_dispatcher import FakeSmsTransport, SmsDispatcher
+
+
+def executar(mensagens=100, taxa=20.0, workers=4, latencia=0.2):
+    """Envia as mensagens pelo despachante e retorna tempos e taxa observada"""
+    transporte = FakeSmsTransport(latency=latencia)
+    despachante = SmsDispatcher(transporte, max_workers=workers, rate_per_second=taxa)
+
+    inicio = time.perf_counter()
+    futuros = despachante.send_batch(
+        [(f"+55119{i:08d}", "Processo atualizado.") for i in range(mensagens)]
+    )
+    tempo_agendamento = time.perf_counter() - inicio
+    enviados, falhas = despachante.wait_all(futuros, timeout=600)
+    duracao = time.perf_counter() - inicio
+    despachante.shutdown()
+
+    instantes = [instante for instante, _, _ in transporte.sent]
+    janela = (max(instantes) - min(instantes)) if len(instantes) > 1 else 0.0
+
+    return {
+        "mensagens": mensagens,
+        "limite_por_segundo": taxa,
+        "workers": workers,
+        "latencia_envio_s": latencia,
+        "enviados": enviados,
+        "falhas": falhas,
+        "agendamento_ms": round(tempo_agendamento * 1000, 2),
+        "duracao_s": round(duracao, 3),
+        "taxa_observada_por_segundo": round((len(instantes) - 1) / janela, 2) if janela else None,
+        "envio_sequencial_estimado_s": round(mensagens * latencia, 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mensagens", type=int, default=100)
+    parser.add_argument("--taxa", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latencia", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(json.dumps(executar(args.mensagens, args.taxa, args.workers, args.latencia), indent=2))
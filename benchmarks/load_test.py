@@ -0,0 +1,252 @@
+"""
+Teste de carga com sessões simultâneas simuladas (streamlit.testing.v1.AppTest)
+
+Cada sessão percorre app.py como um operador: login -> painel -> busca ->
+detalhes de um processo -> volta ao painel filtrado (onde as exportações
+Excel/CSV são geradas). N sessões rodam em paralelo em threads do mesmo
+processo, compartilhando os caches (st.cache_data/st.cache_resource) como
+aconteceria em um único contêiner.
+
+O relatório traz, por página, os percentis de latência de cada rerun e, por
+sessão, a memória ocupada pelo session_state e o crescimento do RSS do processo.
+
+Tudo roda em um diretório temporário com dados sintéticos
+(gerar_dados_sinteticos.py) e um usuário de teste; data.json e users.json
+reais não são tocados.
+
+Uso:
+    python benchmarks/load_test.py [--sessoes 10] [--processos 1000] [--busca CHINA]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+# Os avisos de depreciação do Streamlit se repetem a cada rerun e poluem o relatório
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+APP_FILE = os.path.join(ROOT_DIR, "app.py")
+USUARIO_TESTE = "carga@localhost"
+SENHA_TESTE = "carga-teste"
+ETAPAS = ["login", "home", "search", "details", "export"]
+
+
+def serializar_compilacao():
+    """Compila app.py uma sessão por vez
+
+    O AppTest recompila o script a cada rerun, e ast.parse em várias threads ao
+    mesmo tempo quebra em algumas versões do CPython 3.11 ("AST constructor
+    recursion depth mismatch"). A compilação leva milissegundos; o restante do
+    rerun continua em paralelo.
+    """
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    if getattr(ScriptCache.get_bytecode, "_serializado", False):
+        return
+    original = ScriptCache.get_bytecode
+    trava = threading.Lock()
+
+    def get_bytecode(self, script_path):
+        with trava:
+            return original(self, script_path)
+
+    get_bytecode._serializado = True
+    ScriptCache.get_bytecode = get_bytecode
+
+
+def preparar_diretorio(diretorio, processos, semente=42):
+    """Monta o diretório de trabalho: dados sintéticos, um admin de teste e os assets"""
+    from components.auth import get_password_hash
+    from gerar_dados_sinteticos import gerar_dados_sinteticos
+
+    gerar_dados_sinteticos(processos, os.path.join(diretorio, "data.json"), semente=semente)
+    with open(os.path.join(diretorio, "users.json"), "w", encoding="utf-8") as f:
+        json.dump({"users": [{
+            "id": "carga-001",
+            "name": "Teste de Carga",
+            "email": USUARIO_TESTE,
+            "password": get_password_hash(SENHA_TESTE),
+            "role": "admin"
+        }]}, f)
+    os.symlink(os.path.join(ROOT_DIR, "assets"), os.path.join(diretorio, "assets"))
+
+
+def rss_mb():
+    """Memória residente atual do processo (MB)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # Fora do Linux, usa o pico (ru_maxrss em KB no Linux, bytes no macOS)
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / 1024 ** 2 if sys.platform == "darwin" else maxrss / 1024
+
+
+def tamanho_profundo(obj, vistos=None):
+    """Tamanho aproximado (bytes) de um objeto e de tudo o que ele referencia"""
+    if vistos is None:
+        vistos = set()
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+    tamanho = sys.getsizeof(obj)
+    if isinstance(obj, Mapping):
+        # Inclui os registros compactos (records.Process/Event), que são Mappings com __slots__
+        tamanho += sum(tamanho_profundo(k, vistos) + tamanho_profundo(v, vistos) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_profundo(item, vistos) for item in obj)
+    return tamanho
+
+
+def _por_rotulo(elementos, rotulo):
+    for elemento in elementos:
+        if elemento.label == rotulo:
+            return elemento
+    raise LookupError(f"Elemento não encontrado: {rotulo}")
+
+
+def _rerun(at, etapa, tempos):
+    inicio = time.perf_counter()
+    at.run()
+    tempos[etapa] = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(f"{etapa}: {at.exception[0].message}")
+
+
+def executar_sessao(busca, timeout=300):
+    """Percorre o fluxo completo em uma sessão e retorna tempos por etapa e memória da sessão"""
+    from streamlit.testing.v1 import AppTest
+
+    tempos = {}
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    _rerun(at, "login", tempos)
+
+    _por_rotulo(at.text_input, "Email ou Usuário").input(USUARIO_TESTE)
+    _por_rotulo(at.text_input, "Senha").input(SENHA_TESTE)
+    _por_rotulo(at.button, "Entrar").click()
+    _rerun(at, "home", tempos)
+    if not at.session_state["authenticated"]:
+        raise RuntimeError("login: falha na autenticação")
+
+    _por_rotulo(at.text_input, "Buscar processo").input(busca)
+    _rerun(at, "search", tempos)
+
+    selecao = _por_rotulo(at.selectbox, "Selecione um processo")
+    if selecao.options:
+        selecao.set_value(selecao.options[0])
+    _por_rotulo(at.button, "👁️ Visualizar Detalhes").click()
+    _rerun(at, "details", tempos)
+
+    # Voltar ao painel com a busca mantida gera os arquivos Excel/CSV do resultado filtrado
+    _por_rotulo(at.button, "← Voltar para a lista").click()
+    _rerun(at, "export", tempos)
+
+    estado = {chave: valor for chave, valor in at.session_state.to_dict().items() if not chave.startswith("$$")}
+    return tempos, tamanho_profundo(estado)
+
+
+def percentis(valores):
+    ordenados = sorted(valores)
+
+    def p(q):
+        return ordenados[min(len(ordenados) - 1, int(round(q * (len(ordenados) - 1))))]
+
+    return {
+        "p50_ms": round(p(0.50) * 1000, 1),
+        "p90_ms": round(p(0.90) * 1000, 1),
+        "p95_ms": round(p(0.95) * 1000, 1),
+        "p99_ms": round(p(0.99) * 1000, 1),
+        "max_ms": round(ordenados[-1] * 1000, 1),
+        "media_ms": round(statistics.mean(ordenados) * 1000, 1)
+    }
+
+
+def executar(sessoes=10, processos=1000, busca="CHINA", semente=42, timeout=300):
+    """Roda as sessões em paralelo e retorna o relatório"""
+    serializar_compilacao()
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="carga_") as diretorio:
+        preparar_diretorio(diretorio, processos, semente)
+        os.chdir(diretorio)
+        try:
+            rss_inicial = rss_mb()
+            pico = [rss_inicial]
+            parar = threading.Event()
+
+            def amostrar_rss():
+                while not parar.wait(0.05):
+                    pico[0] = max(pico[0], rss_mb())
+
+            amostrador = threading.Thread(target=amostrar_rss, daemon=True)
+            amostrador.start()
+
+            inicio = time.perf_counter()
+            # O que o app imprime (ex.: períodos atualizados) não faz parte do relatório
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                    ThreadPoolExecutor(max_workers=sessoes) as executor:
+                futuros = [executor.submit(executar_sessao, busca, timeout) for _ in range(sessoes)]
+            duracao = time.perf_counter() - inicio
+            parar.set()
+            amostrador.join()
+            rss_final = rss_mb()
+        finally:
+            os.chdir(diretorio_original)
+
+    resultados = []
+    erros = []
+    for futuro in futuros:
+        try:
+            resultados.append(futuro.result())
+        except Exception as e:
+            erros.append(str(e))
+
+    latencias = {}
+    for etapa in ETAPAS:
+        valores = [tempos[etapa] for tempos, _ in resultados if etapa in tempos]
+        if valores:
+            latencias[etapa] = percentis(valores)
+
+    estados = [tamanho for _, tamanho in resultados]
+    return {
+        "sessoes": sessoes,
+        "processos": processos,
+        "sessoes_concluidas": len(resultados),
+        "erros": erros,
+        "duracao_total_s": round(duracao, 3),
+        "latencia_por_pagina": latencias,
+        "memoria": {
+            "rss_inicial_mb": round(rss_inicial, 1),
+            "rss_pico_mb": round(pico[0], 1),
+            "rss_final_mb": round(rss_final, 1),
+            "rss_por_sessao_mb": round((pico[0] - rss_inicial) / sessoes, 2) if sessoes else None,
+            "session_state_por_sessao_mb": round(statistics.mean(estados) / 1024 ** 2, 2) if estados else None
+        }
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessoes", type=int, default=10)
+    parser.add_argument("--processos", type=int, default=1000)
+    parser.add_argument("--busca", default="CHINA", help="Termo digitado na busca do painel")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=300, help="Tempo máximo de cada rerun (s)")
+    args = parser.parse_args()
+
+    relatorio = executar(args.sessoes, args.processos, args.busca, args.semente, args.timeout)
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    if relatorio["erros"]:
+        sys.exit(1)
@@ -0,0 +1,194 @@
+"""
+Benchmarks dos caminhos críticos da camada de dados, do painel e das exportações
+
+Mede get_processes_df, check_period_expiry, a virada diária de períodos
+(scheduler.roll_over_periods), export_to_excel e
+generate_processes_table_html com 1k/10k/100k processos sintéticos
+(gerar_dados_sinteticos.py, semente fixa), grava os resultados em JSON e,
+opcionalmente, compara com um baseline salvo: qualquer caso cuja mediana
+fique acima de (1 + limite) vezes a do baseline é uma regressão e o script
+termina com código 1.
+
+Tudo roda em um diretório temporário (save_data e as exportações HTML gravam
+no diretório atual), sem tocar no data.json real.
+
+Uso:
+    python benchmarks/run_benchmarks.py [--tamanhos 1000 10000 100000] [--repeticoes 3]
+        [--saida resultados.json] [--baseline baseline.json] [--limite 0.2] [--salvar-baseline]
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pandas as pd
+import streamlit as st
+
+from gerar_dados_sinteticos import gerar_processos
+
+BASELINE_PADRAO = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+
+# Sem o servidor do Streamlit, st.session_state funciona em "bare mode" e avisa a cada acesso
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+logging.getLogger("streamlit.runtime.state.session_state_proxy").setLevel(logging.ERROR)
+
+
+def _medir(funcao, repeticoes, preparar=None):
+    """Executa a função `repeticoes` vezes e retorna os tempos (s); a saída impressa é descartada
+
+    Se `preparar` for dado, cada execução recebe como argumento o que ele retorna,
+    gerado fora do tempo medido (ex.: uma cópia nova dos dados).
+    """
+    tempos = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeticoes):
+            argumentos = (preparar(),) if preparar else ()
+            inicio = time.perf_counter()
+            funcao(*argumentos)
+            tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _resumo(tempos):
+    return {
+        "mediana_s": round(statistics.median(tempos), 6),
+        "min_s": round(min(tempos), 6),
+        "max_s": round(max(tempos), 6),
+        "repeticoes": len(tempos)
+    }
+
+
+def executar_tamanho(quantidade, repeticoes=3, semente=42):
+    """Roda todos os benchmarks para uma quantidade de processos"""
+    from data import get_processes_df, move_archived_to_cold
+    from html_generator import generate_processes_table_html
+    from scheduler import roll_over_periods
+    from utils import check_period_expiry, export_to_excel
+
+    # Referência 90 dias atrás: parte dos períodos está vencida, como em produção
+    processos = list(gerar_processos(quantidade, semente=semente,
+                                     data_referencia=date.today() - timedelta(days=90)))
+    st.session_state.data = {"config": {"storage_days_per_period": 30}, "processes": processos}
+    # Como load_data: os arquivados vão para a partição fria e o painel mede só os ativos
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        move_archived_to_cold(st.session_state.data, replace=True)
+    processos = st.session_state.data["processes"]
+
+    resultados = {}
+    # check_period_expiry não altera os processos; roda antes da virada dos períodos
+    resultados["check_period_expiry"] = _medir(
+        lambda: [check_period_expiry(processo) for processo in processos], repeticoes)
+
+    # Manutenção diária do agendador: só a primeira execução sobre os mesmos dados encontra
+    # períodos vencidos, então cada repetição roda sobre uma cópia nova (feita fora da medição)
+    resultados["period_rollover"] = _medir(
+        roll_over_periods, repeticoes, preparar=lambda: copy.deepcopy(st.session_state.data))
+    # Os demais casos medem o estado já atualizado
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        roll_over_periods(st.session_state.data)
+
+    # Chamada de aquecimento (imports e caches do pandas); as seguintes medem o caminho estável
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        get_processes_df()
+    resultados["get_processes_df"] = _medir(get_processes_df, repeticoes)
+
+    df = get_processes_df()
+    resultados["export_to_excel"] = _medir(lambda: export_to_excel(df), repeticoes)
+    resultados["generate_processes_table_html"] = _medir(
+        lambda: generate_processes_table_html(filtered_df=df), repeticoes)
+
+    return {nome: _resumo(tempos) for nome, tempos in resultados.items()}
+
+
+def executar(tamanhos=(1000, 10000, 100000), repeticoes=3, semente=42):
+    """Roda a suíte em um diretório temporário e retorna o relatório"""
+    diretorio_original = os.getcwd()
+    relatorio = {
+        "ambiente": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "streamlit": st.__version__,
+            "plataforma": platform.platform(),
+        },
+        "semente": semente,
+        "resultados": {}
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_") as diretorio:
+        os.chdir(diretorio)
+        try:
+            for quantidade in tamanhos:
+                print(f"Executando com {quantidade} processos...", file=sys.stderr)
+                for nome, resumo in executar_tamanho(quantidade, repeticoes, semente).items():
+                    relatorio["resultados"].setdefault(nome, {})[str(quantidade)] = resumo
+        finally:
+            os.chdir(diretorio_original)
+    return relatorio
+
+
+def comparar(relatorio, baseline, limite=0.2):
+    """Compara as medianas com o baseline; retorna a lista de casos e a de regressões"""
+    casos = []
+    regressoes = []
+    for nome, por_tamanho in relatorio["resultados"].items():
+        for tamanho, resumo in por_tamanho.items():
+            referencia = baseline.get("resultados", {}).get(nome, {}).get(tamanho)
+            if not referencia or not referencia.get("mediana_s"):
+                continue
+            razao = resumo["mediana_s"] / referencia["mediana_s"]
+            caso = {
+                "benchmark": nome,
+                "tamanho": int(tamanho),
+                "baseline_s": referencia["mediana_s"],
+                "atual_s": resumo["mediana_s"],
+                "razao": round(razao, 3)
+            }
+            casos.append(caso)
+            if razao > 1 + limite:
+                regressoes.append(caso)
+    return casos, regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO, help="Baseline para comparação")
+    parser.add_argument("--limite", type=float, default=0.2,
+                        help="Piora relativa tolerada antes de acusar regressão (0.2 = 20%%)")
+    parser.add_argument("--salvar-baseline", action="store_true",
+                        help="Grava os resultados como novo baseline em vez de comparar")
+    args = parser.parse_args()
+
+    relatorio = executar(args.tamanhos, args.repeticoes, args.semente)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"Baseline salvo em {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            casos, regressoes = comparar(relatorio, json.load(f), args.limite)
+        relatorio["comparacao"] = {"limite": args.limite, "casos": casos, "regressoes": regressoes}
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    if relatorio.get("comparacao", {}).get("regressoes"):
+        sys.exit(1)
@@ -0,0 +1,164 @@
+"""
+Teste de estresse de gravações concorrentes em data.json
+
+Vários processos (simulando réplicas do app e scripts) adicionam eventos a
+processos sorteados do mesmo data.json ao mesmo tempo. Cada trabalhador lê os
+dados uma vez e, a cada operação, adiciona um evento e grava só aquele
+processo com data.write_changes (trava do arquivo + revisão por processo). Se
+outro trabalhador gravou o mesmo processo, as duas alterações são mescladas
+(data.merge_process); em um ConflictError, relê o processo e tenta de novo.
+
+Ao final, o total de eventos no arquivo deve ser igual ao inicial mais as
+operações concluídas: nenhuma atualização perdida. Com --comparar, o mesmo
+teste roda também no modo anterior (cada um grava o arquivo inteiro, sem
+trava) para mostrar as atualizações perdidas.
+
+Tudo roda em um diretório temporário, sem tocar no data.json real.
+
+Uso:
+    python benchmarks/stress_concurrent_writes.py [--trabalhadores 8] [--operacoes 50]
+        [--processos 200] [--comparar]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import json_codec
+from gerar_dados_sinteticos import gerar_processos
+from records import compact_processes
+
+# data.py usa st.cache_*; fora do servidor do Streamlit isso só gera avisos
+logging.getLogger("streamlit.runtime.caching.cache_data_api").setLevel(logging.ERROR)
+
+
+def _novo_evento(trabalhador, operacao):
+    return {
+        "id": str(uuid.uuid4()),
+        "date": time.strftime("%d/%m/%Y"),
+        "description": f"Estresse {trabalhador}/{operacao}",
+        "user": f"trabalhador-{trabalhador}",
+    }
+
+
+def _trabalhador_com_trava(diretorio, trabalhador, operacoes, semente, fila):
+    os.chdir(diretorio)
+    sys.stdout = open(os.devnull, "w")  # mensagens de data.py ("mesclado ...")
+    import data
+    from data import ConflictError, snapshot_process, write_changes
+
+    dados = json_codec.load_file(data.DATA_FILE)
+    dados["processes"] = compact_processes(dados["processes"])
+    aleatorio = random.Random(semente + trabalhador)
+    concluidas = conflitos = mescladas = 0
+    for operacao in range(operacoes):
+        indice = aleatorio.randrange(len(dados["processes"]))
+        while True:
+            processo = dados["processes"][indice]
+            base = snapshot_process(processo)
+            processo["events"].append(_novo_evento(trabalhador, operacao))
+            try:
+                write_changes(dados, changed=[processo["id"]], bases={processo["id"]: base})
+                concluidas += 1
+                mescladas += processo["_rev"] != base.get("_rev", 0) + 1
+                break
+            except ConflictError:
+                # Recarregar o processo alterado por outro trabalhador e refazer a operação
+                conflitos += 1
+                atual = json_codec.load_file(data.DATA_FILE)
+                dados["processes"][indice] = compact_processes(
+                    [p for p in atual["processes"] if p["id"] == processo["id"]])[0]
+    fila.put({"concluidas": concluidas, "conflitos": conflitos, "mescladas": mescladas})
+
+
+def _trabalhador_sem_trava(diretorio, trabalhador, operacoes, semente, fila):
+    # Modo anterior: ler o arquivo, alterar um processo e gravar o arquivo inteiro
+    os.chdir(diretorio)
+    aleatorio = random.Random(semente + trabalhador)
+    concluidas = 0
+    for operacao in range(operacoes):
+        dados = json_codec.load_file("data.json")
+        processo = dados["processes"][aleatorio.randrange(len(dados["processes"]))]
+        processo["events"].append(_novo_evento(trabalhador, operacao))
+        json_codec.dump_file("data.json", dados)
+        concluidas += 1
+    fila.put({"concluidas": concluidas, "conflitos": 0, "mescladas": 0})
+
+
+def _total_eventos(caminho):
+    return sum(len(p.get("events") or []) for p in json_codec.load_file(caminho)["processes"])
+
+
+def executar_modo(alvo, trabalhadores, operacoes, processos, semente):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "data.json")
+        dados = {
+            "config": {"storage_days_per_period": 30},
+            "processes": list(gerar_processos(processos, semente=semente)),
+            "archived_ids": [],
+        }
+        json_codec.dump_file(caminho, dados)
+        eventos_iniciais = _total_eventos(caminho)
+
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        inicio = time.perf_counter()
+        workers = [
+            contexto.Process(target=alvo, args=(diretorio, i, operacoes, semente, fila))
+            for i in range(trabalhadores)
+        ]
+        for worker in workers:
+            worker.start()
+        resultados = [fila.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        duracao = time.perf_counter() - inicio
+
+        concluidas = sum(r["concluidas"] for r in resultados)
+        eventos_gravados = _total_eventos(caminho) - eventos_iniciais
+        return {
+            "operacoes_concluidas": concluidas,
+            "eventos_gravados": eventos_gravados,
+            "atualizacoes_perdidas": concluidas - eventos_gravados,
+            "gravacoes_mescladas": sum(r["mescladas"] for r in resultados),
+            "conflitos_refeitos": sum(r["conflitos"] for r in resultados),
+            "duracao_s": round(duracao, 3),
+            "operacoes_por_s": round(concluidas / duracao, 1) if duracao else None,
+        }
+
+
+def executar(trabalhadores=8, operacoes=50, processos=200, semente=42, comparar=False):
+    resultado = {
+        "trabalhadores": trabalhadores,
+        "operacoes_por_trabalhador": operacoes,
+        "processos": processos,
+        "com_trava": executar_modo(_trabalhador_com_trava, trabalhadores, operacoes, processos, semente),
+    }
+    if comparar:
+        resultado["sem_trava"] = executar_modo(_trabalhador_sem_trava, trabalhadores, operacoes, processos, semente)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trabalhadores", type=int, default=8)
+    parser.add_argument("--operacoes", type=int, default=50)
+    parser.add_argument("--processos", type=int, default=200)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--comparar", action="store_true", help="roda também o modo anterior (sem trava)")
+    args = parser.parse_args()
+
+    resultado = executar(args.trabalhadores, args.operacoes, args.processos, args.semente, args.comparar)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    sys.exit(1 if resultado["com_trava"]["atualizacoes_perdidas"] else 0)
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from data import get_process_by_id, add_process, update_process
+from data import get_process_by_id, add_process, update_process, snapshot_process
+from events import insert_event, new_event
+from instrumentation import timed
 
+@timed("display_add_edit_form")
 def display_add_edit_form(navigate_function):
     """Display form for adding or editing a process"""
     
@@ -12,6 +15,15 @@ def display_add_edit_form(navigate_function):
         if process is None:
             st.error("Processo não encontrado!")
             return
+        
+        # Processo como estava ao abrir o formulário: ao salvar, só os campos alterados
+        # em relação a ele são gravados (e mesclados com edições de outros usuários).
+        # O formulário é montado a partir dele, e não da versão recarregada: se os dados
+        # forem recarregados no envio, os widgets mudariam e o que foi digitado se perderia
+        edit_base = st.session_state.get("edit_base")
+        if edit_base is None or edit_base["id"] != process["id"]:
+            edit_base = st.session_state.edit_base = snapshot_process(process)
+        process = edit_base
     else:
         st.header("Novo Processo de Importação")
         process = {}
@@ -104,17 +116,16 @@ def display_add_edit_form(navigate_function):
         
         # If editing, maintain the existing events
         if st.session_state.edit_mode:
-            process_data["events"] = process.get("events", [])
+            process_data["events"] = list(process.get("events", []))
             
             # Add an update event
-            process_data["events"].append({
-                "date": datetime.now().strftime("%d/%m/%Y"),
-                "description": "Processo atualizado",
-                "user": "Admin"
-            })
+            insert_event(process_data, new_event("Processo atualizado", "Admin"))
             
             # Update the process
-            if update_process(process_data):
+            saved = update_process(process_data, base=edit_base)
+            # Sucesso ou conflito: a próxima edição parte da versão atual do processo
+            st.session_state.pop("edit_base", None)
+            if saved:
                 st.success("Processo atualizado com sucesso!")
                 st.session_state.edit_mode = False
                 navigate_function("home")
@@ -130,4 +141,5 @@ def display_add_edit_form(navigate_function):
     
     if cancel_button:
         st.session_state.edit_mode = False
+        st.session_state.pop("edit_base", None)
         navigate_function("home")
@@ -0,0 +1,95 @@
+import streamlit as st
+from data import get_processes_df, unarchive_process, date_columns, format_processes_frame
+from utils import export_to_excel
+from instrumentation import timed
+
+@timed("display_archived_processes")
+def display_archived_processes(navigate_function):
+    """Exibir os processos arquivados (partição fria, carregada só ao abrir esta página)
+
+    Args:
+        navigate_function: Function to navigate between pages
+    """
+    st.header("Processos Arquivados")
+
+    search_term = st.text_input("Buscar processo arquivado")
+
+    df = get_processes_df(include_archived=True)
+
+    if df.empty:
+        st.info("Nenhum processo arquivado.")
+        return
+
+    filtered_df = df
+    if search_term:
+        searchable_df = format_processes_frame(filtered_df)
+        filter_condition = False
+        for col in searchable_df.columns:
+            filter_condition |= searchable_df[col].astype(str).str.contains(search_term, case=False, na=False)
+        filtered_df = filtered_df[filter_condition]
+
+    st.caption(f"{len(filtered_df)} de {len(df)} processo(s) arquivado(s)")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.download_button(
+            label="📥 Exportar para Excel",
+            data=export_to_excel(filtered_df),
+            file_name="processos_arquivados.xlsx",
+            mime="application/vnd.ms-excel"
+        )
+
+    with col2:
+        if st.button("📄 Gerar Relatório HTML", use_container_width=True):
+            from html_generator import generate_processes_table_html
+            filepath, filename = generate_processes_table_html(filtered_df, archived=True)
+            if filepath:
+                with open(filepath, "rb") as f:
+                    st.download_button(
+                        label="📥 Baixar Relatório HTML",
+                        data=f.read(),
+                        file_name=filename,
+                        mime="text/html"
+                    )
+
+    column_config = {
+        "id": "Código",
+        "ref": "Referência",
+        "origin": "Origem",
+        "type": "Tipo",
+        "eta": "ETA",
+        "status": "Status",
+        "last_update": "Última Atualização"
+    }
+    for col in date_columns(filtered_df):
+        column_config[col] = st.column_config.DateColumn(column_config.get(col, col), format="DD/MM/YYYY")
+
+    st.dataframe(
+        filtered_df,
+        use_container_width=True,
+        height=400,
+        column_config=column_config
+    )
+
+    if filtered_df.empty:
+        return
+
+    st.subheader("Ações")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        process_id = st.selectbox("Selecione um processo arquivado", filtered_df["id"].tolist())
+
+    with col2:
+        if st.button("👁️ Visualizar Detalhes", use_container_width=True):
+            navigate_function("view_details", process_id)
+
+    with col3:
+        if st.button("♻️ Reativar Processo", use_container_width=True):
+            if unarchive_process(process_id):
+                st.success("Processo reativado com sucesso!")
+                st.rerun()
+            else:
+                st.error("Erro ao reativar processo.")
@@ -0,0 +1,556 @@
+import streamlit as st
+import json
+import os
+import hashlib
+import hmac
+import base64
+import secrets
+import time
+from datetime import datetime
+import uuid
+from instrumentation import timed
+
+# Caminho para o arquivo de usuários
+USERS_FILE = 'users.json'
+
+# Hash de senhas (PBKDF2-SHA256). O fator de trabalho pode ser ajustado pela
+# variável de ambiente PASSWORD_HASH_ITERATIONS; hashes com outro fator são
+# atualizados automaticamente no próximo login bem-sucedido.
+PASSWORD_HASH_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 260000))
+
+# Verificações de senha bem-sucedidas ficam em cache por alguns minutos para
+# que reruns e logins repetidos não recalculem o hash
+VERIFICATION_CACHE_TTL = 15 * 60  # segundos
+VERIFICATION_CACHE_MAX_ENTRIES = 1024
+_verification_cache = {}
+_verification_cache_key = secrets.token_bytes(32)
+
+def init_auth_state():
+    """Inicializa o estado de autenticação na sessão"""
+    if 'authenticated' not in st.session_state:
+        st.session_state.authenticated = False
+    if 'user_id' not in st.session_state:
+        st.session_state.user_id = None
+    if 'user_role' not in st.session_state:
+        st.session_state.user_role = None
+    if 'user_name' not in st.session_state:
+        st.session_state.user_name = None
+    if 'user_email' not in st.session_state:
+        st.session_state.user_email = None
+
+def get_password_hash(password, iterations=None):
+    """Criar hash seguro da senha
+
+    Formato: pbkdf2_sha256$<iterações>$<salt>$<hash>, com salt e hash em base64.
+    """
+    if iterations is None:
+        iterations = PASSWORD_HASH_ITERATIONS
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return "$".join([
+        PASSWORD_HASH_ALGORITHM,
+        str(iterations),
+        base64.b64encode(salt).decode('ascii'),
+        base64.b64encode(digest).decode('ascii')
+    ])
+
+def is_password_hashed(stored_password):
+    """Verifica se a senha armazenada já está no formato de hash"""
+    return isinstance(stored_password, str) and stored_password.startswith(PASSWORD_HASH_ALGORITHM + "$")
+
+def verify_password(password, stored_password):
+    """Verificar uma senha contra o valor armazenado (hash ou texto puro legado)"""
+    if not stored_password:
+        return False
+    
+    if not is_password_hashed(stored_password):
+        # Senha legada em texto puro
+        return hmac.compare_digest(password.encode('utf-8'), str(stored_password).encode('utf-8'))
+    
+    try:
+        _, iterations, salt, expected = stored_password.split("$")
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'),
+                                     base64.b64decode(salt), int(iterations))
+        return hmac.compare_digest(digest, base64.b64decode(expected))
+    except (ValueError, TypeError) as e:
+        print(f"Hash de senha inválido: {e}")
+        return False
+
+def password_needs_rehash(stored_password):
+    """Indica se a senha está em texto puro ou com fator de trabalho diferente do atual"""
+    if not is_password_hashed(stored_password):
+        return True
+    try:
+        return int(stored_password.split("$")[1]) != PASSWORD_HASH_ITERATIONS
+    except (IndexError, ValueError):
+        return True
+
+def _verification_cache_entry(user, password):
+    """Chave do cache de verificação (HMAC com segredo do processo, nunca a senha em si)"""
+    message = "\0".join([user['id'], user.get('password', ''), password]).encode('utf-8')
+    return hmac.new(_verification_cache_key, message, hashlib.sha256).digest()
+
+def check_user_password(user, password):
+    """Verificar a senha de um usuário, reutilizando verificações recentes em cache"""
+    key = _verification_cache_entry(user, password)
+    now = time.monotonic()
+    
+    expires_at = _verification_cache.get(key)
+    if expires_at is not None and expires_at > now:
+        return True
+    
+    if not verify_password(password, user.get('password')):
+        return False
+    
+    if len(_verification_cache) >= VERIFICATION_CACHE_MAX_ENTRIES:
+        # Remover entradas expiradas; se ainda estiver cheio, descartar a mais antiga
+        for expired in [k for k, exp in _verification_cache.items() if exp <= now]:
+            del _verification_cache[expired]
+        if len(_verification_cache) >= VERIFICATION_CACHE_MAX_ENTRIES:
+            del _verification_cache[next(iter(_verification_cache))]
+    _verification_cache[key] = now + VERIFICATION_CACHE_TTL
+    return True
+
+def get_users_version():
+    """Versão atual do arquivo de usuários (mtime + tamanho), usada como chave de cache"""
+    try:
+        stat = os.stat(USERS_FILE)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    except OSError:
+        return "missing"
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_user_store(users_version):
+    """Carregar os usuários uma vez por versão do arquivo, indexados por email e ID"""
+    users = _read_users_file().get('users', [])
+    store = {
+        "users": users,
+        "by_email": {user['email'].strip().lower(): user for user in users if user.get('email')},
+        "by_id": {user['id']: user for user in users}
+    }
+    store.update(build_membership_index(users))
+    return store
+
+def build_membership_index(users):
+    """Montar o índice bidirecional de vínculos cliente ↔ processo
+
+    Returns:
+        dict: "processes_by_client" (ID do cliente -> IDs dos processos) e
+              "clients_by_process" (ID do processo -> IDs dos clientes)
+    """
+    processes_by_client = {}
+    clients_by_process = {}
+    
+    for user in users:
+        if user.get('role') != 'client':
+            continue
+        process_ids = list(dict.fromkeys(user.get('processes') or []))
+        processes_by_client[user['id']] = process_ids
+        for process_id in process_ids:
+            clients_by_process.setdefault(process_id, []).append(user['id'])
+    
+    return {
+        "processes_by_client": processes_by_client,
+        "clients_by_process": clients_by_process
+    }
+
+def get_user_store():
+    """Obter o repositório de usuários indexado (recarregado apenas quando o arquivo muda)"""
+    ensure_passwords_hashed()
+    return _load_user_store(get_users_version())
+
+# Versão do arquivo de usuários já verificada por ensure_passwords_hashed
+_hashed_users_version = None
+
+def ensure_passwords_hashed():
+    """Converter senhas em texto puro uma vez por versão do arquivo
+
+    Fica fora de _load_user_store: a conversão grava o arquivo e limpa o cache, o
+    que não pode acontecer de dentro da função em cache.
+    """
+    global _hashed_users_version
+    if get_users_version() == _hashed_users_version:
+        return
+    load_users()
+    _hashed_users_version = get_users_version()
+
+def find_user(login):
+    """Localizar um usuário pelo email (sem diferenciar maiúsculas) ou pelo ID"""
+    store = get_user_store()
+    login = (login or "").strip()
+    return store["by_email"].get(login.lower()) or store["by_id"].get(login)
+
+def migrate_plaintext_passwords(users_data):
+    """Substituir senhas em texto puro por hashes. Retorna True se algo mudou."""
+    changed = False
+    for user in users_data.get('users', []):
+        if user.get('password') and not is_password_hashed(user['password']):
+            user['password'] = get_password_hash(user['password'])
+            changed = True
+    return changed
+
+def _read_users_file():
+    """Ler o arquivo de usuários (criando-o com o admin padrão se não existir), sem migrar senhas"""
+    if not os.path.exists(USERS_FILE):
+        # Criar arquivo com usuário admin padrão se não existir
+        admin_password = get_password_hash("admin123")
+        default_users = {
+            "users": [
+                {
+                    "id": "admin",
+                    "name": "Administrador",
+                    "email": "admin@jgr.com.br",
+                    "password": admin_password,
+                    "role": "admin",
+                    "created_at": datetime.now().isoformat()
+                }
+            ]
+        }
+        with open(USERS_FILE, 'w') as f:
+            json.dump(default_users, f, indent=4)
+        return default_users
+    
+    with open(USERS_FILE, 'r') as f:
+        return json.load(f)
+
+def load_users():
+    """Carregar usuários do arquivo"""
+    users_data = _read_users_file()
+    
+    # Arquivos antigos guardam senhas em texto puro: converter para hash uma única vez
+    if migrate_plaintext_passwords(users_data):
+        print("Senhas em texto puro convertidas para hash em users.json")
+        save_users(users_data)
+    
+    return users_data
+
+def save_users(users_data):
+    """Salvar usuários no arquivo"""
+    with open(USERS_FILE, 'w') as f:
+        json.dump(users_data, f, indent=4)
+    _load_user_store.clear()
+
+def authenticate(username, password):
+    """Autenticar usuário"""
+    user = find_user(username)
+    
+    if user is None or not check_user_password(user, password):
+        return False
+    
+    # Atualizar hashes legados ou com fator de trabalho diferente do configurado
+    if password_needs_rehash(user.get('password')):
+        update_user(user['id'], password=password)
+    
+    st.session_state.authenticated = True
+    st.session_state.user_id = user['id']
+    st.session_state.user_role = user['role']
+    st.session_state.user_name = user['name']
+    st.session_state.user_email = user['email']
+    
+    return True
+
+def logout():
+    """Fazer logout do usuário"""
+    st.session_state.authenticated = False
+    st.session_state.user_id = None
+    st.session_state.user_role = None
+    st.session_state.user_name = None
+    st.session_state.user_email = None
+
+def add_user(name, email, password, role='client', processes=None):
+    """Adicionar novo usuário"""
+    users_data = load_users()
+    
+    # Verificar se email já existe
+    if find_user(email) is not None:
+        return False, "Email já cadastrado"
+    
+    # Gerar ID único para o usuário
+    user_id = str(uuid.uuid4())[:8]
+    
+    # Criar novo usuário
+    new_user = {
+        "id": user_id,
+        "name": name,
+        "email": email,
+        "password": get_password_hash(password),
+        "role": role,
+        "created_at": datetime.now().isoformat()
+    }
+    
+    # Adicionar processos se for cliente
+    if role == 'client' and processes:
+        new_user['processes'] = processes
+    
+    # Adicionar à lista
+    users_data['users'].append(new_user)
+    save_users(users_data)
+    
+    return True, "Usuário adicionado com sucesso"
+
+def update_user(user_id, name=None, email=None, password=None, role=None, processes=None):
+    """Atualizar usuário existente"""
+    users_data = load_users()
+    
+    for i, user in enumerate(users_data.get('users', [])):
+        if user['id'] == user_id:
+            if name:
+                users_data['users'][i]['name'] = name
+            if email:
+                users_data['users'][i]['email'] = email
+            if password:
+                users_data['users'][i]['password'] = get_password_hash(password)
+            if role:
+                users_data['users'][i]['role'] = role
+            if processes is not None:  # Permitir lista vazia
+                users_data['users'][i]['processes'] = processes
+            
+            users_data['users'][i]['updated_at'] = datetime.now().isoformat()
+            save_users(users_data)
+            return True, "Usuário atualizado com sucesso"
+    
+    return False, "Usuário não encontrado"
+
+def delete_user(user_id):
+    """Excluir usuário"""
+    users_data = load_users()
+    
+    for i, user in enumerate(users_data.get('users', [])):
+        if user['id'] == user_id:
+            # Não permitir excluir o último admin
+            if user['role'] == 'admin' and sum(1 for u in users_data.get('users', []) if u['role'] == 'admin') <= 1:
+                return False, "Não é possível excluir o último administrador"
+            
+            users_data['users'].pop(i)
+            save_users(users_data)
+            return True, "Usuário excluído com sucesso"
+    
+    return False, "Usuário não encontrado"
+
+def get_users():
+    """Obter lista de usuários (somente leitura, em cache até o arquivo mudar)"""
+    return get_user_store()["users"]
+
+def assign_processes_to_client(user_id, process_ids):
+    """Atribuir processos a um cliente"""
+    users_data = load_users()
+    
+    for i, user in enumerate(users_data.get('users', [])):
+        if user['id'] == user_id and user['role'] == 'client':
+            users_data['users'][i]['processes'] = process_ids
+            save_users(users_data)
+            return True, "Processos atribuídos com sucesso"
+    
+    return False, "Usuário não encontrado ou não é cliente"
+
+def get_client_process_ids(user_id):
+    """Obter os IDs dos processos vinculados a um cliente (pelo índice de vínculos)"""
+    return get_user_store()["processes_by_client"].get(user_id, [])
+
+def get_process_client_ids(process_id):
+    """Obter os IDs dos clientes vinculados a um processo (pelo índice de vínculos)"""
+    return get_user_store()["clients_by_process"].get(process_id, [])
+
+def client_has_process(user_id, process_id):
+    """Verifica se o processo está vinculado ao cliente"""
+    return user_id in get_process_client_ids(process_id)
+
+def get_client_for_process(process_id):
+    """Obter cliente associado a um processo"""
+    client_ids = get_process_client_ids(process_id)
+    if not client_ids:
+        return None
+    return get_user_store()["by_id"].get(client_ids[0])
+
+def remove_process_from_clients(process_id):
+    """Remover um processo excluído dos vínculos de todos os clientes
+
+    Apenas os clientes que o índice aponta como vinculados são alterados.
+    """
+    client_ids = set(get_process_client_ids(process_id))
+    if not client_ids:
+        return False
+    
+    users_data = load_users()
+    for user in users_data.get('users', []):
+        if user['id'] in client_ids:
+            user['processes'] = [p for p in user.get('processes', []) if p != process_id]
+    save_users(users_data)
+    return True
+
+@timed("display_login")
+def display_login():
+    """Exibir página de login"""
+    st.header("Login")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        try:
+            st.image("assets/images/jgr_logo.png", width=200)
+        except:
+            st.write("**JGR BROKER**")
+    
+    with col2:
+        with st.form("login_form"):
+            username = st.text_input("Email ou Usuário")
+            password = st.text_input("Senha", type="password")
+            submit = st.form_submit_button("Entrar", use_container_width=True)
+            
+            if submit:
+                if authenticate(username, password):
+                    st.success(f"Bem-vindo, {st.session_state.user_name}!")
+                    st.rerun()
+                else:
+                    st.error("Usuário ou senha incorretos")
+
+@timed("display_user_management")
+def display_user_management():
+    """Exibir gerenciamento de usuários (apenas para admin)"""
+    if st.session_state.user_role != 'admin':
+        st.error("Acesso não autorizado")
+        return
+    
+    st.header("Gerenciamento de Usuários")
+    
+    # Exibir lista de usuários
+    users = get_users()
+    
+    # Opção para adicionar novo usuário
+    st.subheader("Adicionar Novo Usuário")
+    with st.form("add_user_form"):
+        name = st.text_input("Nome")
+        email = st.text_input("Email")
+        password = st.text_input("Senha", type="password")
+        role = st.selectbox("Tipo", options=["admin", "client"], format_func=lambda x: "Administrador" if x == "admin" else "Cliente")
+        
+        # Se for cliente, exibir opção para vincular processos
+        process_ids = []
+        if role == 'client':
+            from data import get_processes_df
+            processes_df = get_processes_df()
+            if not processes_df.empty:
+                available_processes = processes_df['id'].tolist()
+                process_ids = st.multiselect("Processos", options=available_processes)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            submit = st.form_submit_button("Adicionar", use_container_width=True)
+        
+        with col2:
+            st.form_submit_button("Cancelar", use_container_width=True)
+    
+    if submit and name and email and password:
+        success, message = add_user(name, email, password, role, process_ids)
+        if success:
+            st.success(message)
+            st.rerun()
+        else:
+            st.error(message)
+    
+    # Exibir lista de usuários
+    st.subheader("Usuários Cadastrados")
+    if not users:
+        st.info("Nenhum usuário cadastrado")
+    else:
+        col1, col2, col3, col4 = st.columns([2, 3, 2, 1])
+        
+        with col1:
+            st.markdown("**Usuário**")
+        
+        with col2:
+            st.markdown("**Email**")
+        
+        with col3:
+            st.markdown("**Tipo**")
+        
+        with col4:
+            st.markdown("**Ações**")
+        
+        st.divider()
+        
+        for user in users:
+            col1, col2, col3, col4 = st.columns([2, 3, 2, 1])
+            
+            with col1:
+                st.markdown(user['name'])
+            
+            with col2:
+                st.markdown(user['email'])
+            
+            with col3:
+                st.markdown("Administrador" if user['role'] == 'admin' else "Cliente")
+            
+            with col4:
+                if st.button("Editar", key=f"edit_{user['id']}"):
+                    st.session_state.edit_user_id = user['id']
+                    st.rerun()
+    
+    # Formulário de edição de usuário
+    if 'edit_user_id' in st.session_state and st.session_state.edit_user_id:
+        user_to_edit = next((u for u in users if u['id'] == st.session_state.edit_user_id), None)
+        
+        if user_to_edit:
+            st.subheader(f"Editar Usuário: {user_to_edit['name']}")
+            
+            with st.form("edit_user_form"):
+                name = st.text_input("Nome", value=user_to_edit.get('name', ''))
+                email = st.text_input("Email", value=user_to_edit.get('email', ''))
+                password = st.text_input("Nova Senha (deixe em branco para manter a atual)", type="password")
+                role = st.selectbox("Tipo", options=["admin", "client"], 
+                                      index=0 if user_to_edit.get('role') == 'admin' else 1,
+                                      format_func=lambda x: "Administrador" if x == "admin" else "Cliente")
+                
+                # Se for cliente, exibir opção para vincular processos
+                process_ids = user_to_edit.get('processes', [])
+                if role == 'client':
+                    from data import get_processes_df
+                    processes_df = get_processes_df()
+                    if not processes_df.empty:
+                        available_processes = processes_df['id'].tolist()
+                        # Filtrar apenas os processos que ainda existem
+                        default_processes = [p for p in process_ids if p in available_processes]
+                        process_ids = st.multiselect("Processos", options=available_processes, default=default_processes)
+                
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    update_btn = st.form_submit_button("Atualizar", use_container_width=True)
+                
+                with col2:
+                    delete_btn = st.form_submit_button("Excluir", use_container_width=True)
+                
+                with col3:
+                    cancel_btn = st.form_submit_button("Cancelar", use_container_width=True)
+            
+            if update_btn and name and email:
+                success, message = update_user(
+                    st.session_state.edit_user_id, 
+                    name=name, 
+                    email=email, 
+                    password=password if password else None,
+                    role=role,
+                    processes=process_ids if role == 'client' else []
+                )
+                
+                if success:
+                    st.success(message)
+                    st.session_state.edit_user_id = None
+                    st.rerun()
+                else:
+                    st.error(message)
+            
+            if delete_btn:
+                success, message = delete_user(st.session_state.edit_user_id)
+                
+                if success:
+                    st.success(message)
+                    st.session_state.edit_user_id = None
+                    st.rerun()
+                else:
+                    st.error(message)
+            
+            if cancel_btn:
+                st.session_state.edit_user_id = None
+                st.rerun()
\ No newline at end of file
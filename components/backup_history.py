@@ -0,0 +1,131 @@
+import streamlit as st
+from datetime import datetime
+import backups
+from data import get_archived_index, get_process_by_id, snapshot_process
+from instrumentation import timed
+
+CURRENT_STATE = "atual"
+
+CHANGE_LABELS = {
+    "incluido": "Incluído",
+    "excluido": "Excluído",
+    "alterado": "Alterado",
+    "arquivado": "Arquivado",
+    "reativado": "Reativado",
+}
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def _snapshot_label(snapshot_id):
+    """Data e rótulo de um backup (manifestos não mudam depois de criados)"""
+    created = datetime.strptime(snapshot_id[:15], "%Y%m%d_%H%M%S").strftime("%d/%m/%Y %H:%M:%S")
+    label = backups.load_snapshot(snapshot_id).get("label")
+    return f"{created} ({label})" if label else created
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def _diff_snapshots(old_id, new_id):
+    # Só entre backups: o estado atual muda e é comparado a cada pedido
+    return backups.diff_snapshots(old_id, new_id)
+
+@st.cache_data(show_spinner=False, max_entries=100)
+def _load_snapshot_process(snapshot_id, process_id):
+    return backups.load_process(snapshot_id, process_id)
+
+def _load_process(snapshot_id, process_id):
+    """Processo em um backup ou, com snapshot_id=None, o atual (dos dados já carregados na sessão)"""
+    if snapshot_id is not None:
+        return _load_snapshot_process(snapshot_id, process_id)
+    process = get_process_by_id(process_id) or get_archived_index().get(process_id)
+    return snapshot_process(process) if process is not None else None
+
+def _format_value(value):
+    if isinstance(value, list):
+        return f"{len(value)} item(ns)"
+    if value is None:
+        return ""
+    return str(value)
+
+@timed("display_backup_history")
+def display_backup_history():
+    """Histórico de backups: o que mudou entre dois backups e restauração de um único processo"""
+    st.subheader("Histórico de Backups")
+
+    snapshot_ids = backups.snapshot_ids()
+    if not snapshot_ids:
+        st.info("Nenhum backup encontrado. O agendador cria um backup por hora.")
+        return
+
+    newest_first = list(reversed(snapshot_ids))
+    col1, col2 = st.columns(2)
+    with col1:
+        old_id = st.selectbox("Comparar o backup de", newest_first, format_func=_snapshot_label)
+    with col2:
+        new_id = st.selectbox(
+            "com",
+            [CURRENT_STATE] + [snapshot_id for snapshot_id in newest_first if snapshot_id > old_id],
+            format_func=lambda option: "Estado atual dos dados" if option == CURRENT_STATE else _snapshot_label(option)
+        )
+    new_id = None if new_id == CURRENT_STATE else new_id
+
+    if new_id is None:
+        # O estado atual muda a todo momento (e lê os arquivos de dados): comparado só quando pedido
+        if st.button("Comparar com o estado atual"):
+            with st.spinner("Comparando..."):
+                st.session_state.backup_diff = (old_id, backups.diff_snapshots(old_id))
+        diff = st.session_state.get("backup_diff")
+        if diff is None or diff[0] != old_id:
+            return
+        changes = diff[1]
+    else:
+        changes = _diff_snapshots(old_id, new_id)
+
+    if not changes:
+        st.success("Nenhum processo diferente entre os dois pontos.")
+        return
+
+    counts = {}
+    for change in changes.values():
+        counts[change] = counts.get(change, 0) + 1
+    metric_cols = st.columns(len(CHANGE_LABELS))
+    for col, (change, label) in zip(metric_cols, CHANGE_LABELS.items()):
+        col.metric(label, counts.get(change, 0))
+
+    selected_changes = st.multiselect("Mudanças", list(CHANGE_LABELS), default=list(CHANGE_LABELS),
+                                      format_func=CHANGE_LABELS.get)
+    rows = [
+        {"processo": process_id, "mudanca": CHANGE_LABELS[change]}
+        for process_id, change in sorted(changes.items()) if change in selected_changes
+    ]
+    st.dataframe(rows, use_container_width=True, hide_index=True,
+                 column_config={"processo": "Processo", "mudanca": "Mudança"})
+
+    if not rows:
+        return
+
+    process_id = st.selectbox("Ver alterações do processo", [row["processo"] for row in rows])
+    old_process = _load_process(old_id, process_id)
+    new_process = _load_process(new_id, process_id)
+    fields = backups.diff_process(old_process, new_process)
+    if fields:
+        st.dataframe(
+            [{"campo": field, "antes": _format_value(before), "depois": _format_value(after)}
+             for field, (before, after) in fields.items()],
+            use_container_width=True,
+            hide_index=True,
+            column_config={"campo": "Campo", "antes": "Antes", "depois": "Depois"}
+        )
+    else:
+        st.caption("Só a partição (ativo/arquivado) ou a revisão interna mudou.")
+
+    if old_process is None:
+        st.info("O processo não existia no backup de origem; não há o que restaurar.")
+        return
+
+    if st.button(f"Restaurar {process_id} como estava em {_snapshot_label(old_id)}"):
+        try:
+            target = backups.restore_process(old_id, process_id)
+        except Exception as e:
+            st.error(f"Erro ao restaurar processo: {e}")
+        else:
+            # Só este processo muda no arquivo: as sessões abertas recarregam apenas ele
+            st.session_state.pop("backup_diff", None)
+            st.success(f"Processo {process_id} restaurado ({'arquivados' if target == backups.BACKED_UP_FILES[1] else 'ativos'}).")
@@ -1,17 +1,41 @@
 import streamlit as st
-import pandas as pd
-from data import get_process_by_id
+from data import load_client_process, get_data_version
 from utils import format_date, get_status_color
 from components.event_log import display_event_log
+from instrumentation import timed
 
+# Campos de data exibidos na visualização do cliente
+CLIENT_DATE_FIELDS = ["eta", "last_update", "arrival_date", "return_date"]
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def build_client_view(process_id, data_version):
+    """Prepara os dados da visualização do cliente, em cache por (processo, versão dos dados)
+
+    Vários clientes atualizando o mesmo link reutilizam o resultado até que
+    data.json seja alterado.
+    """
+    process = load_client_process(process_id, data_version)
+    if process is None:
+        return None
+    
+    return {
+        "process": process,
+        "status_color": get_status_color(process.get('status', 'Em andamento')),
+        "dates": {field: format_date(process.get(field, '')) for field in CLIENT_DATE_FIELDS}
+    }
+
+@timed("display_client_view")
 def display_client_view(process_id):
     """Display a client-facing view of a process"""
-    process = get_process_by_id(process_id)
+    view = build_client_view(process_id, get_data_version())
     
-    if process is None:
+    if view is None:
         st.error("Processo não encontrado!")
         return
     
+    process = view["process"]
+    dates = view["dates"]
+    
     # Title with process ID and status
     col1, col2 = st.columns([3, 1])
     
@@ -21,7 +45,7 @@ def display_client_view(process_id):
     
     with col2:
         status = process.get('status', 'Em andamento')
-        status_color = get_status_color(status)
+        status_color = view["status_color"]
         st.markdown(f"""
         <div style="background-color: {status_color}; color: white; padding: 10px; 
         border-radius: 5px; text-align: center; font-weight: bold;">
@@ -58,14 +82,14 @@ def display_client_view(process_id):
             st.markdown(process.get('type', ''))
             
             st.markdown("**ETA:**")
-            st.markdown(format_date(process.get('eta', '')))
+            st.markdown(dates['eta'])
         
         with col3:
             st.markdown("**Status:**")
             st.markdown(process.get('status', ''))
             
             st.markdown("**Última Atualização:**")
-            st.markdown(format_date(process.get('last_update', '')))
+            st.markdown(dates['last_update'])
         
         st.divider()
         
@@ -90,7 +114,7 @@ def display_client_view(process_id):
         
         with col3:
             st.markdown("**Previsão de Chegada:**")
-            st.markdown(format_date(process.get('arrival_date', '')))
+            st.markdown(dates['arrival_date'])
             
             st.markdown("**Container:**")
             st.markdown(process.get('container', ''))
@@ -118,7 +142,7 @@ def display_client_view(process_id):
         
         with col3:
             st.markdown("**Data de Devolução:**")
-            st.markdown(format_date(process.get('return_date', '')))
+            st.markdown(dates['return_date'])
         
         st.divider()
         
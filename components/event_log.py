@@ -1,40 +1,76 @@
 import streamlit as st
-import pandas as pd
+from events import TIMESTAMP_FORMAT, event_timestamp, is_sorted
+from datetime import datetime
+
+# Eventos por página do histórico
+EVENTS_PER_PAGE = 20
+
+def _event_when(event):
+    """Data (e hora, quando registrada) do evento para exibição"""
+    timestamp = event.get("timestamp")
+    if timestamp and not timestamp.endswith("T00:00:00"):
+        try:
+            return datetime.strptime(timestamp, TIMESTAMP_FORMAT).strftime("%d/%m/%Y %H:%M")
+        except ValueError:
+            pass
+    return event.get("date", "")
 
 def display_event_log(process):
-    """Display the event log for a process"""
+    """Display the event log for a process
+
+    Os eventos já ficam gravados em ordem cronológica (ver events.py): a lista só é
+    invertida (mais recentes primeiro), filtrada e exibida uma página por vez.
+    """
     st.subheader("Histórico de Eventos")
-    
+
     events = process.get("events", [])
-    
+
     if not events:
         st.info("Nenhum evento registrado para este processo.")
         return
-    
-    # Convert events to dataframe for display
-    events_df = pd.DataFrame(events)
-    
-    # Make sure columns exist
-    if "date" not in events_df.columns:
-        events_df["date"] = ""
-    if "description" not in events_df.columns:
-        events_df["description"] = ""
-    if "user" not in events_df.columns:
-        events_df["user"] = ""
-    
-    # Sort events by date (most recent first)
-    events_df = events_df.sort_values(by="date", ascending=False)
-    
-    # Display events in a timeline format
-    for i, event in events_df.iterrows():
-        with st.container():
-            col1, col2 = st.columns([1, 4])
-            
-            with col1:
-                st.markdown(f"**{event['date']}**")
-                st.caption(f"Usuário: {event['user']}")
-            
-            with col2:
-                st.markdown(f"{event['description']}")
-            
-        st.divider()
+
+    # Dados gravados por scripts externos podem não estar em ordem
+    if not is_sorted(events):
+        events = sorted(events, key=event_timestamp)
+
+    key = f"event_log_{process.get('id', '')}"
+    users = sorted({event.get("user") or "" for event in events} - {""})
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        search = st.text_input("Buscar nos eventos", key=f"{key}_search")
+    with col2:
+        selected_users = st.multiselect("Usuário", users, key=f"{key}_users")
+
+    search = search.strip().casefold()
+    selected_users = set(selected_users)
+    filtered = [
+        event for event in reversed(events)
+        if (not selected_users or (event.get("user") or "") in selected_users)
+        and (not search or search in (event.get("description") or "").casefold())
+    ]
+
+    if not filtered:
+        st.info("Nenhum evento encontrado com os filtros selecionados.")
+        return
+
+    pages = (len(filtered) + EVENTS_PER_PAGE - 1) // EVENTS_PER_PAGE
+    page = 1
+    if pages > 1:
+        # Filtro mudou e a página guardada deixou de existir
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = 1
+        page = st.number_input("Página", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    start = (page - 1) * EVENTS_PER_PAGE
+    page_events = filtered[start:start + EVENTS_PER_PAGE]
+
+    st.caption(f"Eventos {start + 1}–{start + len(page_events)} de {len(filtered)}"
+               + (f" (filtrados de {len(events)})" if len(filtered) != len(events) else ""))
+
+    # Uma página inteira em um único bloco de texto (em vez de contêiner, colunas e
+    # divisória por evento)
+    st.markdown("\n\n---\n\n".join(
+        f"**{_event_when(event)}** · :gray[Usuário: {event.get('user', '')}]  \n"
+        f"{event.get('description', '')}"
+        for event in page_events
+    ))
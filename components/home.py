@@ -1,10 +1,16 @@
 import streamlit as st
-import pandas as pd
-from data import get_processes_df, get_process_by_id, delete_process
+from data import get_processes_df, delete_process, archive_process, date_columns, format_processes_frame
 from utils import export_to_excel, export_to_csv, get_status_color
+from instrumentation import timed
 
-def display_home(navigate_function):
-    """Display the home page with the processes table"""
+@timed("display_home")
+def display_home(navigate_function, filter_ids=None):
+    """Display the home page with the processes table
+    
+    Args:
+        navigate_function: Function to navigate between pages
+        filter_ids: Optional list of process IDs to show (for client dashboards)
+    """
     st.header("Processos de Importação")
     
     # Search and filter section
@@ -22,19 +28,20 @@ def display_home(navigate_function):
         date_range = st.date_input("Período", value=[], help="Selecione um intervalo de datas")
     
     # Get processes data
-    df = get_processes_df()
+    df = get_processes_df(process_ids=filter_ids)
     
     if df.empty:
         st.info("Nenhum processo encontrado. Adicione um novo processo clicando em 'Novo Processo'.")
         return
     
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters (as datas são buscadas como aparecem na tela, DD/MM/AAAA)
+    filtered_df = df
     
     if search_term:
+        searchable_df = format_processes_frame(filtered_df)
         filter_condition = False
-        for col in filtered_df.columns:
-            filter_condition |= filtered_df[col].astype(str).str.contains(search_term, case=False, na=False)
+        for col in searchable_df.columns:
+            filter_condition |= searchable_df[col].astype(str).str.contains(search_term, case=False, na=False)
         filtered_df = filtered_df[filter_condition]
     
     if status_filter:
@@ -64,25 +71,30 @@ def display_home(navigate_function):
         color = get_status_color(val)
         return f'background-color: {color}; color: white; border-radius: 4px; padding: 0.2rem; text-align: center'
     
+    column_config = {
+        "id": "Código",
+        "ref": "Referência",
+        "invoice": "Invoice",
+        "origin": "Origem",
+        "type": "Tipo",
+        "eta": "ETA",
+        "status": "Status",
+        "observations": "Observações",
+        "last_update": "Última Atualização"
+    }
+    # Colunas de data são datetime64: exibir no padrão brasileiro
+    for col in date_columns(filtered_df):
+        column_config[col] = st.column_config.DateColumn(column_config.get(col, col), format="DD/MM/YYYY")
+    
     # Display dataframe with styling (using .map instead of .applymap which is deprecated)
     st.dataframe(
         filtered_df.style.map(
             lambda x: color_status(x) if x in ["Em andamento", "Concluído", "Atrasado", "Pendente", "Cancelado"] else '',
             subset=['status']
-        ),
+        ).format("{:%d/%m/%Y}", subset=date_columns(filtered_df), na_rep=""),
         use_container_width=True,
         height=400,
-        column_config={
-            "id": "Código",
-            "ref": "Referência",
-            "invoice": "Invoice",
-            "origin": "Origem",
-            "type": "Tipo",
-            "eta": "ETA",
-            "status": "Status",
-            "observations": "Observações",
-            "last_update": "Última Atualização"
-        }
+        column_config=column_config
     )
     
     # Action buttons for each row
@@ -100,8 +112,18 @@ def display_home(navigate_function):
     with col3:
         if st.button("✏️ Editar Processo", use_container_width=True):
             st.session_state.edit_mode = True
+            st.session_state.pop("edit_base", None)
             navigate_function("add_edit", process_id)
     
+    # Arquivar: o processo sai do painel e vai para a página Arquivados
+    if st.session_state.get("user_role") == "admin":
+        if st.button("📦 Arquivar Processo", use_container_width=True):
+            if archive_process(process_id):
+                st.success("Processo arquivado com sucesso!")
+                st.rerun()
+            else:
+                st.error("Erro ao arquivar processo.")
+    
     # Delete process option (with confirmation)
     if st.button("🗑️ Excluir Processo", use_container_width=True):
         st.warning("Tem certeza que deseja excluir este processo? Esta ação não pode ser desfeita.")
@@ -0,0 +1,77 @@
+import streamlit as st
+import instrumentation
+
+def display_performance():
+    """Exibir painel de desempenho (apenas para admin)"""
+    if st.session_state.user_role != 'admin':
+        st.error("Acesso não autorizado")
+        return
+
+    st.header("Desempenho")
+    st.caption(
+        "Tempos das operações instrumentadas (carregamento/gravação de dados, telas e exportações) "
+        "desde o início do servidor. Os percentis consideram as chamadas mais recentes "
+        f"(até {instrumentation.INSTRUMENTATION_BUFFER_SIZE})."
+    )
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+
+    with col1:
+        enabled = st.toggle(
+            "Coletar medições",
+            value=instrumentation.is_enabled(),
+            help="Vale para todas as sessões. Também pode ser ligado com APP_INSTRUMENTATION=1."
+        )
+        if enabled != instrumentation.is_enabled():
+            instrumentation.set_enabled(enabled)
+            st.rerun()
+
+    with col2:
+        uptime_min = instrumentation.uptime_seconds() / 60
+        st.metric("Tempo no ar", f"{uptime_min / 60:.1f} h" if uptime_min >= 60 else f"{uptime_min:.0f} min")
+
+    with col3:
+        if st.button("🧹 Limpar medições", use_container_width=True):
+            instrumentation.reset()
+            st.rerun()
+
+    rows = instrumentation.summary()
+    if not rows:
+        if instrumentation.is_enabled():
+            st.info("Nenhuma medição registrada ainda. Navegue pelo sistema e volte a esta página.")
+        else:
+            st.info("A coleta está desligada. Ative-a acima para começar a medir.")
+        return
+
+    st.subheader("Por operação")
+    st.dataframe(
+        rows,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "operacao": "Operação",
+            "chamadas": "Chamadas",
+            "erros": "Erros",
+            "total_s": st.column_config.NumberColumn("Total (s)", format="%.3f"),
+            "media_ms": st.column_config.NumberColumn("Média (ms)", format="%.1f"),
+            "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+            "p99_ms": st.column_config.NumberColumn("p99 (ms)", format="%.1f"),
+            "max_ms": st.column_config.NumberColumn("Máx. (ms)", format="%.1f"),
+            "bytes": "Bytes gravados"
+        }
+    )
+
+    st.subheader("Chamadas mais lentas")
+    st.dataframe(
+        instrumentation.slowest(20),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "quando": "Quando",
+            "operacao": "Operação",
+            "ms": st.column_config.NumberColumn("Tempo (ms)", format="%.1f"),
+            "bytes": "Bytes",
+            "erro": "Erro"
+        }
+    )
@@ -1,13 +1,14 @@
 import streamlit as st
 import os
-from data import load_data, save_data
+from instrumentation import timed
 
+@timed("display_settings")
 def display_settings():
     """Display settings page for configuring email and SMS"""
     st.header("Configurações")
     
     # Create tabs for different settings
-    tab1, tab2, tab3 = st.tabs(["Email", "SMS", "Configurações Gerais"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Email", "SMS", "Configurações Gerais", "Histórico de Backups"])
     
     # Tab 1: Email Settings
     with tab1:
@@ -63,7 +64,8 @@ def display_settings():
                 result = send_email(
                     test_email, 
                     "Teste de Configuração de Email", 
-                    "Este é um email de teste do Sistema de Acompanhamento de Importação."
+                    "Este é um email de teste do Sistema de Acompanhamento de Importação.",
+                    wait=True
                 )
                 
                 if result:
@@ -108,7 +110,8 @@ def display_settings():
                 from utils import send_sms
                 result = send_sms(
                     test_phone, 
-                    "Teste do Sistema de Acompanhamento de Importação."
+                    "Teste do Sistema de Acompanhamento de Importação.",
+                    wait=True
                 )
                 
                 if result:
@@ -146,45 +149,47 @@ def display_settings():
         col1, col2 = st.columns(2)
         
         with col1:
+            from datetime import datetime
+            from backup_file import export_backup
+            
+            # Gerado só no clique (arquivo gzip com um processo por linha, ver backup_file.py).
+            # O download_button só existe na execução que gerou o arquivo: os bytes não ficam
+            # na sessão e são descartados no rerun seguinte ao download
             if st.button("Fazer Backup dos Dados", use_container_width=True):
-                import json
-                import base64
-                from datetime import datetime
-                
-                # Get data
-                data = load_data()
-                
-                # Convert to JSON string
-                json_str = json.dumps(data, indent=4)
-                
-                # Create download link
-                b64 = base64.b64encode(json_str.encode()).decode()
-                date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"backup_importacao_{date_str}.json"
-                
-                href = f'<a href="data:application/json;base64,{b64}" download="{filename}">Clique para baixar o arquivo de backup</a>'
-                st.markdown(href, unsafe_allow_html=True)
-                
-                st.success("Backup gerado com sucesso!")
+                with st.spinner("Gerando backup..."):
+                    date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    with export_backup() as backup:
+                        content = backup.read()
+                st.download_button(
+                    "Baixar Backup",
+                    data=content,
+                    file_name=f"backup_importacao_{date_str}.json.gz",
+                    mime="application/gzip",
+                    use_container_width=True
+                )
         
         with col2:
-            uploaded_file = st.file_uploader("Restaurar a partir de Backup", type=["json"])
+            uploaded_file = st.file_uploader("Restaurar a partir de Backup", type=["gz", "json"])
             
-            if uploaded_file is not None:
+            if uploaded_file is not None and st.button("Confirmar Restauração"):
+                from backup_file import InvalidBackupError, restore_backup
                 try:
-                    import json
-                    content = uploaded_file.read().decode()
-                    data = json.loads(content)
-                    
-                    if st.button("Confirmar Restauração"):
-                        # Validate data structure
-                        if "processes" in data:
-                            # Save the data
-                            save_data(data)
-                            st.session_state.data = data
-                            st.success("Dados restaurados com sucesso!")
-                            st.rerun()
-                        else:
-                            st.error("Arquivo de backup inválido!")
+                    # Validado processo a processo; só substitui os dados se o arquivo inteiro for válido
+                    with st.spinner("Restaurando backup..."):
+                        restored = restore_backup(uploaded_file)
+                except InvalidBackupError as e:
+                    st.error(f"Arquivo de backup inválido: {e.total} erro(s). Os dados não foram alterados.")
+                    st.code("\n".join(e.errors), language=None)
                 except Exception as e:
-                    st.error(f"Erro ao processar arquivo: {e}")
\ No newline at end of file
+                    st.error(f"Erro ao processar arquivo: {e}")
+                else:
+                    # Recarregada do arquivo no próximo rerun (registros compactos, ver sync_session_data)
+                    st.session_state.pop("data", None)
+                    st.success(f"Dados restaurados com sucesso! {restored['processes']} processo(s) "
+                               f"e {restored['archived']} arquivado(s).")
+                    st.rerun()
+    
+    # Tab 4: Histórico de backups (diferenças e restauração de um processo)
+    with tab4:
+        from components.backup_history import display_backup_history
+        display_backup_history()
@@ -1,13 +1,13 @@
 import streamlit as st
-import pandas as pd
 import uuid
 import json
 import os
 from datetime import datetime, timedelta
-import base64
 
-from data import get_process_by_id, get_processes_df, save_data
-from utils import send_email, send_sms
+# data, utils e pandas são importados nas funções da tela de compartilhamento:
+# o caminho rápido dos links (?token=, ver app.py) só usa validate_share_token
+from instrumentation import timed
+from metrics import TOKEN_VALIDATIONS
 
 # Path to store share links
 SHARE_FILE = "shared_links.json"
@@ -53,17 +53,35 @@ def generate_share_link(process_id, expiry_days=30):
     # Return the token
     return token
 
+def get_shared_links_version():
+    """Return the current version (mtime + size) of the share links file"""
+    try:
+        stat = os.stat(SHARE_FILE)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    except OSError:
+        return "missing"
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_active_token_index(links_version):
+    """Index active share links by token, cached per links file version"""
+    return {
+        link["token"]: link
+        for link in load_shared_links()["links"]
+        if link.get("is_active")
+    }
+
 def validate_share_token(token):
     """Validate a share token and return the process ID if valid"""
-    links_data = load_shared_links()
+    link = _load_active_token_index(get_shared_links_version()).get(token)
     
-    for link in links_data["links"]:
-        if link["token"] == token and link["is_active"]:
-            # Check if expired
-            expiry_date = datetime.strptime(link["expiry_date"], "%Y-%m-%d")
-            if expiry_date >= datetime.now():
-                return link["process_id"]
+    if link:
+        # Check if expired
+        expiry_date = datetime.strptime(link["expiry_date"], "%Y-%m-%d")
+        if expiry_date >= datetime.now():
+            TOKEN_VALIDATIONS.inc(result="valid")
+            return link["process_id"]
     
+    TOKEN_VALIDATIONS.inc(result="invalid")
     return None
 
 def revoke_share_link(token):
@@ -80,6 +98,8 @@ def revoke_share_link(token):
 
 def get_active_links():
     """Get all active share links"""
+    from data import get_process_by_id
+    
     links_data = load_shared_links()
     active_links = [link for link in links_data["links"] if link["is_active"]]
     
@@ -92,8 +112,13 @@ def get_active_links():
     
     return active_links
 
+@timed("display_share_interface")
 def display_share_interface():
     """Display the interface for sharing processes"""
+    import pandas as pd
+    from data import get_processes_df
+    from utils import send_email, send_sms_batch
+    
     st.header("Compartilhar Processos com Clientes")
     
     # Get processes
@@ -167,7 +192,6 @@ def display_share_interface():
             email = st.text_input("Email do cliente")
             subject = st.text_input("Assunto", value=f"Atualização sobre seu processo de importação {process_id}")
             
-            process = get_process_by_id(process_id)
             default_message = f"""
 Prezado Cliente,
 
@@ -188,14 +212,15 @@ Equipe de Importação
                 if email and subject and message:
                     result = send_email(email, subject, message)
                     if result:
-                        st.success("Email enviado com sucesso!")
+                        # A entrega é feita em segundo plano: aqui só se sabe que entrou na fila
+                        st.success("Email colocado na fila de envio! A entrega é feita em segundo plano.")
                     else:
-                        st.error("Falha ao enviar email. Verifique as configurações.")
+                        st.error("Não foi possível colocar o email na fila. Verifique as configurações.")
                 else:
                     st.warning("Preencha todos os campos obrigatórios.")
         
         with tab2:
-            phone = st.text_input("Número de telefone do cliente (com código do país, ex: +5511912345678)")
+            phone = st.text_input("Número(s) de telefone do cliente (com código do país, ex: +5511912345678; separe vários por vírgula)")
             
             default_sms = f"Processo de importação {process_id} atualizado. Acesse: {share_url}"
             sms_message = st.text_area("Mensagem SMS (máx. 160 caracteres)", 
@@ -204,10 +229,12 @@ Equipe de Importação
                                     height=100)
             
             if st.button("Enviar por SMS"):
-                if phone and sms_message:
-                    result = send_sms(phone, sms_message)
-                    if result:
-                        st.success("SMS enviado com sucesso!")
+                phones = [p.strip() for p in phone.split(",") if p.strip()]
+                if phones and sms_message:
+                    # Envio em segundo plano, respeitando o limite de taxa configurado
+                    sent = send_sms_batch(phones, sms_message)
+                    if sent:
+                        st.success(f"{sent} SMS colocado(s) na fila de envio!")
                     else:
                         st.error("Falha ao enviar SMS. Verifique as configurações e se o serviço Twilio está configurado.")
                 else:
@@ -5,7 +5,9 @@ from datetime import datetime
 from data import get_process_by_id, add_event
 from components.event_log import display_event_log
 from utils import format_date, get_status_color
+from instrumentation import timed
 
+@timed("display_detail_view")
 def display_detail_view(navigate_function):
     """Display detailed view of a process"""
     process_id = st.session_state.selected_process
@@ -169,6 +171,7 @@ def display_detail_view(navigate_function):
     with col2:
         if st.button("✏️ Editar Processo", use_container_width=True):
             st.session_state.edit_mode = True
+            st.session_state.pop("edit_base", None)
             navigate_function("add_edit", process_id)
     
     with col3:
@@ -1,10 +1,36 @@
 import pandas as pd
 import streamlit as st
+import copy
 import os
-import json
+import shutil
 import uuid
+import time
 from datetime import datetime
-from utils import format_date
+from instrumentation import timed, file_size
+from metrics import DATA_WRITES, DATA_WRITE_DURATION, DATA_FILE_BYTES
+import json_codec
+import data_watcher
+from file_lock import file_lock
+from records import MISSING, Process, SlottedRecord, compact_processes
+from events import insert_event, is_period_event, new_event, sort_events
+from migrations import current_schema_version, get_schema_version, migrate, needs_migration
+
+# Diretório dos arquivos de dados (DATA_DIR, padrão: diretório atual). No Docker é um
+# diretório montado (docker-compose.yml): os arquivos são substituídos com os.replace
+# (json_codec.atomic_file), o que não funciona em um arquivo montado sozinho
+DATA_DIR = os.environ.get("DATA_DIR", ".")
+DATA_FILE = os.path.join(DATA_DIR, "data.json")
+
+# Partição fria: processos arquivados, comprimidos e carregados só quando pedidos
+# (página Arquivados, relatórios de arquivados). data.json guarda apenas a lista
+# de IDs arquivados ("archived_ids"), usada na geração de novos IDs. Fica no
+# diretório de dados, ao lado de data.json (e no mesmo volume no Docker).
+ARCHIVE_FILE = os.path.join(DATA_DIR, "data_archived.json.gz")
+
+# Local de data.json antes de DATA_DIR (diretório atual; no Docker, o arquivo que era
+# montado sozinho). Se DATA_DIR ainda não tem data.json, o arquivo antigo é copiado para
+# lá na primeira carga (ver migrate_legacy_data_file), em vez de começar sem os dados
+LEGACY_DATA_FILE = os.environ.get("LEGACY_DATA_FILE", "data.json")
 
 # Default data structure based on the screenshots
 DEFAULT_DATA = {
@@ -95,142 +121,534 @@ DEFAULT_DATA = {
     ]
 }
 
+@timed("load_data")
 def load_data():
     """Load data from file or return default data"""
+    return _load_data()[0]
+
+def migrate_legacy_data_file():
+    """Copia data.json (e a partição de arquivados) do local antigo para DATA_DIR
+
+    Só age se DATA_FILE não existe e LEGACY_DATA_FILE é outro arquivo, existente. O
+    arquivo antigo não é alterado. Retorna True se copiou.
+    """
+    if os.path.abspath(LEGACY_DATA_FILE) == os.path.abspath(DATA_FILE) or not os.path.isfile(LEGACY_DATA_FILE):
+        return False
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with file_lock(DATA_FILE):
+        if os.path.exists(DATA_FILE):
+            return False
+        legacy_archive = os.path.join(os.path.dirname(LEGACY_DATA_FILE), os.path.basename(ARCHIVE_FILE))
+        if os.path.isfile(legacy_archive) and not os.path.exists(ARCHIVE_FILE):
+            shutil.copy2(legacy_archive, ARCHIVE_FILE)
+        # data.json por último: a partir dele a migração está feita
+        shutil.copy2(LEGACY_DATA_FILE, DATA_FILE + ".tmp")
+        os.replace(DATA_FILE + ".tmp", DATA_FILE)
+    print(f"Dados migrados de {LEGACY_DATA_FILE} para {DATA_FILE}")
+    return True
+
+def _load_data(fingerprints=False):
+    """Carrega data.json; retorna (dados, assinatura do arquivo, hashes por processo)
+
+    A assinatura e os hashes (ver data_watcher) permitem que sync_session_data
+    recarregue depois só o que mudou; os hashes só são calculados se pedidos.
+    """
     try:
-        if os.path.exists("data.json"):
-            with open("data.json", "r") as f:
-                data = json.load(f)
+        signature = process_fingerprints = None
+        if not os.path.exists(DATA_FILE):
+            migrate_legacy_data_file()
+        if os.path.exists(DATA_FILE):
+            data, signature = data_watcher.read_file(DATA_FILE)
+            if _needs_normalization(data):
+                # Migrações e mudança de partição gravam o arquivo: refazer sob a trava,
+                # sobre a versão mais recente, para não desfazer gravações de outras réplicas
+                with file_lock(DATA_FILE):
+                    data, signature = data_watcher.read_file(DATA_FILE)
+                    if _normalize(data):
+                        save_data(data)
+                        signature = data_watcher.stat_signature(DATA_FILE)
         else:
             data = DEFAULT_DATA
-            
-        # Garantir que todos os processos tenham campos necessários
-        periods_updated = []  # Lista para acompanhar quais processos tiveram períodos atualizados
+            _normalize(data)
         
-        for process in data["processes"]:
-            # Garantir que todos os eventos tenham IDs únicos
-            if "events" in process:
-                # Realizar a verificação em dois passos para evitar erros de iteração
-                events_to_update = []
-                for i, event in enumerate(process["events"]):
-                    if "id" not in event or event["id"] is None or event["id"] == "":
-                        events_to_update.append(i)
-                
-                # Adicionar IDs aos eventos que não têm
-                for i in events_to_update:
-                    process["events"][i]["id"] = str(uuid.uuid4())
-                    print(f"ID gerado para evento {i} do processo {process['id']}: {process['events'][i]['id']}")
-            
-            # Garantir que exista o campo 'type' (para compatibilidade)
-            if "type" not in process:
-                process["type"] = "importacao"  # Valor padrão
-            
-            # Garantir que exista o campo 'archived' (para funcionalidade de arquivamento)
-            if "archived" not in process:
-                process["archived"] = False
-            
-            # Para registros antigos, converter 'type' do tipo de carga para tipo de processo
-            if process.get("type") in ["FCL 1 X 40", "FCL 1 X 20", "LCL"]:
-                # Guardar o tipo de container/carga em outro campo
-                process["container_type"] = process["type"]
-                # Definir o tipo de processo como importação (valor padrão)
-                process["type"] = "importacao"
-            
-            # Verificar se o período atual expirou e precisa ser atualizado
-            try:
-                from utils import check_period_expiry
-                
-                needs_update, new_start, new_expiry = check_period_expiry(process)
-                if needs_update and new_start and new_expiry:
-                    # Atualizar as datas no processo
-                    process["current_period_start"] = new_start
-                    process["current_period_expiry"] = new_expiry
-                    
-                    # Adicionar evento registrando a atualização
-                    now = datetime.now().strftime("%d/%m/%Y")
-                    event_id = str(uuid.uuid4())
-                    
-                    if "events" not in process:
-                        process["events"] = []
-                    
-                    event_description = f"Período atualizado automaticamente: início {new_start}, vencimento {new_expiry}"
-                    process["events"].append({
-                        "id": event_id,
-                        "date": now,
-                        "description": event_description,
-                        "user": "Sistema"
-                    })
-                    
-                    process["last_update"] = now
-                    periods_updated.append(process["id"])
-            except Exception as e:
-                print(f"Erro ao verificar/atualizar período do processo {process.get('id', 'unknown')}: {e}")
+        # A virada dos períodos de armazenagem é feita pelo agendador (scheduler.py)
         
-        # Se houve atualizações, salvar os dados
-        if periods_updated:
-            print(f"Períodos atualizados para os processos: {', '.join(periods_updated)}")
-            save_data(data)
-        
-        return data
+        if fingerprints:
+            process_fingerprints = data_watcher.process_fingerprints(data["processes"])
+        # Manter os processos em memória como registros compactos (records.Process)
+        data["processes"] = compact_processes(data["processes"])
+        return data, signature, process_fingerprints
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
-        return DEFAULT_DATA
+        return DEFAULT_DATA, None, None
+
+@timed("sync_session_data")
+def sync_session_data():
+    """Carrega os dados da sessão ou, se data.json mudou, recarrega só o que mudou
+
+    Chamada a cada rerun (app.py). Enquanto o arquivo não muda, custa um os.stat.
+    Quando muda (outra sessão ou réplica, agendador, scripts como
+    restaurar_backup.py), só os processos cujo conteúdo mudou no arquivo são
+    convertidos de novo; os demais registros da sessão são reaproveitados.
+    
+    Returns:
+        bool: True se os dados da sessão foram (re)carregados
+    """
+    session = st.session_state
+    fingerprints = session.get("_process_fingerprints")
+    if "data" in session and fingerprints is not None and os.path.exists(DATA_FILE):
+        try:
+            disk, signature = data_watcher.read_if_changed(DATA_FILE, session.get("data_signature"))
+            if disk is None:
+                session.data_signature = signature
+                return False
+            if not _needs_normalization(disk):
+                _reload_changed_processes(session.data, fingerprints, disk)
+                session.data_signature = signature
+                return True
+        except Exception as e:
+            print(f"Erro na recarga incremental dos dados, recarregando tudo: {e}")
+    elif "data" in session and session.get("data_signature") == data_watcher.stat_signature(DATA_FILE):
+        return False
+    
+    session.data, session.data_signature, session._process_fingerprints = _load_data(fingerprints=True)
+    return True
+
+def _reload_changed_processes(data, fingerprints, disk):
+    """Atualiza `data` (dados da sessão) com o conteúdo de `disk`, no lugar
+
+    Registros cujo hash não mudou desde a última carga são reaproveitados; os
+    demais (alterados, novos) são convertidos a partir do arquivo.
+    """
+    disk_fingerprints = data_watcher.process_fingerprints(disk["processes"])
+    current = {process["id"]: process for process in data["processes"]}
+    processes = _reuse_records(disk["processes"], disk_fingerprints, current, fingerprints)
+    rebuilt = sum(1 for process in processes if current.get(process["id"]) is not process)
+    
+    for key in [key for key in data if key not in disk]:
+        del data[key]
+    data.update((key, value) for key, value in disk.items() if key != "processes")
+    data["processes"] = processes
+    fingerprints.clear()
+    fingerprints.update(disk_fingerprints)
+    print(f"Dados recarregados de {DATA_FILE}: {rebuilt} de {len(processes)} processo(s) alterado(s)")
+
+def _reuse_records(processes, fingerprints, previous_records, previous_fingerprints):
+    """Registros para `processes` (dicionários lidos do arquivo), na mesma ordem
+
+    Reaproveita o registro anterior de cada processo cujo hash não mudou e
+    converte os demais de uma vez (compact_processes).
+    """
+    records = []
+    stale = []
+    for process in processes:
+        process_id = process["id"]
+        record = previous_records.get(process_id)
+        if record is None or previous_fingerprints.get(process_id) != fingerprints[process_id]:
+            stale.append(len(records))
+            record = process
+        records.append(record)
+    for position, record in zip(stale, compact_processes([records[i] for i in stale])):
+        records[position] = record
+    return records
+
+def _invalidate_session_data():
+    """Descarta os dados da sessão: o próximo rerun recarrega tudo do arquivo
+
+    Usada quando a memória da sessão pode ter alterações que não foram gravadas
+    (conflito, erro ao salvar), que a recarga incremental não detectaria.
+    """
+    st.session_state.pop("data_signature", None)
+    st.session_state.pop("_process_fingerprints", None)
+
+def _needs_normalization(data):
+    return (needs_migration(data) or "archived_ids" not in data
+            or any(process.get("archived") for process in data["processes"]))
+
+def _normalize(data):
+    """Aplica migrações pendentes e move arquivados para a partição fria; True se alterou data"""
+    # Migrações de esquema pendentes (aplicadas uma única vez e persistidas)
+    applied_migrations = migrate(data)
+    if applied_migrations:
+        print(f"Esquema de dados migrado para a versão {get_schema_version(data)} "
+              f"({len(applied_migrations)} migração(ões) aplicada(s))")
+    
+    # Processos arquivados gravados em data.json (versões antigas, scripts externos)
+    # vão para a partição fria
+    had_archived_ids = "archived_ids" in data
+    moved_to_archive = move_archived_to_cold(data)
+    return bool(applied_migrations or moved_to_archive or not had_archived_ids)
+
+class ConflictError(Exception):
+    """Processos alterados em data.json por outra sessão/réplica desde que foram lidos
 
-def save_data(data):
-    """Save data to file"""
+    `fields` traz, por processo, os campos alterados dos dois lados (vazio quando o
+    processo foi excluído ou não há versão base para mesclar).
+    """
+
+    def __init__(self, fields):
+        self.fields = {process_id: list(names) for process_id, names in fields.items()}
+        self.process_ids = list(self.fields)
+        details = ", ".join(
+            f"{process_id} ({', '.join(names)})" if names else process_id
+            for process_id, names in self.fields.items()
+        )
+        super().__init__(f"Processo(s) alterado(s) por outro usuário: {details}")
+
+def snapshot_process(process):
+    """Cópia independente de um processo (registro ou dicionário), base para merge_process"""
+    if isinstance(process, SlottedRecord):
+        return process.to_dict()
+    return copy.deepcopy(dict(process))
+
+# Campos derivados: em edições simultâneas vale a última gravação, sem conflito
+_LAST_WRITE_WINS = frozenset({"last_update", "storage_days"})
+
+def merge_process(base, local, disk):
+    """Mescla campo a campo duas edições de um processo feitas sobre a mesma versão
+
+    `base` é o processo como a sessão o leu, `local` a versão editada pela sessão e
+    `disk` a versão atual do arquivo (gravada por outra sessão). Campos alterados
+    só de um lado são combinados; um campo alterado dos dois lados, com valores
+    diferentes, é um conflito. Eventos são mesclados por ID (ver _merge_events).
+    
+    Returns:
+        tuple: (processo mesclado, lista de campos em conflito)
+    """
+    merged = dict(disk)
+    conflicts = []
+    for key in set(base) | set(local):
+        if key in ("_rev", "events"):
+            continue
+        local_value = local.get(key, MISSING)
+        base_value = base.get(key, MISSING)
+        if local_value == base_value:
+            continue
+        disk_value = disk.get(key, MISSING)
+        if disk_value == base_value or disk_value == local_value or key in _LAST_WRITE_WINS:
+            if local_value is MISSING:
+                merged.pop(key, None)
+            else:
+                merged[key] = local_value
+        else:
+            conflicts.append(key)
+    
+    if "events" in local or "events" in disk:
+        events, events_conflict = _merge_events(
+            base.get("events") or [], local.get("events") or [], disk.get("events") or [])
+        merged["events"] = events
+        if events_conflict:
+            conflicts.append("events")
+    return merged, sorted(conflicts)
+
+def _merge_events(base, local, disk):
+    """Mescla listas de eventos por ID; retorna (eventos, houve conflito)
+
+    Eventos novos dos dois lados são mantidos, em ordem cronológica. Uma edição ou
+    exclusão local é aplicada se o evento não mudou no arquivo; o mesmo evento
+    editado dos dois lados, ou editado de um lado e excluído do outro, é conflito.
+    """
+    base_by_id = {event.get("id"): event for event in base}
+    local_by_id = {event.get("id"): event for event in local}
+    merged = []
+    conflict = False
+    for event in disk:
+        event_id = event.get("id")
+        base_event = base_by_id.get(event_id)
+        local_event = local_by_id.get(event_id)
+        if base_event is None:
+            # Adicionado no arquivo (ou dos dois lados, com o mesmo ID)
+            conflict |= local_event is not None and local_event != event
+            merged.append(event)
+        elif local_event is None:
+            # Excluído localmente: só se não foi editado no arquivo
+            if event != base_event:
+                conflict = True
+                merged.append(event)
+        elif local_event != base_event:
+            if event != base_event and is_period_event(event) and is_period_event(local_event):
+                # Eventos automáticos de período compactados dos dois lados: vale o do arquivo
+                merged.append(event)
+                continue
+            conflict |= event != base_event and event != local_event
+            merged.append(local_event)
+        else:
+            merged.append(event)
+    
+    disk_ids = {event.get("id") for event in disk}
+    for event in local:
+        event_id = event.get("id")
+        if event_id in disk_ids:
+            continue
+        if event_id not in base_by_id:
+            merged.append(event)
+        elif event != base_by_id[event_id]:
+            # Editado localmente, excluído no arquivo
+            conflict = True
+    # Os eventos locais entram no fim: reordenar pela data/hora (ver events.py). Sem
+    # compactar: a mesclagem não reescreve eventos que a edição não tocou
+    return sort_events(merged), conflict
+
+def write_changes(data, changed=(), deleted=(), bases=None):
+    """Grava em data.json apenas os processos alterados/excluídos, sob a trava do arquivo
+
+    Lê a versão atual do arquivo e verifica que cada processo de `changed` ainda está
+    na revisão (_rev) em que foi lido; o que outras sessões ou réplicas gravaram nos
+    demais processos é preservado. Se o processo mudou no arquivo e `bases` traz a
+    versão lida pela sessão, as duas edições são mescladas campo a campo
+    (merge_process) e o registro em `data` passa a ser o mesclado. Cada processo
+    gravado tem _rev incrementado, e o arquivo, "_revision".
+    
+    Returns:
+        bool: True se `data` estava em dia com o arquivo antes desta gravação (nenhuma
+        gravação de terceiros desde a leitura); False se há alterações de outros a recarregar.
+    
+    Raises:
+        ConflictError: algum processo de `changed` foi excluído no arquivo, ou alterado
+        sem base para mesclar, ou com campos alterados dos dois lados
+    """
+    changed = list(dict.fromkeys(changed))
+    deleted = set(deleted)
+    wanted = set(changed)
+    bases = bases or {}
+    records = {process["id"]: process for process in data["processes"] if process["id"] in wanted}
+    
+    with file_lock(DATA_FILE):
+        if os.path.exists(DATA_FILE):
+            disk = json_codec.load_file(DATA_FILE)
+        else:
+            disk = {key: value for key, value in data.items() if key != "processes"}
+            disk["processes"] = []
+        in_sync = disk.get("_revision", 0) == data.get("_revision", 0)
+        
+        positions = {process["id"]: i for i, process in enumerate(disk["processes"])}
+        disk_archived = set(disk.get("archived_ids", []))
+        conflicts = {}
+        merges = {}
+        for process_id in changed:
+            base_rev = records[process_id].get("_rev", 0)
+            position = positions.get(process_id)
+            if position is None:
+                # Ausente do arquivo: processo novo (revisão 0) ou reativado da partição fria;
+                # fora isso, foi excluído por outra sessão
+                if base_rev and process_id not in disk_archived:
+                    conflicts[process_id] = []
+                continue
+            disk_process = disk["processes"][position]
+            if disk_process.get("_rev", 0) == base_rev:
+                continue
+            if process_id not in bases:
+                conflicts[process_id] = []
+                continue
+            merged, fields = merge_process(bases[process_id], snapshot_process(records[process_id]), disk_process)
+            if fields:
+                conflicts[process_id] = fields
+            else:
+                merged["_rev"] = disk_process.get("_rev", 0)
+                merges[process_id] = merged
+        if conflicts:
+            raise ConflictError(conflicts)
+        
+        previous_revs = {process_id: records[process_id].get("_rev", 0) for process_id in changed}
+        for process_id, merged in merges.items():
+            # Atualizar o registro da sessão no lugar (índices e referências continuam válidos)
+            record = records[process_id]
+            for key in [key for key in record if key not in merged]:
+                del record[key]
+            for key, value in merged.items():
+                record[key] = value
+            print(f"Processo {process_id} mesclado com alterações de outro usuário")
+        
+        for process_id in changed:
+            record = records[process_id]
+            record["_rev"] = record.get("_rev", 0) + 1
+            position = positions.get(process_id)
+            if position is None:
+                disk["processes"].append(record)
+            else:
+                disk["processes"][position] = record
+        if deleted:
+            disk["processes"] = [process for process in disk["processes"] if process["id"] not in deleted]
+        
+        # IDs arquivados: os excluídos que a sessão arquivou entram, os reativados saem
+        session_archived = set(data.get("archived_ids", []))
+        archived_ids = [pid for pid in disk.get("archived_ids", []) if pid not in wanted]
+        archived_ids += [pid for pid in deleted if pid in session_archived and pid not in archived_ids]
+        disk["archived_ids"] = archived_ids
+        
+        disk["_revision"] = disk.get("_revision", 0) + 1
+        try:
+            json_codec.dump_file(DATA_FILE, disk)
+        except BaseException:
+            for process_id in changed:
+                records[process_id]["_rev"] = previous_revs[process_id]
+            raise
+        data["_revision"] = disk["_revision"]
+    return in_sync
+
+@timed("save_data", bytes_written=lambda saved: file_size(DATA_FILE) if saved else 0)
+def save_data(data, changed=None, deleted=None, bases=None):
+    """Save data to file
+    
+    Sem `changed`/`deleted`, grava `data` inteiro (restauração de backup, migrações).
+    Com eles, grava apenas esses processos sobre a versão atual do arquivo (ver
+    write_changes), sem desfazer o que outras sessões ou réplicas gravaram; `bases`
+    (ID -> processo como foi lido) permite mesclar edições simultâneas do mesmo processo.
+    """
+    start = time.perf_counter()
+    is_session_data = data is st.session_state.get("data")
     try:
-        with open("data.json", "w") as f:
-            json.dump(data, f, indent=4)
+        if changed is None and deleted is None:
+            with file_lock(DATA_FILE):
+                if os.path.exists(DATA_FILE):
+                    data["_revision"] = json_codec.load_file(DATA_FILE).get("_revision", 0) + 1
+                # Formato compacto e gravação atômica (ver json_codec.py)
+                json_codec.dump_file(DATA_FILE, data)
+            in_sync = True
+        else:
+            in_sync = write_changes(data, changed or (), deleted or (), bases)
+        DATA_WRITE_DURATION.observe(time.perf_counter() - start)
+        DATA_WRITES.inc(result="ok")
+        DATA_FILE_BYTES.set(file_size(DATA_FILE))
+        if is_session_data:
+            # Em dia com o arquivo: a sessão já tem o que foi gravado e não precisa recarregar.
+            # Caso contrário, sync_session_data recarrega o que mudou no próximo rerun.
+            st.session_state.data_signature = data_watcher.stat_signature(DATA_FILE) if in_sync else None
+            # Os hashes dos processos gravados não correspondem mais aos registros da sessão
+            fingerprints = st.session_state.get("_process_fingerprints")
+            if fingerprints is not None:
+                if changed is None and deleted is None:
+                    fingerprints.clear()
+                for process_id in list(changed or ()) + list(deleted or ()):
+                    fingerprints.pop(process_id, None)
         return True
+    except ConflictError as e:
+        DATA_WRITES.inc(result="conflict")
+        if is_session_data:
+            _invalidate_session_data()
+        st.error(f"{e}. Os dados foram recarregados; refaça a alteração.")
+        return False
     except Exception as e:
+        DATA_WRITES.inc(result="error")
+        if is_session_data:
+            _invalidate_session_data()
         st.error(f"Erro ao salvar dados: {e}")
         return False
 
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    except OSError:
+        return "default"
+
+def get_data_version():
+    """Retorna a versão atual do arquivo de dados (mtime + tamanho)
+
+    Usada como chave de cache: qualquer gravação em data.json gera uma nova versão.
+    """
+    return _file_version(DATA_FILE)
+
+# Índice da versão anterior (hashes, registros), reaproveitado pela próxima versão
+_previous_process_index = ({}, {})
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_process_index(data_version):
+    """Lê o arquivo de dados uma única vez por versão e indexa os processos por ID
+
+    Registros de processos que não mudaram desde a versão anterior são
+    reaproveitados (compartilhados entre as versões, somente leitura).
+    """
+    global _previous_process_index
+    if os.path.exists(DATA_FILE):
+        data = json_codec.load_file(DATA_FILE)
+    else:
+        data = DEFAULT_DATA
+    migrate(data)
+    processes = data.get("processes", [])
+    fingerprints = data_watcher.process_fingerprints(processes)
+    previous_fingerprints, previous_index = _previous_process_index
+    records = _reuse_records(processes, fingerprints, previous_index, previous_fingerprints)
+    index = {record["id"]: record for record in records}
+    _previous_process_index = (fingerprints, index)
+    return index
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_client_process(process_id, data_version):
+    """Carrega apenas um processo (com seus eventos) para a visualização do cliente
+
+    Não inicializa a sessão nem carrega o conjunto completo de dados em
+    st.session_state; o resultado fica em cache por (processo, versão dos dados).
+    """
+    try:
+        process = _load_process_index(data_version).get(process_id)
+        if process is None:
+            # Links de processos já arquivados: procurar na partição fria
+            process = _load_archive_index(_file_version(ARCHIVE_FILE)).get(process_id)
+        return process
+    except Exception as e:
+        print(f"Erro ao carregar processo {process_id} para visualização do cliente: {e}")
+        return None
+
+def get_process_index():
+    """Índice ID -> processo para os dados da sessão
+
+    Reconstruído apenas quando a lista de processos é substituída ou muda de tamanho;
+    update_process mantém o índice atualizado ao substituir um registro.
+    """
+    processes = st.session_state.data["processes"]
+    cached = st.session_state.get("_process_index")
+    if cached is None or cached[0] is not processes or cached[1] != len(processes):
+        cached = (processes, len(processes), {process["id"]: process for process in processes})
+        st.session_state._process_index = cached
+    return cached[2]
+
 def get_process_by_id(process_id):
-    """Get a process by ID"""
-    for process in st.session_state.data["processes"]:
-        if process["id"] == process_id:
-            return process
-    return None
+    """Get a process by ID
+
+    Processos arquivados só são encontrados se a partição fria já foi carregada
+    nesta sessão (ex.: abertos a partir da página Arquivados).
+    """
+    process = get_process_index().get(process_id)
+    if process is None and st.session_state.get("_archived_processes") is not None:
+        process = st.session_state._archived_processes[2].get(process_id)
+    return process
 
-def update_process(process_data):
-    """Update an existing process"""
+def update_process(process_data, base=None):
+    """Update an existing process
+    
+    Args:
+        process_data: campos editados (os ausentes mantêm o valor atual)
+        base: o processo como estava quando a edição começou (ver snapshot_process).
+            Só os campos que diferem dele são aplicados; se outra sessão gravou o
+            processo nesse meio tempo, as duas edições são mescladas campo a campo.
+    """
     for i, process in enumerate(st.session_state.data["processes"]):
         if process["id"] == process_data["id"]:
+            if base is None:
+                base = snapshot_process(process)
+            # Campos vazios no formulário que o processo nem tinha não contam como alteração
+            updated = dict(base)
+            updated.update((key, value) for key, value in process_data.items()
+                           if key not in ("id", "_rev") and value != base.get(key)
+                           and (key in base or value not in ("", None)))
+            
             # Verificar se o período atual expirou antes de salvar as alterações
+            from utils import apply_period_rollover, refresh_storage_days
             try:
-                from utils import check_period_expiry
-                
-                needs_update, new_start, new_expiry = check_period_expiry(process_data)
-                if needs_update and new_start and new_expiry:
-                    # Atualizar as datas no processo
-                    process_data["current_period_start"] = new_start
-                    process_data["current_period_expiry"] = new_expiry
-                    
-                    # Adicionar evento registrando a atualização
-                    now = datetime.now().strftime("%d/%m/%Y")
-                    event_id = str(uuid.uuid4())
-                    
-                    if "events" not in process_data:
-                        process_data["events"] = []
-                    
-                    event_description = f"Período atualizado automaticamente: início {new_start}, vencimento {new_expiry}"
-                    process_data["events"].append({
-                        "id": event_id,
-                        "date": now,
-                        "description": event_description,
-                        "user": "Sistema"
-                    })
-                    
-                    process_data["last_update"] = now
+                if apply_period_rollover(updated):
                     print(f"Período atualizado para o processo {process_data['id']}")
+                refresh_storage_days(updated)
             except Exception as e:
                 print(f"Erro ao verificar/atualizar período do processo {process_data.get('id', 'unknown')}: {e}")
             
-            # Atualizar o processo com os dados atualizados
-            st.session_state.data["processes"][i] = process_data
-            save_data(st.session_state.data)
-            return True
+            # Gravar na revisão da base; write_changes mescla se o arquivo já estiver à frente
+            updated["_rev"] = base.get("_rev", 0)
+            process_record = Process.from_dict(updated)
+            st.session_state.data["processes"][i] = process_record
+            get_process_index()[process_data["id"]] = process_record
+            return save_data(st.session_state.data, changed=[process_data["id"]],
+                             bases={process_data["id"]: base})
     return False
 
 def add_process(process_data):
@@ -242,18 +660,13 @@ def add_process(process_data):
     # Add timestamp for creation
     now = datetime.now().strftime("%d/%m/%Y")
     process_data["last_update"] = now
-    
-    # Initialize empty events list if not provided
-    if "events" not in process_data:
-        process_data["events"] = []
-    
-    # Add creation event
-    process_data["events"].append({
-        "id": str(uuid.uuid4()),
-        "date": now,
-        "description": "Processo criado",
-        "user": "Admin"
-    })
+
+    # Campos garantidos pelo esquema atual (ver migrations.py)
+    process_data.setdefault("type", "importacao")
+    process_data.setdefault("archived", False)
+
+    # Add creation event (mantém a lista de eventos em ordem cronológica, ver events.py)
+    insert_event(process_data, new_event("Processo criado", "Admin"))
     
     # Configurar período inicial baseado na data de entrada no porto/recinto
     port_entry_date = process_data.get("port_entry_date", "")
@@ -276,25 +689,38 @@ def add_process(process_data):
                 process_data["current_period_expiry"] = period_expiry
                 
                 # Adicionar evento de configuração do período
-                process_data["events"].append({
-                    "id": str(uuid.uuid4()),
-                    "date": now,
-                    "description": f"Período inicial configurado: início {port_entry_date}, vencimento {period_expiry}",
-                    "user": "Sistema"
-                })
+                insert_event(process_data, new_event(
+                    f"Período inicial configurado: início {port_entry_date}, vencimento {period_expiry}",
+                    "Sistema"
+                ))
         except Exception as e:
             print(f"Erro ao configurar período inicial: {e}")
     
-    st.session_state.data["processes"].append(process_data)
-    save_data(st.session_state.data)
-    return True
+    # Entrada no porto no passado: o período já pode ter vencido (o agendador só roda uma vez por dia)
+    try:
+        from utils import apply_period_rollover, refresh_storage_days
+        apply_period_rollover(process_data)
+        refresh_storage_days(process_data)
+    except Exception as e:
+        print(f"Erro ao atualizar período do processo {process_data.get('id', 'unknown')}: {e}")
+    
+    st.session_state.data["processes"].append(Process.from_dict(process_data))
+    return save_data(st.session_state.data, changed=[process_data["id"]])
 
 def delete_process(process_id):
     """Delete a process by ID"""
     for i, process in enumerate(st.session_state.data["processes"]):
         if process["id"] == process_id:
             del st.session_state.data["processes"][i]
-            save_data(st.session_state.data)
+            if not save_data(st.session_state.data, deleted=[process_id]):
+                return False
+            
+            # Remover o processo dos vínculos de clientes
+            try:
+                from components.auth import remove_process_from_clients
+                remove_process_from_clients(process_id)
+            except Exception as e:
+                print(f"Erro ao remover vínculos do processo {process_id}: {e}")
             return True
     return False
 
@@ -307,24 +733,13 @@ def add_event(process_id, description, user=None):
         
     for process in st.session_state.data["processes"]:
         if process["id"] == process_id:
-            # Gerar um ID único para o evento
-            event_id = str(uuid.uuid4())
-            new_event = {
-                "id": event_id,
-                "date": datetime.now().strftime("%d/%m/%Y"),
-                "description": description,
-                "user": user
-            }
-            print(f"Adicionando evento com ID {event_id} ao processo {process_id}")
-            
-            # Inicializar a lista de eventos se não existir
-            if "events" not in process:
-                process["events"] = []
-                
-            process["events"].append(new_event)
+            # Evento com ID único e data/hora, inserido em ordem cronológica
+            event = new_event(description, user)
+            print(f"Adicionando evento com ID {event['id']} ao processo {process_id}")
+            base = snapshot_process(process)
+            insert_event(process, event)
             process["last_update"] = datetime.now().strftime("%d/%m/%Y")
-            save_data(st.session_state.data)
-            return True
+            return save_data(st.session_state.data, changed=[process_id], bases={process_id: base})
     return False
 
 def edit_event(process_id, event_id, new_description):
@@ -332,6 +747,7 @@ def edit_event(process_id, event_id, new_description):
     print(f"Tentando editar evento: process_id={process_id}, event_id={event_id}, nova descrição={new_description}")
     for process in st.session_state.data["processes"]:
         if process["id"] == process_id:
+            base = snapshot_process(process)
             # Debug: listar todos os eventos neste processo para diagnóstico
             print(f"Processo {process_id} encontrado, procurando evento {event_id}")
             for i, event in enumerate(process.get("events", [])):
@@ -343,8 +759,7 @@ def edit_event(process_id, event_id, new_description):
                     print(f"  Evento {event_id} encontrado! Atualizando descrição...")
                     event["description"] = new_description
                     process["last_update"] = datetime.now().strftime("%d/%m/%Y")
-                    save_data(st.session_state.data)
-                    return True
+                    return save_data(st.session_state.data, changed=[process_id], bases={process_id: base})
                 
                 # Verificação alternativa para índices como chaves
                 if current_id is None and event_id.startswith("event_"):
@@ -357,8 +772,7 @@ def edit_event(process_id, event_id, new_description):
                             # Adicionar um ID ao evento para referência futura
                             event["id"] = str(uuid.uuid4())
                             process["last_update"] = datetime.now().strftime("%d/%m/%Y")
-                            save_data(st.session_state.data)
-                            return True
+                            return save_data(st.session_state.data, changed=[process_id], bases={process_id: base})
                     except (ValueError, IndexError):
                         pass
     
@@ -370,6 +784,7 @@ def delete_event(process_id, event_id):
     print(f"Tentando excluir evento: process_id={process_id}, event_id={event_id}")
     for process in st.session_state.data["processes"]:
         if process["id"] == process_id:
+            base = snapshot_process(process)
             # Debug: listar todos os eventos neste processo para diagnóstico
             print(f"Processo {process_id} encontrado, procurando evento {event_id}")
             for i, event in enumerate(process.get("events", [])):
@@ -381,8 +796,7 @@ def delete_event(process_id, event_id):
                     print(f"  Evento {event_id} encontrado! Excluindo...")
                     del process["events"][i]
                     process["last_update"] = datetime.now().strftime("%d/%m/%Y")
-                    save_data(st.session_state.data)
-                    return True
+                    return save_data(st.session_state.data, changed=[process_id], bases={process_id: base})
                 
                 # Verificação alternativa para índices como chaves
                 if current_id is None and event_id.startswith("event_"):
@@ -393,8 +807,7 @@ def delete_event(process_id, event_id):
                             print(f"  Correspondência por índice {idx}! Excluindo...")
                             del process["events"][i]
                             process["last_update"] = datetime.now().strftime("%d/%m/%Y")
-                            save_data(st.session_state.data)
-                            return True
+                            return save_data(st.session_state.data, changed=[process_id], bases={process_id: base})
                     except (ValueError, IndexError):
                         pass
     
@@ -404,7 +817,8 @@ def delete_event(process_id, event_id):
 def generate_process_id():
     """Generate a new process ID"""
     year = datetime.now().year
-    existing_ids = [p["id"] for p in st.session_state.data["processes"] if p["id"].startswith(str(year))]
+    all_ids = [p["id"] for p in st.session_state.data["processes"]] + st.session_state.data.get("archived_ids", [])
+    existing_ids = [pid for pid in all_ids if pid.startswith(str(year))]
     if not existing_ids:
         return f"{year}0001"
     
@@ -412,186 +826,252 @@ def generate_process_id():
     next_num = int(max_id[4:]) + 1
     return f"{year}{next_num:04d}"
 
+def _read_archive_file():
+    """Lê a partição fria (lista de processos como dicionários); vazia se não existir"""
+    if not os.path.exists(ARCHIVE_FILE):
+        return []
+    archive = json_codec.load_file(ARCHIVE_FILE)
+    migrate(archive)
+    return archive.get("processes", [])
+
+def _write_archive_file(processes):
+    json_codec.dump_file(ARCHIVE_FILE, {
+        "schema_version": current_schema_version(),
+        "processes": processes
+    })
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_archive_index(archive_version):
+    """Índice ID -> processo arquivado, lido uma vez por versão (visualização do cliente)"""
+    return {process["id"]: process for process in compact_processes(_read_archive_file())}
+
+def move_archived_to_cold(data, replace=False):
+    """Move os processos marcados como arquivados de data["processes"] para a partição fria
+
+    Também recria data["archived_ids"] quando ausente (ex.: data.json restaurado de um
+    backup antigo). Com replace=True (restauração de backup), a partição fria passa a
+    conter apenas os arquivados de data. Retorna o número de processos movidos; cabe a
+    quem chama salvar data.
+    """
+    archived = [process for process in data["processes"] if process.get("archived")]
+    if not archived and not replace and "archived_ids" in data:
+        return 0
+    
+    with file_lock(DATA_FILE):
+        cold = {} if replace else {process["id"]: process for process in _read_archive_file()}
+        if archived or replace:
+            cold.update((process["id"], process) for process in archived)
+            _write_archive_file(list(cold.values()))
+            data["processes"] = [process for process in data["processes"] if not process.get("archived")]
+    if archived:
+        print(f"{len(archived)} processo(s) arquivado(s) movido(s) para {ARCHIVE_FILE}")
+    data["archived_ids"] = list(cold)
+    return len(archived)
+
+def get_archived_processes():
+    """Processos arquivados (partição fria), carregados na sessão apenas quando pedidos
+
+    Recarregados só se o arquivo mudar; archive_process/unarchive_process mantêm
+    a lista da sessão atualizada ao gravar.
+    """
+    version = _file_version(ARCHIVE_FILE)
+    cached = st.session_state.get("_archived_processes")
+    if cached is None or cached[0] != version:
+        processes = compact_processes(_read_archive_file())
+        cached = (version, processes, {process["id"]: process for process in processes})
+        st.session_state._archived_processes = cached
+    return cached[1]
+
+def get_archived_index():
+    """Índice ID -> processo arquivado (carrega a partição fria se necessário)"""
+    get_archived_processes()
+    return st.session_state._archived_processes[2]
+
+def _update_archive_file(add=(), remove=()):
+    """Inclui/remove processos da partição fria sobre a versão atual do arquivo (sob a trava)"""
+    remove = set(remove)
+    with file_lock(DATA_FILE):
+        cold = {process["id"]: process for process in _read_archive_file() if process["id"] not in remove}
+        cold.update((process["id"], process) for process in add)
+        processes = compact_processes(list(cold.values()))
+        _write_archive_file(processes)
+        version = _file_version(ARCHIVE_FILE)
+    st.session_state._archived_processes = (
+        version, processes, {process["id"]: process for process in processes}
+    )
+
 def archive_process(process_id):
-    """Arquivar um processo pelo ID"""
-    for i, process in enumerate(st.session_state.data["processes"]):
+    """Arquivar um processo pelo ID (move da partição ativa para a fria)"""
+    processes = st.session_state.data["processes"]
+    for i, process in enumerate(processes):
         if process["id"] == process_id:
-            st.session_state.data["processes"][i]["archived"] = True
+            process["archived"] = True
             
             # Adicionar evento de arquivamento
             now = datetime.now().strftime("%d/%m/%Y")
-            event_id = str(uuid.uuid4())
+            insert_event(process, new_event("Processo arquivado", st.session_state.get('username', 'Admin')))
             
-            if "events" not in st.session_state.data["processes"][i]:
-                st.session_state.data["processes"][i]["events"] = []
-                
-            st.session_state.data["processes"][i]["events"].append({
-                "id": event_id,
-                "date": now,
-                "description": "Processo arquivado",
-                "user": st.session_state.get('username', 'Admin')
-            })
+            process["last_update"] = now
             
-            st.session_state.data["processes"][i]["last_update"] = now
-            save_data(st.session_state.data)
+            # As duas partições são gravadas sob a mesma trava; primeiro a fria, para que
+            # uma falha entre as gravações deixe o processo nas duas, mas nunca o perca
+            with file_lock(DATA_FILE):
+                _update_archive_file(add=[process])
+                del processes[i]
+                st.session_state.data.setdefault("archived_ids", []).append(process_id)
+                if not save_data(st.session_state.data, deleted=[process_id]):
+                    _update_archive_file(remove=[process_id])
+                    _invalidate_session_data()
+                    return False
             return True
     return False
 
 def unarchive_process(process_id):
-    """Desarquivar um processo pelo ID"""
-    for i, process in enumerate(st.session_state.data["processes"]):
+    """Desarquivar um processo pelo ID (move da partição fria para a ativa)"""
+    archived = get_archived_processes()
+    for i, process in enumerate(archived):
         if process["id"] == process_id:
-            st.session_state.data["processes"][i]["archived"] = False
+            process["archived"] = False
             
             # Adicionar evento de desarquivamento
             now = datetime.now().strftime("%d/%m/%Y")
-            event_id = str(uuid.uuid4())
+            insert_event(process, new_event("Processo reativado", st.session_state.get('username', 'Admin')))
             
-            if "events" not in st.session_state.data["processes"][i]:
-                st.session_state.data["processes"][i]["events"] = []
-                
-            st.session_state.data["processes"][i]["events"].append({
-                "id": event_id,
-                "date": now,
-                "description": "Processo reativado",
-                "user": st.session_state.get('username', 'Admin')
-            })
+            process["last_update"] = now
             
-            st.session_state.data["processes"][i]["last_update"] = now
-            save_data(st.session_state.data)
+            # Gravar primeiro a partição ativa, depois remover da fria (sob a mesma trava)
+            with file_lock(DATA_FILE):
+                st.session_state.data["processes"].append(process)
+                archived_ids = st.session_state.data.get("archived_ids", [])
+                if process_id in archived_ids:
+                    archived_ids.remove(process_id)
+                if not save_data(st.session_state.data, changed=[process_id]):
+                    _invalidate_session_data()
+                    return False
+                _update_archive_file(remove=[process_id])
             return True
     return False
 
-def get_processes_df(include_archived=False):
-    """Convert processes to a DataFrame for display
+# Esquema das colunas do DataFrame de processos:
+# - "category": poucos valores distintos, armazenados como códigos inteiros
+# - "date": datas DD/MM/AAAA convertidas para datetime64 (vazio/ inválido -> NaT)
+# - "int": números inteiros (vazio/inválido -> 0)
+# - "text": texto livre (object)
+PROCESS_SCHEMA = {
+    "id": "text",
+    "status": "category",
+    "type": "category",
+    "po": "text",
+    "ref": "text",
+    "origin": "category",
+    "product": "text",
+    "eta": "date",
+    "free_time": "category",
+    "free_time_expiry": "date",
+    "empty_return": "date",
+    "map": "text",
+    "invoice_number": "text",
+    "port_entry_date": "date",
+    "current_period_start": "date",
+    "current_period_expiry": "date",
+    "storage_days": "int",
+    "original_docs": "category",
+    "terminal": "category",
+    "agent": "category",
+    "container_type": "category",
+    "export_type": "category",
+    "cargo_deadline": "date",
+    "deadline_draft": "date",
+    "shipping_date": "date",
+    "due_date": "date",
+    "last_update": "date",
+}
+
+# Colunas da tabela principal (o id é mantido para uso interno, embora não seja exibido)
+PROCESS_DISPLAY_COLUMNS = [
+    "id", "status", "type", "po", "ref", "origin", "product", "eta",
+    "free_time", "free_time_expiry", "empty_return", "map",
+    "invoice_number", "port_entry_date", "current_period_start",
+    "current_period_expiry", "storage_days", "original_docs",
+    # Campos específicos para exportação
+    "cargo_deadline", "deadline_draft", "export_type"
+]
+
+def _parse_date_column(values):
+    """Converte datas DD/MM/AAAA (ou outros formatos legados) para datetime64"""
+    series = pd.Series(values, dtype=object).fillna("").astype(str)
+    parsed = pd.to_datetime(series, format="%d/%m/%Y", errors="coerce")
+    # Valores em outros formatos (ex.: AAAA-MM-DD) são convertidos individualmente
+    leftover = parsed.isna() & (series != "")
+    if leftover.any():
+        parsed[leftover] = pd.to_datetime(series[leftover], dayfirst=True, errors="coerce", format="mixed")
+    return parsed
+
+def build_processes_frame(processes, columns=None):
+    """Monta um DataFrame tipado a partir da lista de processos, coluna a coluna
+
+    Cada coluna é extraída uma única vez dos dicionários e convertida segundo
+    PROCESS_SCHEMA (categorias, datetime64, inteiros); colunas ausentes nos
+    registros ficam vazias (NaT/0/""). Não há cópias intermediárias do DataFrame.
     
     Args:
-        include_archived: Se True, inclui processos arquivados. Se False (padrão), exclui arquivados.
+        processes: Lista de dicionários de processos
+        columns: Colunas a incluir (padrão: todas as do esquema)
     """
-    if not st.session_state.data["processes"]:
-        return pd.DataFrame()
+    columns = list(dict.fromkeys(columns or PROCESS_SCHEMA))
+    frame = {}
+    for column in columns:
+        values = [process.get(column, "") for process in processes]
+        kind = PROCESS_SCHEMA.get(column, "text")
+        if kind == "category":
+            frame[column] = pd.Categorical(["" if value is None else str(value) for value in values])
+        elif kind == "date":
+            frame[column] = _parse_date_column(values)
+        elif kind == "int":
+            frame[column] = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").fillna(0).astype("int32")
+        else:
+            frame[column] = pd.Series(["" if value is None else value for value in values], dtype=object)
+    return pd.DataFrame(frame, columns=columns)
+
+def date_columns(df):
+    """Nomes das colunas datetime64 do DataFrame"""
+    return [column for column in df.columns if pd.api.types.is_datetime64_any_dtype(df[column])]
+
+def format_processes_frame(df):
+    """Cópia do DataFrame com as datas em texto DD/MM/AAAA (para CSV e busca textual)"""
+    formatted = df.copy(deep=False)
+    for column in date_columns(df):
+        formatted[column] = df[column].dt.strftime("%d/%m/%Y").fillna("")
+    return formatted
+
+@timed("get_processes_df")
+def get_processes_df(include_archived=False, process_ids=None):
+    """Convert processes to a DataFrame for display
     
-    # Filtrar processos de acordo com o status de arquivamento
-    filtered_processes = []
-    for process in st.session_state.data["processes"]:
-        is_archived = process.get("archived", False)
-        if (include_archived and is_archived) or (not include_archived and not is_archived):
-            filtered_processes.append(process)
+    Args:
+        include_archived: Se True, retorna os processos arquivados (partição fria, carregada
+            sob demanda). Se False (padrão), apenas os processos ativos.
+        process_ids: Lista opcional de IDs (ex.: processos de um cliente). Quando informada,
+            apenas esses processos são lidos e incluídos no DataFrame.
+    """
+    if include_archived:
+        source_processes = get_archived_processes()
+    else:
+        source_processes = st.session_state.data["processes"]
     
-    if not filtered_processes:
+    if not source_processes:
         return pd.DataFrame()
-        
-    df = pd.DataFrame(filtered_processes)
     
-    # Verificar e atualizar os períodos, e atualizar os dias armazenados para todos os processos
-    updated_processes = []
-    for i, process in enumerate(st.session_state.data["processes"]):
-        # 1. Verificar e atualizar o período atual se necessário
-        if "current_period_expiry" in process and process["current_period_expiry"]:
-            from utils import check_period_expiry
-            
-            needs_update, new_start, new_expiry = check_period_expiry(process)
-            if needs_update and new_start and new_expiry:
-                # Verificar se a última data de vencimento já passou
-                try:
-                    # Atualizar as datas no processo
-                    st.session_state.data["processes"][i]["current_period_start"] = new_start
-                    st.session_state.data["processes"][i]["current_period_expiry"] = new_expiry
-                    
-                    # Adicionar evento registrando a atualização
-                    now = datetime.now().strftime("%d/%m/%Y")
-                    event_id = str(uuid.uuid4())
-                    event_description = f"Período atualizado automaticamente: início {new_start}, vencimento {new_expiry}"
-                    
-                    if "events" not in st.session_state.data["processes"][i]:
-                        st.session_state.data["processes"][i]["events"] = []
-                    
-                    st.session_state.data["processes"][i]["events"].append({
-                        "id": event_id,
-                        "date": now,
-                        "description": event_description,
-                        "user": "Sistema"
-                    })
-                    
-                    updated_processes.append(process["id"])
-                except Exception as e:
-                    print(f"Erro ao atualizar período: {e}")
-        
-        # 2. Atualizar os dias armazenados
-        if "port_entry_date" in process and process["port_entry_date"]:
-            try:
-                entry_date = pd.to_datetime(process["port_entry_date"], dayfirst=True)
-                today = pd.to_datetime(datetime.now().date())
-                days_stored = (today - entry_date).days
-                # Salvar como número inteiro para permitir ordenação correta
-                st.session_state.data["processes"][i]["storage_days"] = max(0, days_stored)
-            except Exception as e:
-                # Caso ocorra um erro, garantir que storage_days seja um número
-                if "storage_days" in st.session_state.data["processes"][i]:
-                    try:
-                        # Converter string para inteiro se existente
-                        days_str = st.session_state.data["processes"][i]["storage_days"]
-                        st.session_state.data["processes"][i]["storage_days"] = int(days_str)
-                    except (ValueError, TypeError):
-                        # Se não conseguir converter, definir como 0
-                        st.session_state.data["processes"][i]["storage_days"] = 0
-    
-    # Informar quais processos foram atualizados
-    if updated_processes:
-        print(f"Períodos atualizados para os processos: {', '.join(updated_processes)}")
-    
-    # Salvar os dados para persistir os dias armazenados atualizados
-    save_data(st.session_state.data)
-    
-    # Atualizar o DataFrame
-    df = pd.DataFrame(filtered_processes)
-    
-    # Garantir que storage_days seja numérico para todos os processos
-    if 'storage_days' in df.columns:
-        df['storage_days'] = pd.to_numeric(df['storage_days'], errors='coerce').fillna(0).astype(int)
-    
-    # Select columns for main table view (removido "id" conforme solicitado)
-    display_columns = [
-        "status", "type", "po", "ref", "origin", "product", "eta", 
-        "free_time", "free_time_expiry", "empty_return", "map", 
-        "invoice_number", "port_entry_date", "current_period_start", 
-        "current_period_expiry", "storage_days", "original_docs",
-        # Campos específicos para exportação
-        "cargo_deadline", "deadline_draft", "export_type"
-    ]
-    
-    # Manter o id para uso interno, embora não seja exibido na tabela
-    internal_id_column = "id"
-    
-    # Garantir que todas as colunas existam
-    for col in display_columns:
-        if col not in df.columns:
-            df[col] = ""
-    
-    # Criar uma cópia do dataframe com as colunas de exibição e ID
-    # Isso garante que o ID está disponível para operações internas
-    # mas não aparece na tabela visível para o usuário
-    full_df = df.copy()
-    
-    # Formatação das colunas de data para o padrão brasileiro (DD/MM/YYYY)
-    date_columns = [
-        "eta", "free_time_expiry", "empty_return", "port_entry_date", 
-        "current_period_start", "current_period_expiry", "return_date",
-        # Campos de datas específicos para exportação
-        "cargo_deadline", "deadline_draft", "due_date", "knowledge_date", 
-        "endorsement_date", "shipping_date", "arrival_forecast", 
-        "client_delivery_date", "originals_sent_date"
-    ]
-    
-    # Aplicar formatação apenas às colunas de data que existem no dataframe
-    for col in date_columns:
-        if col in full_df.columns:
-            full_df[col] = full_df[col].apply(lambda x: format_date(x) if x else "")
-    
-    # Reorganizar colunas para que ID seja a primeira (para uso interno)
-    columns_with_id = ["id"] + display_columns
+    if process_ids is None:
+        candidate_processes = source_processes
+    else:
+        process_index = get_archived_index() if include_archived else get_process_index()
+        candidate_processes = [process_index[pid] for pid in dict.fromkeys(process_ids) if pid in process_index]
     
-    # Garantir que não há duplicatas
-    columns_with_id = list(dict.fromkeys(columns_with_id))
+    if not candidate_processes:
+        return pd.DataFrame()
     
-    return full_df[columns_with_id]
+    # Períodos e dias armazenados são atualizados uma vez por dia pelo agendador
+    # (scheduler.py) e nas gravações; a leitura não altera nem grava os dados.
+    # O DataFrame é montado uma única vez, já com os tipos do esquema
+    return build_processes_frame(candidate_processes, PROCESS_DISPLAY_COLUMNS)
@@ -0,0 +1,82 @@
+"""
+Detecção de alterações em data.json feitas fora da sessão
+
+Scripts como restaurar_backup.py, gerar_30_processos.py e gerar_dados_teste.py,
+outras réplicas e o agendador reescrevem data.json enquanto há sessões abertas.
+A cada rerun, data.sync_session_data compara a assinatura do arquivo com a
+que a sessão carregou:
+
+- Assinatura = (mtime_ns, tamanho, hash do conteúdo). O os.stat é feito a cada
+  verificação; o hash só é calculado quando mtime ou tamanho mudam, então um
+  arquivo regravado com o mesmo conteúdo (touch, restauração do mesmo backup)
+  não provoca recarga.
+- Na recarga, cada processo do arquivo tem seu próprio hash
+  (process_fingerprints); só os processos cujo hash mudou são convertidos de
+  novo em registros, os demais são reaproveitados.
+"""
+
+import hashlib
+import os
+from collections import namedtuple
+
+import json_codec
+
+Signature = namedtuple("Signature", "mtime_ns size digest")
+
+
+def _digest(content):
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def stat_signature(path):
+    """Assinatura sem hash (só os.stat); None se o arquivo não existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return Signature(stat.st_mtime_ns, stat.st_size, None)
+
+
+def read_file(path):
+    """Lê e decodifica path uma única vez; retorna (dados, assinatura com hash)
+
+    A assinatura vem do próprio descritor lido: como as gravações substituem o
+    arquivo (os.replace), ela corresponde exatamente ao conteúdo decodificado.
+    """
+    return read_if_changed(path, None)
+
+
+def read_if_changed(path, previous):
+    """Lê path se mudou desde a assinatura `previous`
+
+    Returns:
+        tuple: (dados, assinatura atual). `dados` é None se o arquivo não mudou:
+        mesmo mtime/tamanho (só um os.stat), ou mesmo hash do conteúdo (o arquivo
+        é lido, mas não decodificado). A assinatura devolvida tem o mtime novo, para
+        que a próxima verificação volte a ser só um os.stat.
+    
+    Raises:
+        OSError: o arquivo não existe ou não pôde ser lido
+    """
+    if previous is not None:
+        current = stat_signature(path)
+        if current is not None and current[:2] == previous[:2]:
+            return None, previous
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        content = f.read()
+    current = Signature(stat.st_mtime_ns, stat.st_size, _digest(content))
+    if previous is not None and current.digest == previous.digest:
+        return None, current
+    return json_codec.loads(content), current
+
+
+def process_fingerprints(processes):
+    """Hash de cada processo (dicionários como lidos do arquivo), por ID
+
+    Calculado sobre a codificação canônica (json_codec.canonical_dumps): o mesmo
+    processo tem o mesmo hash com ou sem orjson e em qualquer ordem de chaves, o
+    que os objetos de backups.py, endereçados por esse hash, precisam.
+    """
+    dumps = json_codec.canonical_dumps
+    return {process["id"]: _digest(dumps(process)) for process in processes}
@@ -0,0 +1,302 @@
+"""
+Fila de envio de emails em segundo plano
+
+Os emails são enfileirados pela thread do Streamlit e entregues por threads de
+trabalho que reutilizam conexões SMTP já autenticadas (pool por configuração),
+enviam em lotes e tentam novamente com espera exponencial em caso de falha.
+"""
+
+import collections
+import queue
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+# Janela (segundos) usada no cálculo da vazão em stats()
+RATE_WINDOW_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class SMTPConfig:
+    """Configuração de um servidor SMTP (também usada como chave do pool)"""
+    server: str
+    port: int = 587
+    username: str = ""
+    password: str = ""
+    from_email: str = ""
+    use_tls: bool = True
+    timeout: float = 30
+
+
+class EmailJob:
+    """Um email na fila, com o estado da entrega"""
+
+    def __init__(self, config, to_email, subject, message):
+        self.config = config
+        self.to_email = to_email
+        self.subject = subject
+        self.message = message
+        self.attempts = 0
+        self.error = None
+        self.success = None
+        self.done = threading.Event()
+
+    def build_message(self):
+        msg = MIMEMultipart()
+        msg['From'] = self.config.from_email or self.config.username
+        msg['To'] = self.to_email
+        msg['Subject'] = self.subject
+        msg.attach(MIMEText(self.message, 'plain'))
+        return msg
+
+    def wait(self, timeout=None):
+        """Aguarda a entrega (ou a falha definitiva). Retorna True se o email foi enviado."""
+        self.done.wait(timeout)
+        return bool(self.success)
+
+
+class SMTPConnectionPool:
+    """Pool de conexões SMTP autenticadas para uma configuração"""
+
+    def __init__(self, config, max_idle=2):
+        self.config = config
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.config.server, self.config.port, timeout=self.config.timeout)
+        if self.config.use_tls:
+            conn.starttls()
+        if self.config.username:
+            conn.login(self.config.username, self.config.password)
+        return conn
+
+    def acquire(self):
+        """Retorna uma conexão ociosa ainda viva ou abre uma nova"""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            try:
+                # Descartar conexões encerradas pelo servidor
+                if conn.noop()[0] == 250:
+                    return conn
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._close(conn)
+
+    def release(self, conn, broken=False):
+        """Devolve a conexão ao pool (ou fecha, se quebrada ou se o pool estiver cheio)"""
+        if not broken:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    return
+        self._close(conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class EmailQueue:
+    """Fila de entrega de emails com pool de conexões, lotes e novas tentativas
+
+    Args:
+        workers: Número de threads de entrega
+        batch_size: Máximo de emails enviados por uma mesma conexão em sequência
+        max_retries: Número de novas tentativas após a primeira falha
+        backoff_base: Espera (segundos) antes da primeira nova tentativa; dobra a cada falha
+        backoff_max: Espera máxima entre tentativas
+    """
+
+    def __init__(self, workers=2, batch_size=20, max_retries=3, backoff_base=1.0, backoff_max=60.0):
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._queue = queue.Queue()
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._scheduled_retries = 0
+        self._stats = {"sent": 0, "failed": 0, "retried": 0}
+        # Lotes recentes (início, fim, enviados) para a vazão na janela RATE_WINDOW_SECONDS
+        self._recent_batches = collections.deque()
+
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._run, name=f"email-queue-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def enqueue(self, config, to_email, subject, message):
+        """Coloca um email na fila e retorna o EmailJob correspondente"""
+        job = EmailJob(config, to_email, subject, message)
+        self._queue.put(job)
+        return job
+
+    def enqueue_many(self, config, recipients, subject, message):
+        """Enfileira o mesmo email para vários destinatários"""
+        return [self.enqueue(config, to_email, subject, message) for to_email in recipients]
+
+    def pending(self):
+        """Emails aguardando entrega (incluindo novas tentativas agendadas)"""
+        return self._queue.unfinished_tasks + self._scheduled_retries
+
+    def wait_until_idle(self, timeout=None):
+        """Aguarda até que todos os emails tenham sido entregues ou descartados"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        """Estatísticas de entrega, incluindo a vazão em mensagens por segundo
+
+        A vazão considera só os lotes terminados nos últimos RATE_WINDOW_SECONDS
+        (enviados / tempo entre o início do mais antigo e o fim do mais recente),
+        para não ser diluída pelo tempo ocioso desde o primeiro envio do processo.
+        """
+        with self._stats_lock:
+            self._prune_recent_batches(time.perf_counter())
+            stats = dict(self._stats)
+            recent = list(self._recent_batches)
+        stats["pending"] = self.pending()
+        elapsed = (recent[-1][1] - recent[0][0]) if recent else 0.0
+        stats["messages_per_second"] = sum(sent for _, _, sent in recent) / elapsed if elapsed else 0.0
+        return stats
+
+    def _prune_recent_batches(self, now):
+        while self._recent_batches and self._recent_batches[0][1] < now - RATE_WINDOW_SECONDS:
+            self._recent_batches.popleft()
+
+    def close(self):
+        """Fecha as conexões ociosas de todos os pools"""
+        with self._pools_lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close_all()
+
+    def _get_pool(self, config):
+        with self._pools_lock:
+            pool = self._pools.get(config)
+            if pool is None:
+                pool = SMTPConnectionPool(config)
+                self._pools[config] = pool
+            return pool
+
+    def _next_batch(self):
+        """Bloqueia até o primeiro email e completa o lote com os que já estão na fila"""
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started_at = time.perf_counter()
+
+            # Agrupar por servidor para enviar cada grupo pela mesma conexão
+            groups = {}
+            for job in batch:
+                groups.setdefault(job.config, []).append(job)
+
+            sent = 0
+            for config, jobs in groups.items():
+                sent += self._send_group(config, jobs)
+
+            with self._stats_lock:
+                self._stats["sent"] += sent
+                finished_at = time.perf_counter()
+                if sent:
+                    self._recent_batches.append((started_at, finished_at, sent))
+                self._prune_recent_batches(finished_at)
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _send_group(self, config, jobs):
+        pool = self._get_pool(config)
+        sent = 0
+        conn = None
+        for job in jobs:
+            job.attempts += 1
+            try:
+                if conn is None:
+                    conn = pool.acquire()
+                conn.send_message(job.build_message())
+                job.success = True
+                job.done.set()
+                sent += 1
+            except Exception as e:
+                if conn is not None and isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                    pool.release(conn, broken=True)
+                    conn = None
+                self._retry_or_fail(job, e)
+        if conn is not None:
+            pool.release(conn)
+        return sent
+
+    def _retry_or_fail(self, job, error):
+        job.error = error
+        if job.attempts > self.max_retries:
+            print(f"Falha definitiva ao enviar email para {job.to_email}: {error}")
+            job.success = False
+            job.done.set()
+            with self._stats_lock:
+                self._stats["failed"] += 1
+            return
+
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (job.attempts - 1)))
+        with self._stats_lock:
+            self._stats["retried"] += 1
+            self._scheduled_retries += 1
+
+        def requeue():
+            self._queue.put(job)
+            with self._stats_lock:
+                self._scheduled_retries -= 1
+
+        timer = threading.Timer(delay, requeue)
+        timer.daemon = True
+        timer.start()
+
+
+_email_queue = None
+_email_queue_lock = threading.Lock()
+
+
+def get_email_queue():
+    """Retorna a fila de emails compartilhada pelo processo (criada no primeiro uso)"""
+    global _email_queue
+    with _email_queue_lock:
+        if _email_queue is None:
+            _email_queue = EmailQueue()
+        return _email_queue
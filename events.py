@@ -0,0 +1,159 @@
+"""
+Eventos dos processos: criação, data/hora e ordem cronológica
+
+Além da data de exibição ("date", DD/MM/AAAA ou DD/MM/AA nos registros
+antigos), cada evento guarda o instante em que ocorreu em "timestamp"
+(AAAA-MM-DDTHH:MM:SS). Por ser ISO 8601, o texto ordena na mesma ordem
+cronológica, sem conversão; "date" não ordena ("05/01/24" < "10/12/23").
+
+As listas de eventos ficam em ordem crescente de timestamp: insert_event
+insere cada evento novo na posição certa (bisect), e o histórico exibe a
+lista invertida (mais recentes primeiro) sem ordenar a cada exibição.
+Eventos antigos recebem o timestamp, calculado a partir de "date", pela
+migração 4 (migrations.py).
+
+Compactação: cada virada do período de armazenagem registra um evento
+automático ("Período atualizado automaticamente..."), e contêineres parados
+por meses acumulam centenas deles. compact_period_events troca cada
+sequência de dois ou mais desses eventos, sem eventos manuais entre eles,
+por um único evento de resumo (com "rollup": quantidade, datas e períodos
+inicial e final); os demais eventos não mudam. apply_period_rollover compacta
+ao registrar cada virada, e a migração 5 compacta os dados existentes.
+
+Uso:
+    insert_event(process, new_event("Documentos recebidos", user="Admin"))
+"""
+
+import bisect
+import re
+import uuid
+from datetime import datetime
+from functools import lru_cache
+
+# Formatos de "date" encontrados nos dados (o primeiro é o usado nos eventos novos)
+DATE_FORMATS = ("%d/%m/%Y", "%d/%m/%y", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%Y-%m-%d")
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Evento registrado a cada virada do período de armazenagem (utils.apply_period_rollover)
+PERIOD_EVENT_PREFIX = "Período atualizado automaticamente"
+PERIOD_EVENT_USER = "Sistema"
+
+_PERIOD_PATTERN = re.compile(r"início (\S+), vencimento (\S+)")
+
+
+@lru_cache(maxsize=8192)
+def parse_event_date(value):
+    """Timestamp ISO de uma data de evento; "" se vazia ou em formato desconhecido"""
+    value = (value or "").strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime(TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+    return ""
+
+
+def event_timestamp(event):
+    """Chave de ordenação do evento (timestamp gravado, ou calculado a partir de "date")"""
+    return event.get("timestamp") or parse_event_date(event.get("date") or "")
+
+
+def new_event(description, user="Admin", when=None):
+    """Evento novo (dicionário) com ID, data de exibição e timestamp"""
+    when = when or datetime.now()
+    return {
+        "id": str(uuid.uuid4()),
+        "date": when.strftime(DATE_FORMATS[0]),
+        "timestamp": when.strftime(TIMESTAMP_FORMAT),
+        "description": description,
+        "user": user
+    }
+
+
+def insert_event(process, event):
+    """Insere o evento em process["events"] mantendo a ordem cronológica; retorna o evento
+
+    Eventos com o mesmo timestamp ficam na ordem de inserção.
+    """
+    if "events" not in process:
+        process["events"] = []
+    bisect.insort_right(process["events"], event, key=event_timestamp)
+    return event
+
+
+def is_sorted(events):
+    keys = [event_timestamp(event) for event in events]
+    return all(a <= b for a, b in zip(keys, keys[1:]))
+
+
+def sort_events(events):
+    """Ordena a lista no lugar (estável) se estiver fora de ordem; retorna a lista"""
+    if not is_sorted(events):
+        events.sort(key=event_timestamp)
+    return events
+
+
+def is_period_event(event):
+    """Evento automático de virada de período (ou resumo de vários deles)"""
+    if event.get("rollup"):
+        return True
+    return (event.get("user") == PERIOD_EVENT_USER
+            and (event.get("description") or "").startswith(PERIOD_EVENT_PREFIX))
+
+
+def _period_summary(event):
+    """(quantidade, timestamp e data do primeiro, início do primeiro período, vencimento do último)"""
+    rollup = event.get("rollup")
+    if rollup:
+        return rollup["count"], rollup["from"], rollup["from_date"], rollup["period_start"], rollup["period_expiry"]
+    match = _PERIOD_PATTERN.search(event.get("description") or "")
+    start, expiry = match.groups() if match else ("", "")
+    return 1, event_timestamp(event), event.get("date", ""), start, expiry
+
+
+def period_rollup(run):
+    """Evento de resumo de uma sequência de eventos de virada de período (em ordem)
+
+    Mantém o ID do primeiro evento (compactar de novo não muda o resumo) e a data do
+    último, para que continue na mesma posição da ordem cronológica.
+    """
+    first = _period_summary(run[0])
+    last = _period_summary(run[-1])
+    count = sum(_period_summary(event)[0] for event in run)
+    return {
+        "id": run[0].get("id") or str(uuid.uuid4()),
+        "date": run[-1].get("date", ""),
+        "timestamp": event_timestamp(run[-1]),
+        "description": (f"Períodos atualizados automaticamente ({count}) de {first[2]} a {run[-1].get('date', '')}: "
+                        f"primeiro início {first[3]}, vencimento atual {last[4]}"),
+        "user": PERIOD_EVENT_USER,
+        "rollup": {
+            "count": count,
+            "from": first[1],
+            "from_date": first[2],
+            "period_start": first[3],
+            "period_expiry": last[4],
+        },
+    }
+
+
+def compact_period_events(events):
+    """Compacta, no lugar, as sequências de eventos de virada de período; retorna quantos eventos saíram
+
+    Sequências de um único evento ficam como estão. A lista deve estar em ordem cronológica.
+    """
+    compacted = []
+    run = []
+    for event in events:
+        if is_period_event(event):
+            run.append(event)
+            continue
+        compacted.extend(run if len(run) < 2 else [period_rollup(run)])
+        run = []
+        compacted.append(event)
+    compacted.extend(run if len(run) < 2 else [period_rollup(run)])
+    removed = len(events) - len(compacted)
+    if removed:
+        events[:] = compacted
+    return removed
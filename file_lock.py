@@ -0,0 +1,87 @@
+"""
+Trava de arquivo entre processos (réplicas do app, scripts, agendador)
+
+Trava consultiva em um arquivo "<caminho>.lock" ao lado do arquivo protegido:
+fcntl.flock em Linux/macOS, msvcrt.locking no Windows. A trava de data.json
+fica no diretório de dados (DATA_DIR, ver data.py): réplicas em contêineres
+diferentes só se excluem se esse diretório for o mesmo volume montado em
+todas (docker-compose.yml); uma trava no sistema de arquivos próprio de cada
+contêiner não protege nada entre eles. Dentro de um mesmo
+processo a trava é reentrante por thread (RLock), então funções que gravam
+sob a trava podem chamar outras que também a pedem.
+
+Uso:
+    with file_lock("data.json"):
+        dados = json_codec.load_file("data.json")
+        ...
+        json_codec.dump_file("data.json", dados)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Uma entrada por arquivo protegido: [RLock, descritor do .lock, profundidade]
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    # msvcrt.locking desiste após ~10 s; continuar tentando até conseguir
+    while True:
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.05)
+
+
+def _unlock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path):
+    """Trava exclusiva sobre `path` entre processos (reentrante na mesma thread)"""
+    key = os.path.abspath(path)
+    with _locks_guard:
+        entry = _locks.setdefault(key, [threading.RLock(), None, 0])
+
+    entry[0].acquire()
+    try:
+        if entry[2] == 0:
+            fd = os.open(key + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _lock_fd(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+            entry[1] = fd
+        entry[2] += 1
+        try:
+            yield
+        finally:
+            entry[2] -= 1
+            if entry[2] == 0:
+                fd, entry[1] = entry[1], None
+                try:
+                    _unlock_fd(fd)
+                finally:
+                    os.close(fd)
+    finally:
+        entry[0].release()
@@ -7,6 +7,13 @@ import random
 from datetime import datetime, timedelta
 import os
 
+import backups
+import json_codec
+from file_lock import file_lock
+
+# data.json no diretório de dados (DATA_DIR)
+ARQUIVO_DADOS = backups.data_path("data.json")
+
 def gerar_data_aleatoria(inicio, fim):
     """Gera uma data aleatória entre duas datas"""
     delta = fim - inicio
@@ -247,8 +254,8 @@ def gerar_processo_exportacao(id_processo):
 def gerar_30_processos():
     """Gera 30 processos de teste (15 importação e 15 exportação)"""
     # Verificar se já existe arquivo de dados
-    if os.path.exists("data.json"):
-        with open("data.json", "r") as f:
+    if os.path.exists(ARQUIVO_DADOS):
+        with open(ARQUIVO_DADOS, "r") as f:
             try:
                 dados = json.load(f)
                 processos_existentes = dados.get("processes", [])
@@ -260,14 +267,9 @@ def gerar_30_processos():
         processos_existentes = []
         print("Arquivo data.json não encontrado")
     
-    # Criar backup do arquivo existente (se houver)
-    if os.path.exists("data.json"):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"data_backup_{timestamp}.json"
-        with open(backup_filename, "w") as f:
-            with open("data.json", "r") as original:
-                f.write(original.read())
-            print(f"Backup criado em {backup_filename}")
+    # Criar backup dos dados existentes (se houver); restaurar_backup.py volta para ele
+    if os.path.exists(ARQUIVO_DADOS):
+        print(f"Backup criado: {backups.create_backup(label='gerar_30_processos')}")
     
     # Gerar processos
     processos = []
@@ -285,13 +287,16 @@ def gerar_30_processos():
     
     # Salvar dados
     dados = {"processes": todos_processos}
-    with open("data.json", "w") as f:
-        json.dump(dados, f, indent=2)
+    # Gravação atômica: sessões abertas nunca leem um data.json pela metade e
+    # recarregam só os processos alterados (ver data_watcher.py)
+    json_codec.dump_file(ARQUIVO_DADOS, dados)
     
     print(f"Total de {len(todos_processos)} processos (incluindo {len(processos)} novos processos gerados)")
     print(f"- {len([p for p in processos if p['type'] == 'importacao'])} processos de importação")
     print(f"- {len([p for p in processos if p['type'] == 'exportacao'])} processos de exportação")
 
 if __name__ == "__main__":
-    gerar_30_processos()
+    # Sob a trava de data.json: gravações do app não se intercalam com a leitura e a gravação
+    with file_lock(ARQUIVO_DADOS):
+        gerar_30_processos()
     print("30 processos de teste gerados com sucesso!")
\ No newline at end of file
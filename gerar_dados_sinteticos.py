@@ -0,0 +1,276 @@
+"""
+Gerador reprodutível de dados sintéticos em escala de produção
+
+Gera N processos (de dezenas a milhões) a partir de uma semente, em fluxo
+(sem manter a lista em memória), com mistura realista de importação e
+exportação, quantidade variável de eventos (incluindo atualizações automáticas
+de período), proporção de processos arquivados e datas espalhadas no tempo.
+
+A mesma semente e a mesma data de referência sempre produzem os mesmos dados.
+É a base dos benchmarks em benchmarks/.
+
+Uso:
+    python gerar_dados_sinteticos.py 100000 --semente 42 --saida dados_sinteticos.json
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import random
+from datetime import date, timedelta
+
+# Data de referência padrão ("hoje" dos dados gerados), fixa para reprodutibilidade
+DATA_REFERENCIA_PADRAO = date(2025, 5, 15)
+
+STATUS_IMPORTACAO = [
+    ("Em andamento", 30), ("Novo Processo", 10), ("Pendente", 8), ("Chegada do navio alterada", 6),
+    ("Aguardando documentos", 8), ("Em desembaraço", 10), ("BL liberado", 5),
+    ("Aguardando chegada", 8), ("Nacionalizado", 5), ("Concluído", 10)
+]
+STATUS_EXPORTACAO = [
+    ("Em andamento", 30), ("Novo Processo", 10), ("Pendente", 8), ("Embarque agendado", 8),
+    ("Aguardando documentos", 8), ("Documentos enviados", 8), ("Aguardando embarque", 8),
+    ("Embarcado", 10), ("Concluído", 10)
+]
+PAISES = ["CHINA", "EUA", "ALEMANHA", "JAPÃO", "COREIA DO SUL", "ÍNDIA", "VIETNÃ", "TAILÂNDIA", "ITÁLIA", "ESPANHA"]
+PRODUTOS_IMPORTACAO = [
+    "FLONEX 9004 S", "MÁQUINAS CNC", "PEÇAS AUTOMOTIVAS", "EQUIPAMENTOS MÉDICOS", "PLÁSTICOS",
+    "ELETRÔNICOS", "TECIDOS", "AÇO", "QUÍMICOS", "ALIMENTOS", "EQUIPAMENTOS INDUSTRIAIS"
+]
+PRODUTOS_EXPORTACAO = [
+    "CAFÉ", "CARNE BOVINA", "SOJA", "MINÉRIO DE FERRO", "AÇÚCAR", "AUTOMÓVEIS", "CALÇADOS",
+    "EQUIPAMENTOS AGRÍCOLAS", "CELULOSE", "ALGODÃO", "MILHO"
+]
+TERMINAIS = ["SANTOS BRASIL", "DPW SANTOS", "BTP", "EMBRAPORT", "TCP", "PORTONAVE", "ITAPOÁ", "ECOPORTO"]
+AGENTES = ["MSC", "MAERSK", "COSCO", "HAPAG", "CMA CGM", "ONE", "EVERGREEN"]
+TIPOS_CONTAINER = [("FCL 1 X 40", 50), ("FCL 1 X 20", 30), ("LCL", 20)]
+EVENTOS_MANUAIS = [
+    "Documentação recebida", "Navio em trânsito", "Chegada do navio confirmada", "Presença de carga",
+    "Registro da DI", "Canal verde", "Desembaraço concluído", "Carregamento programado",
+    "Entrega programada", "Processo atualizado"
+]
+USUARIOS = ["Admin", "admin", "Operador 1", "Operador 2", "Operador 3"]
+
+
+def _escolha_ponderada(rng, opcoes):
+    valores, pesos = zip(*opcoes)
+    return rng.choices(valores, weights=pesos, k=1)[0]
+
+
+def _formatar(dia):
+    return f"{dia.day:02d}/{dia.month:02d}/{dia.year}"
+
+
+def _evento(rng, dia, descricao, usuario):
+    """Retorna (data, evento); a data fica de fora do dicionário para ordenar sem reconverter"""
+    h = f"{rng.getrandbits(128):032x}"
+    return dia, {
+        "id": f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{h[16:20]}-{h[20:]}",
+        "date": _formatar(dia),
+        "description": descricao,
+        "user": usuario
+    }
+
+
+def gerar_processos(quantidade, semente=42, data_referencia=DATA_REFERENCIA_PADRAO,
+                    proporcao_exportacao=0.3, proporcao_arquivados=0.15,
+                    eventos_medios=6, dispersao_dias=365, dias_por_periodo=30):
+    """Gera processos sintéticos um a um (gerador)
+
+    Args:
+        quantidade: Número de processos
+        semente: Semente do gerador aleatório (mesma semente => mesmos dados)
+        data_referencia: Data considerada "hoje" nos dados gerados
+        proporcao_exportacao: Fração de processos de exportação
+        proporcao_arquivados: Fração de processos arquivados
+        eventos_medios: Média de eventos manuais por processo
+        dispersao_dias: Quantos dias antes da referência os processos podem ter começado
+        dias_por_periodo: Duração do período de armazenagem
+    """
+    rng = random.Random(semente)
+    hoje = data_referencia
+
+    for seq in range(quantidade):
+        criado_em = hoje - timedelta(days=int(rng.triangular(0, dispersao_dias, dispersao_dias * 0.2)))
+        exportacao = rng.random() < proporcao_exportacao
+        ref_prefixo = "EXP" if exportacao else "IMP"
+        ref = f"{ref_prefixo}-{rng.randint(1000, 9999)}/{criado_em.year}"
+
+        processo = {
+            "id": f"{criado_em.year}{seq:07d}",
+            "ref": ref,
+            "type": "exportacao" if exportacao else "importacao",
+            "status": _escolha_ponderada(rng, STATUS_EXPORTACAO if exportacao else STATUS_IMPORTACAO),
+            "origin": rng.choice(PAISES),
+            "product": rng.choice(PRODUTOS_EXPORTACAO if exportacao else PRODUTOS_IMPORTACAO),
+            "po": f"PO-{rng.randint(10000, 99999)}",
+            "invoice_number": f"INV-{rng.randint(10000, 99999)}",
+            "map": f"MAP-{rng.randint(1000, 9999)}",
+            "agent": rng.choice(AGENTES),
+            "terminal": rng.choice(TERMINAIS),
+            "container_type": _escolha_ponderada(rng, TIPOS_CONTAINER),
+            "container": f"CONT{rng.randint(1000000, 9999999)}",
+            "bl_number": f"BL-{rng.randint(100000, 999999)}",
+            "observations": "",
+            "archived": False,
+        }
+
+        eta = criado_em + timedelta(days=rng.randint(10, 45))
+        free_time = rng.choice([7, 10, 14, 21, 30])
+        processo.update({
+            "eta": _formatar(eta),
+            "free_time": str(free_time),
+            "free_time_expiry": _formatar(eta + timedelta(days=free_time)),
+            "empty_return": _formatar(eta + timedelta(days=free_time + rng.randint(0, 10))),
+            "original_docs": rng.choice(["Sim", "Não"]),
+        })
+
+        if exportacao:
+            embarque = eta - timedelta(days=rng.randint(0, 5))
+            processo.update({
+                "export_type": rng.choice(["maritima", "rodoviaria"]),
+                "cargo_deadline": _formatar(embarque - timedelta(days=rng.randint(3, 7))),
+                "deadline_draft": _formatar(embarque - timedelta(days=rng.randint(7, 14))),
+                "shipping_date": _formatar(embarque),
+            })
+
+        # Eventos manuais espalhados entre a criação e a referência
+        eventos = [_evento(rng, criado_em, "Processo criado", "Admin")]
+        for _ in range(int(rng.expovariate(1 / eventos_medios)) if eventos_medios else 0):
+            dia = criado_em + timedelta(days=rng.randint(0, max(0, (hoje - criado_em).days)))
+            eventos.append(_evento(rng, dia, rng.choice(EVENTOS_MANUAIS), rng.choice(USUARIOS)))
+
+        # Entrada no porto e períodos de armazenagem (com eventos automáticos de atualização)
+        if eta <= hoje:
+            entrada = eta + timedelta(days=rng.randint(0, 3))
+            inicio = entrada
+            fim = inicio + timedelta(days=dias_por_periodo - 1)
+            while fim < hoje and fim < entrada + timedelta(days=dias_por_periodo * 24):
+                inicio = fim + timedelta(days=1)
+                fim = inicio + timedelta(days=dias_por_periodo - 1)
+                eventos.append(_evento(
+                    rng, inicio,
+                    f"Período atualizado automaticamente: início {_formatar(inicio)}, vencimento {_formatar(fim)}",
+                    "Sistema"
+                ))
+            processo.update({
+                "port_entry_date": _formatar(entrada),
+                "current_period_start": _formatar(inicio),
+                "current_period_expiry": _formatar(fim),
+                "storage_days": max(0, (hoje - entrada).days),
+            })
+        else:
+            processo.update({
+                "port_entry_date": "",
+                "current_period_start": "",
+                "current_period_expiry": "",
+                "storage_days": 0,
+            })
+
+        if rng.random() < proporcao_arquivados:
+            processo["archived"] = True
+            arquivado_em = max(criado_em, hoje - timedelta(days=rng.randint(0, 30)))
+            eventos.append(_evento(rng, arquivado_em, "Processo arquivado", "Admin"))
+
+        eventos.sort(key=lambda item: item[0])
+        eventos = [evento for _, evento in eventos]
+        processo["events"] = eventos
+        processo["last_update"] = eventos[-1]["date"]
+        yield processo
+
+
+def _abrir_saida(caminho, compactar):
+    if compactar:
+        # mtime=0 mantém o arquivo compactado idêntico entre execuções com a mesma semente
+        return io.TextIOWrapper(gzip.GzipFile(caminho, "wb", mtime=0), encoding="utf-8")
+    return open(caminho, "w", encoding="utf-8")
+
+
+def escrever_json(caminho, processos, config=None):
+    """Grava os processos em fluxo no formato de data.json (.gz para compactar)
+
+    O arquivo é escrito em um temporário e renomeado ao final, para nunca deixar
+    um data.json pela metade.
+    """
+    temporario = f"{caminho}.tmp"
+    total = 0
+    with _abrir_saida(temporario, caminho.endswith(".gz")) as f:
+        f.write('{"config": ')
+        f.write(json.dumps(config or {"storage_days_per_period": 30}))
+        f.write(', "processes": [')
+        for processo in processos:
+            if total:
+                f.write(",")
+            f.write("\n")
+            f.write(json.dumps(processo, ensure_ascii=False))
+            total += 1
+        f.write("\n]}\n")
+    os.replace(temporario, caminho)
+    return total
+
+
+def escrever_jsonl(caminho, processos):
+    """Grava um processo por linha (JSON Lines; .gz para compactar)"""
+    temporario = f"{caminho}.tmp"
+    total = 0
+    with _abrir_saida(temporario, caminho.endswith(".gz")) as f:
+        for processo in processos:
+            f.write(json.dumps(processo, ensure_ascii=False))
+            f.write("\n")
+            total += 1
+    os.replace(temporario, caminho)
+    return total
+
+
+def escrever_em_lotes(destino, processos, tamanho_lote=1000):
+    """Entrega os processos em lotes a qualquer destino (função que recebe uma lista)
+
+    Permite alimentar outros backends de armazenamento sem materializar todo o conjunto.
+    """
+    total = 0
+    lote = []
+    for processo in processos:
+        lote.append(processo)
+        if len(lote) >= tamanho_lote:
+            destino(lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        destino(lote)
+        total += len(lote)
+    return total
+
+
+def gerar_dados_sinteticos(quantidade, caminho, semente=42, **opcoes):
+    """Gera e grava os processos; o formato é escolhido pela extensão (.json, .jsonl, .gz)"""
+    processos = gerar_processos(quantidade, semente=semente, **opcoes)
+    if caminho.endswith((".jsonl", ".jsonl.gz")):
+        return escrever_jsonl(caminho, processos)
+    return escrever_json(caminho, processos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("quantidade", type=int)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default="dados_sinteticos.json",
+                        help="Arquivo de saída (.json, .json.gz, .jsonl, .jsonl.gz)")
+    parser.add_argument("--data-referencia", default=DATA_REFERENCIA_PADRAO.isoformat(),
+                        help="Data considerada 'hoje' (AAAA-MM-DD)")
+    parser.add_argument("--exportacao", type=float, default=0.3, help="Fração de exportações")
+    parser.add_argument("--arquivados", type=float, default=0.15, help="Fração de arquivados")
+    parser.add_argument("--eventos", type=float, default=6, help="Média de eventos manuais por processo")
+    parser.add_argument("--dispersao-dias", type=int, default=365)
+    args = parser.parse_args()
+
+    total = gerar_dados_sinteticos(
+        args.quantidade, args.saida, semente=args.semente,
+        data_referencia=date.fromisoformat(args.data_referencia),
+        proporcao_exportacao=args.exportacao,
+        proporcao_arquivados=args.arquivados,
+        eventos_medios=args.eventos,
+        dispersao_dias=args.dispersao_dias
+    )
+    print(f"{total} processos gravados em {args.saida}")
@@ -8,6 +8,13 @@ import random
 from datetime import datetime, timedelta
 import os
 
+import backups
+import json_codec
+from file_lock import file_lock
+
+# data.json no diretório de dados (DATA_DIR)
+ARQUIVO_DADOS = backups.data_path("data.json")
+
 def gerar_data_aleatoria(inicio, fim):
     """Gera uma data aleatória entre duas datas"""
     delta = fim - inicio
@@ -140,8 +147,8 @@ def gerar_processo_aleatorio(id_processo):
 def gerar_dados_teste(quantidade=100):
     """Gera a quantidade especificada de processos de teste"""
     # Verificar se já existe arquivo de dados
-    if os.path.exists("data.json"):
-        with open("data.json", "r") as f:
+    if os.path.exists(ARQUIVO_DADOS):
+        with open(ARQUIVO_DADOS, "r") as f:
             try:
                 dados = json.load(f)
                 processos_existentes = dados.get("processes", [])
@@ -161,22 +168,20 @@ def gerar_dados_teste(quantidade=100):
     # Combinar processos existentes com novos
     todos_processos = processos_existentes + novos_processos
     
-    # Criar backup do arquivo existente (se houver)
-    if os.path.exists("data.json"):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"data_backup_{timestamp}.json"
-        with open(backup_filename, "w") as f:
-            with open("data.json", "r") as original:
-                f.write(original.read())
-            print(f"Backup criado em {backup_filename}")
+    # Criar backup dos dados existentes (se houver); restaurar_backup.py volta para ele
+    if os.path.exists(ARQUIVO_DADOS):
+        print(f"Backup criado: {backups.create_backup(label='gerar_dados_teste')}")
     
     # Salvar novos dados
     dados = {"processes": todos_processos}
-    with open("data.json", "w") as f:
-        json.dump(dados, f, indent=2)
+    # Gravação atômica: sessões abertas nunca leem um data.json pela metade e
+    # recarregam só os processos alterados (ver data_watcher.py)
+    json_codec.dump_file(ARQUIVO_DADOS, dados)
     
     print(f"Total de {len(todos_processos)} processos salvos em data.json")
 
 if __name__ == "__main__":
-    gerar_dados_teste(100)
+    # Sob a trava de data.json: gravações do app não se intercalam com a leitura e a gravação
+    with file_lock(ARQUIVO_DADOS):
+        gerar_dados_teste(100)
     print("Dados de teste gerados com sucesso!")
\ No newline at end of file
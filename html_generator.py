@@ -6,10 +6,14 @@ import base64
 from datetime import datetime
 from data import get_process_by_id, get_processes_df
 from utils import format_date, get_status_color
+from instrumentation import timed, file_size
+from metrics import EXPORT_DURATION
 
 HTML_EXPORTS_DIR = "html_exports"
 
 
+@timed("generate_process_html", bytes_written=lambda result: file_size(result[0]))
+@EXPORT_DURATION.time(format="html")
 def generate_process_html(process_id, include_details=True):
     """
     Gera um arquivo HTML contendo as informações do processo especificado.
@@ -440,6 +444,8 @@ def generate_process_html(process_id, include_details=True):
     return filepath, filename
 
 
+@timed("generate_processes_table_html", bytes_written=lambda result: file_size(result[0]))
+@EXPORT_DURATION.time(format="html")
 def generate_processes_table_html(filtered_df=None, process_ids=None, include_details=True, client_filter=None, client_name=None, archived=False):
     """
     Gera um arquivo HTML contendo uma tabela de processos com funcionalidade de expansão de detalhes.
@@ -455,26 +461,26 @@ def generate_processes_table_html(filtered_df=None, process_ids=None, include_de
     Returns:
         tuple: (caminho do arquivo gerado, URL relativo)
     """
+    # Filtrar por cliente (novo): processos vinculados vêm do índice de vínculos
+    if client_filter:
+        from components.auth import get_client_process_ids
+        client_process_ids = get_client_process_ids(client_filter)
+        
+        if client_process_ids:
+            if process_ids is None:
+                process_ids = client_process_ids
+            else:
+                client_process_set = set(client_process_ids)
+                process_ids = [pid for pid in process_ids if pid in client_process_set]
+    
     # Obter dados
     if filtered_df is None:
-        filtered_df = get_processes_df()
-    
-    # Filtrar por IDs específicos (para visualização de cliente)
-    if process_ids is not None:
+        # Apenas os processos selecionados são lidos quando há filtro por IDs/cliente
+        filtered_df = get_processes_df(include_archived=archived, process_ids=process_ids)
+    elif process_ids is not None:
+        # Filtrar por IDs específicos (para visualização de cliente)
         filtered_df = filtered_df[filtered_df['id'].isin(process_ids)]
     
-    # Filtrar por cliente (novo)
-    if client_filter:
-        from components.auth import get_users
-        users = get_users()
-        
-        # Encontrar o cliente pelo ID
-        client = next((u for u in users if u['id'] == client_filter), None)
-        
-        if client and 'processes' in client and client['processes']:
-            # Filtrar processos pelo cliente selecionado
-            filtered_df = filtered_df[filtered_df['id'].isin(client['processes'])]
-    
     # Verificar se há dados
     if filtered_df.empty:
         return None, None
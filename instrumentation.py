@@ -0,0 +1,214 @@
+"""
+Instrumentação leve de tempo de execução
+
+Decorador (`timed`) e gerenciador de contexto (`measure`) que registram tempo
+de parede, número de chamadas e bytes gravados de operações como load_data,
+save_data, get_processes_df, as telas display_* e as exportações.
+
+As medições ficam em um buffer circular em memória (as últimas
+INSTRUMENTATION_BUFFER_SIZE chamadas) e em totais acumulados por operação
+desde o início do processo. A página de Desempenho (components/performance.py)
+mostra os dados para administradores.
+
+Desativada por padrão: com APP_INSTRUMENTATION diferente de "1" o custo por
+chamada é uma única verificação de flag. Pode ser ligada/desligada em tempo de
+execução com set_enabled().
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+INSTRUMENTATION_BUFFER_SIZE = int(os.environ.get('APP_INSTRUMENTATION_BUFFER', 5000))
+
+_enabled = os.environ.get('APP_INSTRUMENTATION', '0') == '1'
+_started_at = time.time()
+_records = deque(maxlen=INSTRUMENTATION_BUFFER_SIZE)
+_totals = {}
+_lock = threading.Lock()
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Liga ou desliga a coleta (vale para todas as sessões do processo)"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def record(name, seconds, bytes_written=0, error=False):
+    """Registra uma medição no buffer e nos totais da operação"""
+    with _lock:
+        _records.append((time.time(), name, seconds, bytes_written, error))
+        totals = _totals.get(name)
+        if totals is None:
+            totals = _totals[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0, "bytes": 0, "errors": 0}
+        totals["calls"] += 1
+        totals["total_s"] += seconds
+        totals["max_s"] = max(totals["max_s"], seconds)
+        totals["bytes"] += bytes_written
+        totals["errors"] += 1 if error else 0
+
+
+class _Measurement:
+    """Medição em andamento; quem mede pode informar os bytes gravados"""
+    __slots__ = ("bytes_written",)
+
+    def __init__(self):
+        self.bytes_written = 0
+
+
+@contextmanager
+def measure(name):
+    """Mede o bloco `with`:
+
+        with measure("export_to_csv") as m:
+            data = df.to_csv()
+            m.bytes_written = len(data)
+    """
+    if not _enabled:
+        yield _Measurement()
+        return
+    measurement = _Measurement()
+    start = time.perf_counter()
+    error = False
+    try:
+        yield measurement
+    except Exception:
+        error = True
+        raise
+    finally:
+        record(name, time.perf_counter() - start, measurement.bytes_written, error)
+
+
+def timed(name=None, bytes_written=None):
+    """Decorador que mede cada chamada da função
+
+    Args:
+        name: Nome da operação (padrão: módulo.função)
+        bytes_written: Função opcional que recebe o retorno e devolve os bytes gravados/gerados
+
+    Exceções de controle do Streamlit (st.rerun/st.stop) também são medidas,
+    mas não contam como erro.
+    """
+    def decorator(func):
+        operation = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = None
+            error = False
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception as e:
+                error = not _is_control_flow(e)
+                raise
+            finally:
+                size = 0
+                if bytes_written is not None and result is not None:
+                    try:
+                        size = int(bytes_written(result) or 0)
+                    except Exception:
+                        size = 0
+                record(operation, time.perf_counter() - start, size, error)
+
+        return wrapper
+    return decorator
+
+
+def _is_control_flow(exception):
+    # RerunException/StopException do Streamlit interrompem o script de propósito
+    return type(exception).__name__ in ("RerunException", "StopException")
+
+
+def payload_size(result):
+    """Tamanho de um retorno bytes/str (para usar em timed(bytes_written=...))"""
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    return 0
+
+
+def file_size(path):
+    """Tamanho do arquivo em `path` (0 se não existir)"""
+    try:
+        return os.path.getsize(path) if path else 0
+    except OSError:
+        return 0
+
+
+def get_records():
+    """Cópia do buffer: lista de (timestamp, operação, segundos, bytes, erro)"""
+    with _lock:
+        return list(_records)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def summary():
+    """Resumo por operação: totais desde o início e percentis das chamadas no buffer"""
+    with _lock:
+        totals = {name: dict(values) for name, values in _totals.items()}
+        records = list(_records)
+
+    durations = {}
+    for _, name, seconds, _, _ in records:
+        durations.setdefault(name, []).append(seconds)
+
+    rows = []
+    for name, values in totals.items():
+        recent = sorted(durations.get(name, []))
+        rows.append({
+            "operacao": name,
+            "chamadas": values["calls"],
+            "erros": values["errors"],
+            "total_s": round(values["total_s"], 4),
+            "media_ms": round(values["total_s"] / values["calls"] * 1000, 2) if values["calls"] else 0.0,
+            "p50_ms": round(_percentile(recent, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(recent, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(recent, 0.99) * 1000, 2),
+            "max_ms": round(values["max_s"] * 1000, 2),
+            "bytes": values["bytes"],
+        })
+    rows.sort(key=lambda row: row["total_s"], reverse=True)
+    return rows
+
+
+def slowest(limit=20):
+    """As chamadas mais lentas ainda presentes no buffer"""
+    records = sorted(get_records(), key=lambda item: item[2], reverse=True)[:limit]
+    return [
+        {
+            "quando": time.strftime("%d/%m/%Y %H:%M:%S", time.localtime(timestamp)),
+            "operacao": name,
+            "ms": round(seconds * 1000, 2),
+            "bytes": size,
+            "erro": error,
+        }
+        for timestamp, name, seconds, size, error in records
+    ]
+
+
+def uptime_seconds():
+    return time.time() - _started_at
+
+
+def reset():
+    """Apaga o buffer e os totais"""
+    with _lock:
+        _records.clear()
+        _totals.clear()
@@ -0,0 +1,169 @@
+"""
+Codificação JSON do arquivo de dados
+
+Usa orjson quando instalado (bem mais rápido para ler e gravar) e o módulo
+json da biblioteca padrão caso contrário; os dois caminhos produzem e aceitam
+o mesmo formato.
+
+- Gravação compacta (padrão do data.json): sem indentação nem espaços, em
+  UTF-8. É o formato que save_data usa; o arquivo fica bem menor e mais
+  rápido de ler e escrever.
+- Gravação legível (pretty): indentada, para exportações e backups que
+  pessoas vão abrir.
+
+Arquivos terminados em .gz são gravados e lidos com compressão gzip (usado
+na partição de processos arquivados).
+
+A gravação em arquivo é atômica: os dados vão para um arquivo temporário no
+mesmo diretório, que substitui o destino com os.replace, então um leitor
+nunca encontra um data.json pela metade. A exceção é um arquivo montado
+sozinho no Docker (volume "./data.json:/app/data.json"), que não pode ser
+substituído (EBUSY): aí o conteúdo é copiado por cima do arquivo, sem a
+garantia de atomicidade. Monte o diretório de dados (DATA_DIR) em vez disso.
+
+Registros compactos (records.Process/Event) são convertidos com
+records.to_json.
+
+Uso:
+    python json_codec.py data.json exportado.json --legivel   # exportação para leitura
+    python json_codec.py data.json data.json                  # recompactar
+"""
+
+import errno
+import gc
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from records import to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def loads(content):
+    """Decodifica JSON a partir de bytes ou str"""
+    # Como em records.compact_processes: a decodificação cria milhões de objetos
+    # de uma vez, e o coletor de ciclos rodaria repetidas vezes sobre eles
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if orjson is not None:
+            return orjson.loads(content)
+        return json.loads(content)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def dumps(obj, pretty=False):
+    """Codifica para bytes UTF-8 (compacto por padrão, indentado com pretty=True)"""
+    if orjson is not None:
+        # Sem PASSTHROUGH o orjson serializa os dataclasses de records campo a
+        # campo (incluindo slots vazios); com ele, passam por records.to_json
+        option = orjson.OPT_PASSTHROUGH_DATACLASS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=to_json, option=option)
+    if pretty:
+        text = json.dumps(obj, default=to_json, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(obj, default=to_json, ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def canonical_dumps(obj):
+    """Codificação canônica (chaves ordenadas, compacta, UTF-8) usada nos hashes de conteúdo
+
+    Os hashes de processos (data_watcher.process_fingerprints, objetos de
+    backups.py) precisam dos mesmos bytes com ou sem orjson, e não podem depender
+    da ordem das chaves. Os dois caminhos produzem a mesma saída para os tipos
+    usados nos processos (texto, inteiros, booleanos, null, listas e objetos);
+    números de ponto flutuante são formatados de modo diferente, e os processos
+    não os usam (ver data.PROCESS_SCHEMA).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=to_json,
+                            option=orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, default=to_json, ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def load_file(path):
+    """Lê e decodifica um arquivo JSON (compacto ou indentado; .gz comprimido)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return loads(f.read())
+
+
+@contextmanager
+def atomic_file(path):
+    """Arquivo temporário (binário) no diretório de path, que o substitui ao sair sem erro
+
+    Permite gravar o conteúdo aos poucos (restauração de backup, ver backup_file.py)
+    com a mesma garantia de dump_file; se o bloco levantar exceção, path fica intacto.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        # mkstemp cria o arquivo com permissão 0600; manter a do arquivo substituído
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        try:
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Destino é um ponto de montagem (arquivo montado sozinho no Docker)
+            if e.errno != errno.EBUSY:
+                raise
+            print(f"{path} não pode ser substituído (ponto de montagem); gravando no próprio arquivo")
+            _copy_in_place(tmp_path, path)
+            os.remove(tmp_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _copy_in_place(source, path):
+    """Copia source por cima de path sem trocar o arquivo (mantém o inode montado)"""
+    with open(source, "rb") as src, open(path, "r+b") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+        dst.truncate()
+        dst.flush()
+        os.fsync(dst.fileno())
+
+
+def dump_file(path, obj, pretty=False):
+    """Grava obj em path de forma atômica; retorna o número de bytes gravados"""
+    content = dumps(obj, pretty=pretty)
+    if path.endswith(".gz"):
+        # mtime=0: o mesmo conteúdo gera sempre os mesmos bytes
+        content = gzip.compress(content, compresslevel=6, mtime=0)
+    with atomic_file(path) as f:
+        f.write(content)
+    return len(content)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converte um arquivo de dados entre o formato compacto e o legível")
+    parser.add_argument("origem")
+    parser.add_argument("destino")
+    parser.add_argument("--legivel", action="store_true", help="grava indentado, para leitura por pessoas")
+    args = parser.parse_args()
+
+    tamanho = dump_file(args.destino, load_file(args.origem), pretty=args.legivel)
+    print(f"{args.destino}: {tamanho} bytes ({'orjson' if HAS_ORJSON else 'json'})")
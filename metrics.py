@@ -0,0 +1,421 @@
+"""
+Métricas no formato de exposição do Prometheus (text format 0.0.4)
+
+Implementação mínima, sem dependências: contadores, gauges e histogramas com
+rótulos, um registro global e um servidor HTTP em porta lateral (/metrics).
+
+O servidor é iniciado por app.py quando METRICS_PORT está definido (ex.: 9464
+no docker-compose.yml) e roda uma única vez por processo, em uma thread
+daemon, fora do ciclo de reruns do Streamlit.
+
+Métricas coletadas:
+- app_reruns_total / app_rerun_duration_seconds, por página
+- app_data_writes_total / app_data_write_duration_seconds / app_data_file_bytes
+- app_export_duration_seconds, por formato (excel, csv, html)
+- app_share_token_validations_total, por resultado (valid, invalid)
+- app_email_queue_depth / app_sms_queue_depth
+- app_active_sessions (via API interna do Streamlit; omitida se indisponível)
+- process_resident_memory_bytes
+
+Para conferir a saída sem Prometheus:
+    python metrics.py --verificar
+"""
+
+import functools
+import math
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buckets (segundos) adequados a reruns e exportações de uma aplicação Streamlit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape_label(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: rótulos esperados {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """Contador monotônico"""
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Contadores só podem aumentar")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Valor que sobe e desce; pode ser calculado na hora da coleta com set_function()"""
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Usa function() (sem rótulos) como valor; None faz a métrica não ser exposta"""
+        self._function = function
+
+    def get(self, **labels):
+        if self._function is not None:
+            return self._function()
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                value = None
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Histograma cumulativo com buckets fixos"""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets)) + (math.inf,)
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """Decorador que observa a duração de cada chamada"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, **labels)
+            return wrapper
+        return decorator
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+RERUNS = REGISTRY.register(Counter(
+    "app_reruns_total", "Execuções completas do script por página", ["page"]))
+RERUN_DURATION = REGISTRY.register(Histogram(
+    "app_rerun_duration_seconds", "Duração das execuções do script por página", ["page"]))
+DATA_WRITES = REGISTRY.register(Counter(
+    "app_data_writes_total", "Gravações de data.json", ["result"]))
+DATA_WRITE_DURATION = REGISTRY.register(Histogram(
+    "app_data_write_duration_seconds", "Duração das gravações de data.json"))
+DATA_FILE_BYTES = REGISTRY.register(Gauge(
+    "app_data_file_bytes", "Tamanho de data.json após a última gravação"))
+EXPORT_DURATION = REGISTRY.register(Histogram(
+    "app_export_duration_seconds", "Duração das exportações por formato", ["format"]))
+TOKEN_VALIDATIONS = REGISTRY.register(Counter(
+    "app_share_token_validations_total", "Validações de links de compartilhamento", ["result"]))
+EMAIL_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "app_email_queue_depth", "Emails aguardando envio na fila"))
+SMS_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "app_sms_queue_depth", "SMS aguardando envio no despachante"))
+ACTIVE_SESSIONS = REGISTRY.register(Gauge(
+    "app_active_sessions", "Sessões do Streamlit ativas neste processo"))
+RESIDENT_MEMORY = REGISTRY.register(Gauge(
+    "process_resident_memory_bytes", "Memória residente do processo"))
+
+
+def record_rerun(page, started):
+    """Conta uma execução completa do script e sua duração (started = time.perf_counter() no início)"""
+    RERUNS.inc(page=page)
+    RERUN_DURATION.observe(time.perf_counter() - started, page=page)
+
+
+def _email_queue_depth():
+    # Não cria a fila só para medir: sem fila, nada foi enfileirado
+    import email_queue
+    queue = email_queue._email_queue
+    return queue.pending() if queue is not None else 0
+
+
+def _sms_queue_depth():
+    import sms_dispatcher
+    dispatcher = sms_dispatcher._dispatcher
+    return dispatcher.stats()["pending"] if dispatcher is not None else 0
+
+
+def _active_sessions():
+    # O Streamlit não tem API pública para contar sessões: usa o SessionManager do Runtime
+    # (atributo privado, pode mudar entre versões). Se não existir mais, a métrica deixa
+    # de ser exposta em vez de quebrar /metrics
+    from streamlit.runtime import Runtime
+    if not Runtime.exists():
+        return None
+    try:
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except AttributeError:
+        return None
+
+
+def _resident_memory():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+EMAIL_QUEUE_DEPTH.set_function(_email_queue_depth)
+SMS_QUEUE_DEPTH.set_function(_sms_queue_depth)
+ACTIVE_SESSIONS.set_function(_active_sessions)
+RESIDENT_MEMORY.set_function(_resident_memory)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sem log por requisição: o Prometheus coleta a cada poucos segundos
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """Inicia o servidor /metrics uma única vez por processo
+
+    Sem `port`, usa METRICS_PORT; se nenhum estiver definido, não faz nada.
+    Retorna o servidor (ou None).
+    """
+    global _server
+    if port is None:
+        port = os.environ.get("METRICS_PORT")
+        if not port:
+            return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+                _server.daemon_threads = True
+            except OSError as e:
+                print(f"Erro ao iniciar o servidor de métricas na porta {port}: {e}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+            print(f"Métricas disponíveis em http://{host}:{_server.server_address[1]}/metrics")
+        return _server
+
+
+_SAMPLE_RE = re.compile(
+    r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>[^ ]+)$')
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_exposition(text):
+    """Lê o formato de exposição e retorna {nome: {"type", "help", "samples": [(nome, rótulos, valor)]}}
+
+    Usado para conferir a saída (python metrics.py --verificar); levanta ValueError
+    em linhas malformadas, amostras sem # TYPE ou histogramas inconsistentes.
+    """
+    families = {}
+    current = None
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line:
+            continue
+        if line.startswith("# HELP "):
+            name, _, documentation = line[7:].partition(" ")
+            families.setdefault(name, {"type": None, "help": None, "samples": []})["help"] = documentation
+            continue
+        if line.startswith("# TYPE "):
+            name, _, type_name = line[7:].partition(" ")
+            if type_name not in ("counter", "gauge", "histogram", "summary", "untyped"):
+                raise ValueError(f"Linha {number}: tipo desconhecido {type_name!r}")
+            families.setdefault(name, {"type": None, "help": None, "samples": []})["type"] = type_name
+            current = name
+            continue
+        if line.startswith("#"):
+            continue
+        match = _SAMPLE_RE.match(line)
+        if not match:
+            raise ValueError(f"Linha {number}: amostra malformada: {line!r}")
+        sample_name = match.group("name")
+        labels = dict(_LABEL_RE.findall(match.group("labels") or ""))
+        value = float(match.group("value").replace("+Inf", "inf").replace("-Inf", "-inf"))
+        if current is None or not sample_name.startswith(current):
+            raise ValueError(f"Linha {number}: amostra {sample_name} fora de uma família declarada")
+        families[current]["samples"].append((sample_name, labels, value))
+
+    for name, family in families.items():
+        if family["type"] != "histogram":
+            continue
+        series = {}
+        for sample_name, labels, value in family["samples"]:
+            key = tuple(sorted((k, v) for k, v in labels.items() if k != "le"))
+            entry = series.setdefault(key, {"buckets": [], "count": None})
+            if sample_name == f"{name}_bucket":
+                entry["buckets"].append((float(labels["le"].replace("+Inf", "inf")), value))
+            elif sample_name == f"{name}_count":
+                entry["count"] = value
+        for key, entry in series.items():
+            counts = [count for _, count in sorted(entry["buckets"])]
+            if not counts or counts != sorted(counts):
+                raise ValueError(f"{name}{dict(key)}: buckets não cumulativos")
+            if sorted(entry["buckets"])[-1][0] != math.inf or counts[-1] != entry["count"]:
+                raise ValueError(f"{name}{dict(key)}: bucket +Inf diferente de _count")
+    return families
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verificar", action="store_true",
+                        help="Gera amostras de exemplo, valida a saída com parse_exposition e imprime o texto")
+    parser.add_argument("--porta", type=int, help="Sobe apenas o servidor de métricas nesta porta")
+    args = parser.parse_args()
+
+    if args.verificar:
+        RERUNS.inc(page="home")
+        RERUN_DURATION.observe(0.12, page="home")
+        DATA_WRITES.inc(result="ok")
+        DATA_WRITE_DURATION.observe(0.02)
+        DATA_FILE_BYTES.set(1024)
+        EXPORT_DURATION.observe(0.3, format="excel")
+        TOKEN_VALIDATIONS.inc(result="invalid")
+        output = REGISTRY.render()
+        families = parse_exposition(output)
+        print(output)
+        print(f"OK: {len(families)} famílias de métricas válidas")
+    elif args.porta:
+        start_metrics_server(args.porta)
+        while True:
+            time.sleep(3600)
+    else:
+        print(REGISTRY.render())
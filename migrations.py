@@ -0,0 +1,138 @@
+"""
+Migrações versionadas do esquema de data.json
+
+O arquivo de dados guarda a versão do esquema em "schema_version". Cada
+migração é registrada com um número de versão e aplicada uma única vez, em
+ordem; depois de aplicada, a versão é gravada junto com os dados e as cargas
+seguintes não percorrem mais os processos. Arquivos sem "schema_version"
+(versão 0) recebem todas as migrações.
+
+Para adicionar uma migração, registre uma nova função com a próxima versão:
+
+    @migration(4, "Descrição curta")
+    def _minha_migracao(data):
+        for process in data["processes"]:
+            ...
+
+As migrações devem ser idempotentes: arquivos reescritos por scripts externos
+(gerar_*.py, restaurar_backup.py) podem voltar sem versão e ser migrados de novo.
+
+Uso (migra data.json no próprio arquivo):
+    python migrations.py [--arquivo data.json]
+"""
+
+import uuid
+
+from events import compact_period_events, parse_event_date, sort_events
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+# (versão, descrição, função), em ordem crescente de versão
+MIGRATIONS = []
+
+# Tipos de carga que registros antigos guardavam em 'type'
+LEGACY_CONTAINER_TYPES = ("FCL 1 X 40", "FCL 1 X 20", "LCL")
+
+
+def migration(version, description):
+    """Registra uma função de migração para a versão informada"""
+    def register(func):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"Migração {version} fora de ordem (última: {MIGRATIONS[-1][0]})")
+        MIGRATIONS.append((version, description, func))
+        return func
+    return register
+
+
+def get_schema_version(data):
+    """Versão do esquema dos dados (0 para arquivos anteriores ao versionamento)"""
+    return data.get(SCHEMA_VERSION_KEY, 0)
+
+
+def current_schema_version():
+    """Versão mais recente conhecida (a da última migração registrada)"""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def needs_migration(data):
+    return get_schema_version(data) < current_schema_version()
+
+
+def migrate(data):
+    """Aplica, em ordem, as migrações pendentes e atualiza a versão nos dados
+
+    Retorna a lista de (versão, descrição) aplicadas; lista vazia quando os
+    dados já estão na versão atual. Cabe a quem chama persistir o resultado.
+    """
+    version = get_schema_version(data)
+    applied = []
+    for migration_version, description, func in MIGRATIONS:
+        if migration_version <= version:
+            continue
+        func(data)
+        data[SCHEMA_VERSION_KEY] = migration_version
+        applied.append((migration_version, description))
+    return applied
+
+
+@migration(1, "IDs para eventos sem identificador")
+def _backfill_event_ids(data):
+    for process in data.get("processes", []):
+        for event in process.get("events") or []:
+            if not event.get("id"):
+                event["id"] = str(uuid.uuid4())
+
+
+@migration(2, "Campos 'type' e 'archived' com valores padrão")
+def _default_type_and_archived(data):
+    for process in data.get("processes", []):
+        process.setdefault("type", "importacao")
+        process.setdefault("archived", False)
+
+
+@migration(3, "Tipo de carga antigo em 'type' movido para 'container_type'")
+def _legacy_container_type(data):
+    for process in data.get("processes", []):
+        if process.get("type") in LEGACY_CONTAINER_TYPES:
+            process["container_type"] = process["type"]
+            process["type"] = "importacao"
+
+
+@migration(4, "Data/hora (timestamp) dos eventos e eventos em ordem cronológica")
+def _event_timestamps(data):
+    for process in data.get("processes", []):
+        process_events = process.get("events")
+        if not process_events:
+            continue
+        for event in process_events:
+            if not event.get("timestamp"):
+                event["timestamp"] = parse_event_date(event.get("date") or "")
+        sort_events(process_events)
+
+
+@migration(5, "Eventos automáticos de virada de período seguidos compactados em um resumo")
+def _compact_period_events(data):
+    for process in data.get("processes", []):
+        if process.get("events"):
+            compact_period_events(process["events"])
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    import json_codec
+
+    parser = argparse.ArgumentParser(description="Aplica as migrações pendentes em um arquivo de dados")
+    parser.add_argument("--arquivo", default=os.path.join(os.environ.get("DATA_DIR", "."), "data.json"))
+    args = parser.parse_args()
+
+    dados = json_codec.load_file(args.arquivo)
+
+    aplicadas = migrate(dados)
+    if not aplicadas:
+        print(f"{args.arquivo} já está na versão {get_schema_version(dados)}")
+    else:
+        json_codec.dump_file(args.arquivo, dados)
+        for versao, descricao in aplicadas:
+            print(f"Migração {versao} aplicada: {descricao}")
@@ -6,6 +6,8 @@ import uuid
 import datetime
 from pathlib import Path
 import pandas as pd
+from instrumentation import timed, file_size
+from metrics import EXPORT_DURATION
 
 def format_date(date_str):
     """Formatar data para exibição"""
@@ -1392,6 +1394,8 @@ def generate_html_with_pagination(filtered_df, title="Relatório de Processos",
     
     return str(filepath), f"html_exports/{filename}"
 
+@timed("generate_html_report", bytes_written=lambda result: file_size(result[0]))
+@EXPORT_DURATION.time(format="html")
 def generate_html_report(filtered_df=None, process_ids=None, title="Relatório de Processos", include_details=True, client_filter=None, client_name=None, archived=False):
     """
     Função simplificada para gerar relatório HTML
@@ -1400,29 +1404,26 @@ def generate_html_report(filtered_df=None, process_ids=None, title="Relatório d
     
     # Se não foi fornecido um DataFrame filtrado, criar um
     if filtered_df is None:
-        filtered_df = get_processes_df(include_archived=archived)
-        
         # Filtrar por IDs específicos se fornecidos
-        if process_ids is not None:
-            if isinstance(process_ids, list) and len(process_ids) > 0:
-                filtered_df = filtered_df[filtered_df['id'].isin(process_ids)]
-            else:
-                # Se process_ids for vazio ou inválido, retornar DataFrame vazio
-                import pandas as pd
-                filtered_df = pd.DataFrame()
+        if process_ids is not None and not (isinstance(process_ids, list) and len(process_ids) > 0):
+            # Se process_ids for vazio ou inválido, retornar DataFrame vazio
+            process_ids = []
         
-        # Filtrar por cliente
+        # Filtrar por cliente usando o índice de vínculos cliente -> processos
         if client_filter:
-            from components.auth import get_users
-            users = get_users()
-            for user in users:
-                if user.get('id') == client_filter and 'processes' in user:
-                    client_processes = user.get('processes', [])
-                    if client_processes:
-                        filtered_df = filtered_df[filtered_df['id'].isin(client_processes)]
-                    else:
-                        # Se o cliente não tem processos atribuídos, retornar DataFrame vazio
-                        import pandas as pd
-                        filtered_df = pd.DataFrame()
+            from components.auth import get_client_process_ids
+            client_processes = get_client_process_ids(client_filter)
+            if process_ids is None:
+                process_ids = client_processes
+            else:
+                client_process_set = set(client_processes)
+                process_ids = [pid for pid in process_ids if pid in client_process_set]
+        
+        # Apenas os processos selecionados são lidos e convertidos
+        if process_ids is not None and not process_ids:
+            import pandas as pd
+            filtered_df = pd.DataFrame()
+        else:
+            filtered_df = get_processes_df(include_archived=archived, process_ids=process_ids)
     
     return generate_html_with_pagination(filtered_df, title, include_details, client_name, archived)
\ No newline at end of file
@@ -0,0 +1,297 @@
+"""
+Modelo compacto de registros para processos e eventos
+
+Processos e eventos ficam em memória como objetos com __slots__ em vez de
+dicionários: cada campo conhecido ocupa um slot (8 bytes) em vez de uma
+entrada de dicionário, e valores repetidos (status, tipos, datas, usuários...)
+são internados e compartilhados entre registros.
+
+Os registros se comportam como dicionários (MutableMapping): process["eta"],
+process.get("po", ""), "events" in process, process["x"] = ..., del process["x"]
+continuam funcionando, inclusive para chaves desconhecidas, guardadas em um
+dicionário de extras criado só quando necessário. A conversão para JSON é sem
+perdas: Process.from_dict(d).to_dict() == d.
+
+Uso:
+    data["processes"] = [Process.from_dict(p) for p in data["processes"]]
+    json.dump(data, f, default=to_json)
+"""
+
+import gc
+import sys
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, fields
+
+
+class _Missing:
+    """Marca um slot sem valor (chave ausente no JSON)"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return "MISSING"
+
+    def __reduce__(self):
+        # Mantém a identidade do marcador ao serializar com pickle (st.cache_data)
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class SlottedRecord(MutableMapping):
+    """Base dos registros: mapeia chaves para slots e guarda o restante em `_extras`
+
+    Subclasses são dataclasses com slots=True; `_INTERNED` lista os campos
+    cujos valores de texto são internados (poucos valores distintos).
+    """
+    __slots__ = ()
+    _FIELDS = frozenset()
+    _INTERNED = frozenset()
+
+    @classmethod
+    def _finish(cls):
+        cls._FIELDS = frozenset(f.name for f in fields(cls) if f.name != "_extras")
+        cls._FIELD_ORDER = tuple(f.name for f in fields(cls) if f.name != "_extras")
+        return cls
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        known = cls._FIELDS
+        interned = cls._INTERNED
+        if known.issuperset(data):
+            # Caminho rápido: todas as chaves são campos conhecidos
+            return cls(**{
+                key: sys.intern(value) if type(value) is str and key in interned else value
+                for key, value in data.items()
+            })
+        record = cls()
+        extras = None
+        for key, value in data.items():
+            if key in known:
+                if type(value) is str and key in interned:
+                    value = sys.intern(value)
+                setattr(record, key, value)
+            else:
+                if extras is None:
+                    extras = record._extras = {}
+                extras[key] = value
+        return record
+
+    def to_dict(self):
+        return {key: _plain(value) for key, value in self._shallow_dict().items()}
+
+    def _shallow_dict(self):
+        """Campos preenchidos + extras, sem converter registros aninhados"""
+        result = {}
+        for name in self._FIELD_ORDER:
+            value = getattr(self, name)
+            if value is not MISSING:
+                result[name] = value
+        if self._extras:
+            result.update(self._extras)
+        return result
+
+    def __getitem__(self, key):
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            if value is MISSING:
+                raise KeyError(key)
+            return value
+        if self._extras is None:
+            raise KeyError(key)
+        return self._extras[key]
+
+    def get(self, key, default=None):
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            return default if value is MISSING else value
+        if self._extras is None:
+            return default
+        return self._extras.get(key, default)
+
+    def __contains__(self, key):
+        if key in self._FIELDS:
+            return getattr(self, key) is not MISSING
+        return self._extras is not None and key in self._extras
+
+    def __setitem__(self, key, value):
+        if key in self._FIELDS:
+            if type(value) is str and key in self._INTERNED:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELDS:
+            if getattr(self, key) is MISSING:
+                raise KeyError(key)
+            setattr(self, key, MISSING)
+        elif self._extras is not None and key in self._extras:
+            del self._extras[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for name in self._FIELD_ORDER:
+            if getattr(self, name) is not MISSING:
+                yield name
+        if self._extras:
+            yield from self._extras
+
+    def __len__(self):
+        count = sum(1 for name in self._FIELD_ORDER if getattr(self, name) is not MISSING)
+        return count + (len(self._extras) if self._extras else 0)
+
+    def copy(self):
+        """Cópia rasa como dicionário (mesmo comportamento de dict.copy para quem chama)"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+def _plain(value):
+    """Converte registros aninhados (ex.: lista de eventos) para tipos JSON"""
+    if isinstance(value, SlottedRecord):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+@dataclass(slots=True, eq=False, repr=False)
+class Event(SlottedRecord):
+    id: str = MISSING
+    date: str = MISSING
+    description: str = MISSING
+    user: str = MISSING
+    timestamp: str = MISSING
+    _extras: dict = None
+
+    _INTERNED = frozenset({"date", "description", "user", "timestamp"})
+
+
+@dataclass(slots=True, eq=False, repr=False)
+class Process(SlottedRecord):
+    # Identificação
+    id: str = MISSING
+    ref: str = MISSING
+    type: str = MISSING
+    status: str = MISSING
+    archived: bool = MISSING
+    po: str = MISSING
+    invoice: str = MISSING
+    invoice_number: str = MISSING
+    map: str = MISSING
+    di: str = MISSING
+    observations: str = MISSING
+    # Carga e transporte
+    origin: str = MISSING
+    product: str = MISSING
+    exporter: str = MISSING
+    importer: str = MISSING
+    container: str = MISSING
+    container_type: str = MISSING
+    ship: str = MISSING
+    agent: str = MISSING
+    carrier: str = MISSING
+    terminal: str = MISSING
+    bl_number: str = MISSING
+    tracking_number: str = MISSING
+    # Datas e prazos
+    eta: str = MISSING
+    arrival_date: str = MISSING
+    arrival_forecast: str = MISSING
+    free_time: str = MISSING
+    free_time_expiry: str = MISSING
+    empty_return: str = MISSING
+    return_date: str = MISSING
+    deadline: str = MISSING
+    last_update: str = MISSING
+    created_at: str = MISSING
+    # Armazenagem
+    port_entry_date: str = MISSING
+    current_period_start: str = MISSING
+    current_period_expiry: str = MISSING
+    storage_days: int = MISSING
+    days_per_period: str = MISSING
+    original_docs: str = MISSING
+    original_documents: str = MISSING
+    # Exportação
+    export_type: str = MISSING
+    due_number: str = MISSING
+    due_date: str = MISSING
+    knowledge_number: str = MISSING
+    knowledge_date: str = MISSING
+    endorsement_date: str = MISSING
+    originals_sent_date: str = MISSING
+    client_delivery_date: str = MISSING
+    cargo_deadline: str = MISSING
+    deadline_draft: str = MISSING
+    shipping_date: str = MISSING
+    shipping_terminal: str = MISSING
+    cross_terminal: str = MISSING
+    redex_clearance: str = MISSING
+    dispatch_value: str = MISSING
+    drawback: str = MISSING
+    # Histórico
+    events: list = MISSING
+    # Revisão do registro (incrementada a cada gravação; ver data.write_changes)
+    _rev: int = MISSING
+    _extras: dict = None
+
+    _INTERNED = frozenset({
+        "type", "status", "origin", "product", "exporter", "importer", "container_type",
+        "agent", "carrier", "terminal", "free_time", "days_per_period", "original_docs",
+        "original_documents", "export_type", "shipping_terminal", "cross_terminal",
+        "redex_clearance", "drawback",
+        "eta", "arrival_date", "arrival_forecast", "free_time_expiry", "empty_return",
+        "return_date", "deadline", "last_update", "port_entry_date", "current_period_start",
+        "current_period_expiry", "due_date", "knowledge_date", "endorsement_date",
+        "originals_sent_date", "client_delivery_date", "cargo_deadline", "deadline_draft",
+        "shipping_date",
+    })
+
+    @classmethod
+    def from_dict(cls, data):
+        record = SlottedRecord.from_dict.__func__(cls, data)
+        if type(record.events) is list:
+            record.events = [Event.from_dict(event) if type(event) is dict else event for event in record.events]
+        return record
+
+    def __setitem__(self, key, value):
+        if key == "events" and isinstance(value, list):
+            value = [Event.from_dict(event) if type(event) is dict else event for event in value]
+        SlottedRecord.__setitem__(self, key, value)
+
+
+Event._finish()
+Process._finish()
+
+
+def to_json(obj):
+    """`default` para json.dump/json.dumps: converte registros em dicionários"""
+    if isinstance(obj, SlottedRecord):
+        # Os eventos aninhados voltam para este mesmo `default` quando necessário
+        return obj._shallow_dict()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def compact_processes(processes):
+    """Converte uma lista de processos (dicionários) para registros compactos"""
+    # A conversão cria milhões de objetos de uma vez; sem pausar o coletor de
+    # ciclos, ele roda repetidas vezes sobre objetos que não formam ciclos
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [Process.from_dict(process) if type(process) is dict else process for process in processes]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
@@ -1,15 +1,32 @@
 """
 Script para restaurar os dados originais a partir do backup mais recente.
 Isso removerá os processos gerados automaticamente.
+
+Uso:
+    python restaurar_backup.py                       # backup mais recente
+    python restaurar_backup.py --historico           # backups e processos alterados em cada um
+    python restaurar_backup.py --backup ID           # um backup específico
+    python restaurar_backup.py --backup ID --processo 20230001   # só um processo
 """
 
 import os
-import json
 import glob
-from datetime import datetime
+
+import backups
+import json_codec
+from file_lock import file_lock
 
 def obter_backup_mais_recente():
-    """Encontra o arquivo de backup mais recente"""
+    """Encontra o backup mais recente
+
+    Retorna o ID do backup mais recente de backups.py (sem contar os criados
+    automaticamente antes de uma restauração) ou, se não houver nenhum, o caminho
+    da cópia completa antiga (data_backup_*.json) mais recente.
+    """
+    snapshot_id = backups.latest_snapshot_id()
+    if snapshot_id:
+        return snapshot_id
+    
     arquivos_backup = glob.glob("data_backup_*.json")
     
     if not arquivos_backup:
@@ -20,35 +37,51 @@ def obter_backup_mais_recente():
     arquivos_backup.sort(key=lambda x: os.path.getmtime(x), reverse=True)
     return arquivos_backup[0]
 
-def restaurar_dados():
-    """Restaura os dados do backup mais recente"""
-    backup_file = obter_backup_mais_recente()
+def mostrar_historico():
+    """Lista os backups com os processos alterados em relação ao anterior"""
+    anterior = None
+    for manifesto in backups.list_snapshots():
+        if anterior is None:
+            resumo = "primeiro backup"
+        else:
+            mudancas = backups.diff_snapshots(anterior, manifesto["id"])
+            contagem = {}
+            for mudanca in mudancas.values():
+                contagem[mudanca] = contagem.get(mudanca, 0) + 1
+            resumo = ", ".join(f"{quantidade} {mudanca}(s)" for mudanca, quantidade in sorted(contagem.items())) or "sem alterações"
+        print(f"{manifesto['id']}  {manifesto.get('label', ''):<20}  {resumo}")
+        anterior = manifesto["id"]
+
+def restaurar_dados(backup=None, processo=None):
+    """Restaura os dados do backup informado (padrão: o mais recente)
+
+    Com `processo`, só esse processo volta ao estado do backup.
+    """
+    backup = backup or obter_backup_mais_recente()
     
-    if not backup_file:
+    if not backup:
         return False
     
     try:
-        # Ler dados do backup
-        with open(backup_file, 'r') as f:
-            dados_backup = json.load(f)
-        
-        # Criar backup do arquivo atual (por precaução)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        current_backup = f"data_pre_restauracao_{timestamp}.json"
-        
-        with open("data.json", 'r') as atual:
-            with open(current_backup, 'w') as backup:
-                backup.write(atual.read())
-                print(f"Backup do estado atual criado em {current_backup}")
+        if os.path.exists(backup):
+            # Cópia completa antiga: importada como backup e restaurada como os demais
+            backup = backups.import_legacy_backup(backup)
         
-        # Restaurar dados do backup
-        with open("data.json", 'w') as f:
-            json.dump(dados_backup, f, indent=2)
+        if processo:
+            arquivo = backups.restore_process(backup, processo)
+            print(f"Processo {processo} restaurado do backup {backup} ({arquivo})")
+            return True
         
-        print(f"Dados restaurados com sucesso a partir de {backup_file}")
+        # O estado atual vira um backup antes (rótulo "pre-restauracao"), e só os
+        # processos diferentes do backup são regravados; as sessões abertas recarregam
+        # só os processos que mudaram (ver data_watcher.py)
+        lidos = backups.restore_snapshot(backup)
+        print(f"Dados restaurados com sucesso a partir do backup {backup}")
+        for arquivo, quantidade in lidos.items():
+            print(f"- {arquivo}: {quantidade} processo(s) diferente(s) do estado atual")
         
         # Exibir informações sobre processos
-        processos = dados_backup.get("processes", [])
+        processos = json_codec.load_file(backups.data_path("data.json")).get("processes", [])
         print(f"Restaurados {len(processos)} processos")
         
         # Contar tipos de processos
@@ -63,4 +96,17 @@ def restaurar_dados():
         return False
 
 if __name__ == "__main__":
-    restaurar_dados()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Restaura os dados a partir de um backup")
+    parser.add_argument("--backup", help="ID do backup (padrão: o mais recente)")
+    parser.add_argument("--processo", help="restaura só este processo")
+    parser.add_argument("--historico", action="store_true", help="lista os backups e o que mudou em cada um")
+    args = parser.parse_args()
+
+    if args.historico:
+        mostrar_historico()
+    else:
+        # Sob a trava de data.json: nenhuma gravação do app entre o backup de precaução e a restauração
+        with file_lock(backups.data_path("data.json")):
+            restaurar_dados(args.backup, args.processo)
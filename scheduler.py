@@ -0,0 +1,162 @@
+"""
+Agendador de manutenção diária dos dados
+
+Uma thread em segundo plano (uma por processo do servidor, iniciada após o
+primeiro login; ver app.py) roda a virada dos períodos de armazenagem e o
+recálculo de storage_days uma vez ao iniciar e depois uma vez por dia, no
+horário MAINTENANCE_TIME (padrão 00:05, horário local). A execução ao iniciar
+não faz nada (nem regrava data.json) se "last_rollover" já é de hoje. Todas as
+alterações vão para data.json em uma única gravação, com os eventos "Período
+atualizado automaticamente" de cada processo.
+
+As leituras (load_data, get_processes_df) não fazem mais esse trabalho. A
+gravação é feita sob a trava de data.json (file_lock.py) e incrementa a revisão
+(_rev) dos processos com período virado; as sessões abertas percebem a nova
+versão do arquivo e recarregam os dados no próximo rerun (app.py).
+
+data.json guarda a data da última execução ("last_rollover"), então reinícios
+e outras réplicas não repetem o trabalho no mesmo dia. APP_SCHEDULER=0
+desliga o agendador (a virada pode ser feita com `python scheduler.py`).
+
+A mesma thread cria um backup a cada BACKUP_INTERVAL_MINUTES (padrão 60; 0
+desliga; o primeiro, um intervalo depois de iniciar) e aplica a retenção por
+camadas (ver backups.py). Backups sem alterações desde o anterior não geram
+nada novo.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import instrumentation
+
+MAINTENANCE_TIME = os.environ.get("MAINTENANCE_TIME", "00:05")
+BACKUP_INTERVAL_MINUTES = int(os.environ.get("BACKUP_INTERVAL_MINUTES", "60"))
+
+_scheduler_thread = None
+_scheduler_lock = threading.Lock()
+_run_lock = threading.Lock()
+
+
+def roll_over_periods(data, today=None):
+    """Aplica a virada de período e recalcula storage_days em todos os processos ativos
+
+    Só a virada de período incrementa a revisão (_rev), como em data.write_changes:
+    storage_days é derivado da data de entrada e recalculado aqui todo dia, então
+    mudar só ele não conta como edição (não gera conflito com edições abertas).
+    Retorna a lista de IDs cujo período foi atualizado.
+    """
+    from utils import apply_period_rollover, refresh_storage_days
+
+    days_per_period = data.get("config", {}).get("storage_days_per_period", 30)
+    updated = []
+    for process in data.get("processes", []):
+        try:
+            rolled = bool(process.get("current_period_expiry")) and apply_period_rollover(process, days_per_period)
+            if rolled:
+                updated.append(process["id"])
+                process["_rev"] = process.get("_rev", 0) + 1
+            refresh_storage_days(process)
+        except Exception as e:
+            print(f"Erro ao atualizar período do processo {process.get('id', 'unknown')}: {e}")
+    data["last_rollover"] = (today or datetime.now().date()).isoformat()
+    return updated
+
+
+def run_daily_maintenance(force=False):
+    """Executa a manutenção diária em data.json, se ainda não rodou hoje
+
+    Retorna a lista de IDs com período atualizado, ou None se nada foi feito.
+    """
+    import json_codec
+    from data import DATA_FILE
+    from file_lock import file_lock
+
+    with _run_lock:
+        if not os.path.exists(DATA_FILE):
+            return None
+        with instrumentation.measure("period_rollover"), file_lock(DATA_FILE):
+            data = json_codec.load_file(DATA_FILE)
+            today = datetime.now().date()
+            if not force and data.get("last_rollover") == today.isoformat():
+                return None
+
+            updated = roll_over_periods(data, today)
+            data["_revision"] = data.get("_revision", 0) + 1
+            json_codec.dump_file(DATA_FILE, data)
+
+    if updated:
+        print(f"Períodos atualizados para {len(updated)} processo(s)")
+    return updated
+
+
+def run_backup():
+    """Cria um backup dos dados (se mudaram) e aplica a retenção; retorna o ID do backup"""
+    import backups
+
+    with instrumentation.measure("backup"):
+        snapshot_id = backups.create_backup()
+        removed, removed_objects = backups.prune()
+    if removed or removed_objects:
+        print(f"Retenção de backups: {removed} backup(s) e {removed_objects} objeto(s) removido(s)")
+    return snapshot_id
+
+
+def _seconds_until_next_run(now=None):
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in MAINTENANCE_TIME.split(":"))
+    next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+def _run():
+    # O primeiro backup espera um intervalo inteiro: iniciar o servidor não gera um backup
+    next_backup = time.monotonic() + BACKUP_INTERVAL_MINUTES * 60
+    # A primeira manutenção roda já (não faz nada se a de hoje já rodou)
+    next_maintenance = time.monotonic()
+    while True:
+        if time.monotonic() >= next_maintenance:
+            try:
+                run_daily_maintenance()
+            except Exception as e:
+                print(f"Erro na manutenção diária dos dados: {e}")
+            next_maintenance = time.monotonic() + _seconds_until_next_run()
+        if BACKUP_INTERVAL_MINUTES > 0 and time.monotonic() >= next_backup:
+            try:
+                run_backup()
+            except Exception as e:
+                print(f"Erro ao criar backup dos dados: {e}")
+            next_backup = time.monotonic() + BACKUP_INTERVAL_MINUTES * 60
+        wait = max(next_maintenance - time.monotonic(), 0)
+        if BACKUP_INTERVAL_MINUTES > 0:
+            wait = min(wait, max(next_backup - time.monotonic(), 0))
+        time.sleep(wait)
+
+
+def start_scheduler():
+    """Inicia a thread do agendador (uma vez por processo)"""
+    global _scheduler_thread
+    if os.environ.get("APP_SCHEDULER", "1") == "0":
+        return None
+    with _scheduler_lock:
+        if _scheduler_thread is None:
+            _scheduler_thread = threading.Thread(target=_run, name="daily-maintenance", daemon=True)
+            _scheduler_thread.start()
+        return _scheduler_thread
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Executa a manutenção diária de data.json")
+    parser.add_argument("--forcar", action="store_true", help="executa mesmo se já rodou hoje")
+    args = parser.parse_args()
+
+    resultado = run_daily_maintenance(force=args.forcar)
+    if resultado is None:
+        print("Nada a fazer (já executado hoje ou data.json ausente)")
+    else:
+        print(f"Manutenção concluída: {len(resultado)} período(s) atualizado(s)")
@@ -0,0 +1,215 @@
+"""
+Envio de SMS em lote, concorrente e com limite de taxa
+
+O despachante reutiliza um único transporte (um único Client do Twilio),
+envia mensagens em paralelo por um pool de threads e respeita um limite de
+mensagens por segundo. Envios que falham são tentados novamente com espera
+exponencial. O transporte é plugável: FakeSmsTransport permite testar tudo
+sem rede.
+"""
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class SmsTransport(ABC):
+    """Interface de transporte de SMS"""
+
+    @abstractmethod
+    def send(self, to_phone, body):
+        """Envia uma mensagem e retorna um identificador do envio"""
+
+
+class TwilioSmsTransport(SmsTransport):
+    """Transporte via Twilio, com um único Client reutilizado por todos os envios"""
+
+    def __init__(self, account_sid, auth_token, from_phone):
+        from twilio.rest import Client
+
+        self.from_phone = from_phone
+        self.client = Client(account_sid, auth_token)
+
+    def send(self, to_phone, body):
+        message = self.client.messages.create(body=body, from_=self.from_phone, to=to_phone)
+        return message.sid
+
+
+class FakeSmsTransport(SmsTransport):
+    """Transporte local para testes: guarda as mensagens em memória
+
+    Args:
+        latency: Tempo simulado de cada envio (segundos)
+        fail_numbers: Números para os quais o envio deve falhar
+        transient_failures: Quantos envios (os primeiros) falham antes de o transporte funcionar
+    """
+
+    def __init__(self, latency=0.0, fail_numbers=(), transient_failures=0):
+        self.latency = latency
+        self.fail_numbers = set(fail_numbers)
+        self.transient_failures = transient_failures
+        self.attempts = 0
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, to_phone, body):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.attempts += 1
+            transient = self.transient_failures > 0
+            if transient:
+                self.transient_failures -= 1
+        if transient or to_phone in self.fail_numbers:
+            raise RuntimeError(f"Falha simulada no envio para {to_phone}")
+        with self._lock:
+            self.sent.append((time.monotonic(), to_phone, body))
+            return f"fake-{len(self.sent)}"
+
+
+class RateLimiter:
+    """Limitador de taxa (token bucket) compartilhado entre threads
+
+    Args:
+        rate: Mensagens por segundo
+        burst: Quantas mensagens podem sair de uma vez antes de o limite atuar
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloqueia até haver uma ficha disponível"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class SmsDispatcher:
+    """Despachante de SMS concorrente com limite de taxa
+
+    Args:
+        transport: Implementação de SmsTransport
+        max_workers: Envios simultâneos
+        rate_per_second: Limite de mensagens por segundo (0 desativa o limite)
+        burst: Rajada máxima permitida pelo limitador
+        max_retries: Número de novas tentativas após a primeira falha
+        backoff_base: Espera (segundos) antes da primeira nova tentativa; dobra a cada falha
+        backoff_max: Espera máxima entre tentativas
+    """
+
+    def __init__(self, transport, max_workers=4, rate_per_second=1.0, burst=1,
+                 max_retries=2, backoff_base=1.0, backoff_max=30.0):
+        self.transport = transport
+        self.rate_limiter = RateLimiter(rate_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sms")
+        self._stats_lock = threading.Lock()
+        self._stats = {"sent": 0, "failed": 0, "retried": 0, "pending": 0}
+
+    def _deliver(self, to_phone, body):
+        try:
+            attempt = 0
+            while True:
+                # Cada tentativa (inclusive as novas) consome uma ficha do limite de taxa
+                self.rate_limiter.acquire()
+                try:
+                    result = self.transport.send(to_phone, body)
+                    break
+                except Exception:
+                    if attempt >= self.max_retries:
+                        raise
+                    with self._stats_lock:
+                        self._stats["retried"] += 1
+                    time.sleep(min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                    attempt += 1
+            with self._stats_lock:
+                self._stats["sent"] += 1
+            return result
+        except Exception as e:
+            print(f"Erro ao enviar SMS para {to_phone}: {e}")
+            with self._stats_lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self._stats["pending"] -= 1
+
+    def send(self, to_phone, body):
+        """Agenda o envio de uma mensagem e retorna um Future"""
+        with self._stats_lock:
+            self._stats["pending"] += 1
+        return self._executor.submit(self._deliver, to_phone, body)
+
+    def send_batch(self, messages):
+        """Agenda o envio de uma lista de (telefone, mensagem) e retorna os Futures"""
+        return [self.send(to_phone, body) for to_phone, body in messages]
+
+    @staticmethod
+    def wait_all(futures, timeout=None):
+        """Aguarda os envios e retorna (enviados, falhas)"""
+        done, _ = wait(futures, timeout=timeout)
+        failed = sum(1 for future in done if future.exception() is not None)
+        return len(done) - failed, failed + len(futures) - len(done)
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def shutdown(self, wait_pending=True):
+        self._executor.shutdown(wait=wait_pending)
+
+
+_dispatcher = None
+_dispatcher_key = None
+_dispatcher_lock = threading.Lock()
+
+
+def uses_fake_transport():
+    """SMS_TRANSPORT=fake: transporte local, que não precisa de credenciais do Twilio"""
+    return os.environ.get('SMS_TRANSPORT', 'twilio').lower() == 'fake'
+
+
+def create_transport(account_sid, auth_token, from_phone):
+    """Cria o transporte configurado: SMS_TRANSPORT=fake usa o transporte local (sem rede)"""
+    if uses_fake_transport():
+        return FakeSmsTransport()
+    return TwilioSmsTransport(account_sid, auth_token, from_phone)
+
+
+def get_sms_dispatcher(account_sid, auth_token, from_phone):
+    """Retorna o despachante compartilhado, recriado apenas quando as credenciais mudam
+
+    O limite de taxa vem de SMS_RATE_LIMIT (mensagens/segundo, padrão 1) e a
+    concorrência de SMS_MAX_WORKERS (padrão 4).
+    """
+    global _dispatcher, _dispatcher_key
+    key = (account_sid, auth_token, from_phone, os.environ.get('SMS_TRANSPORT', 'twilio'))
+    with _dispatcher_lock:
+        if _dispatcher is None or _dispatcher_key != key:
+            if _dispatcher is not None:
+                _dispatcher.shutdown(wait_pending=False)
+            _dispatcher = SmsDispatcher(
+                create_transport(account_sid, auth_token, from_phone),
+                max_workers=int(os.environ.get('SMS_MAX_WORKERS', 4)),
+                rate_per_second=float(os.environ.get('SMS_RATE_LIMIT', 1))
+            )
+            _dispatcher_key = key
+        return _dispatcher
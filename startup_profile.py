@@ -0,0 +1,153 @@
+"""
+Relatório de inicialização (cold start) da aplicação
+
+Para cada caminho de entrada (tela de login, validação do link ?token=,
+visualização do cliente por um link válido, painel administrativo) executa, em um processo Python novo:
+- `python -X importtime` sobre os módulos que o caminho importa, resumindo o
+  tempo total e os módulos mais caros;
+- opcionalmente (--primeira-renderizacao), a primeira execução de app.py via
+  streamlit.testing.v1.AppTest, medindo o tempo até a primeira renderização.
+
+Uso:
+    python startup_profile.py [login|token|cliente|admin ...] [--top 15] [--primeira-renderizacao]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos importados por cada caminho de entrada de app.py
+STARTUP_PATHS = {
+    "login": ["streamlit", "metrics", "scheduler", "components.auth"],
+    # Validação do token (também o caminho de um link inválido): sem data/pandas
+    "token": ["streamlit", "metrics", "scheduler", "components.share"],
+    "cliente": ["streamlit", "metrics", "scheduler", "components.share", "components.client_view"],
+    "admin": [
+        "streamlit", "metrics", "scheduler", "components.auth", "data", "components.home", "components.add_edit",
+        "components.view_details", "components.share", "components.settings", "sheets_to_html"
+    ],
+}
+
+_FIRST_RUN_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=120)
+if sys.argv[1]:
+    at.query_params["token"] = sys.argv[1]
+at.run()
+print(json.dumps({"seconds": time.perf_counter() - start, "exceptions": len(at.exception)}))
+"""
+
+
+def parse_importtime(stderr):
+    """Converte a saída de -X importtime em uma lista de (módulo, self_us, cumulativo_us, nível)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        # Cada nível de importação aninhada acrescenta dois espaços antes do nome
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((name.strip(), self_us, cumulative_us, level))
+    return entries
+
+
+def profile_imports(modules):
+    """Importa os módulos em um processo novo com -X importtime e retorna as entradas"""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def measure_first_run(token=""):
+    """Tempo até a primeira renderização de app.py (processo novo, sem caches)"""
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_RUN_SCRIPT, token],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def pick_share_token():
+    """Escolhe um token ativo e válido de shared_links.json (ou um token inválido, se não houver)"""
+    from datetime import datetime
+    try:
+        with open(os.path.join(ROOT_DIR, "shared_links.json"), "r") as f:
+            links = json.load(f).get("links", [])
+    except (OSError, ValueError):
+        links = []
+    today = datetime.now().strftime("%Y-%m-%d")
+    for link in links:
+        if link.get("is_active") and link.get("expiry_date", "") >= today:
+            return link["token"]
+    return "token-invalido-para-perfil"
+
+
+def build_report(path_name, top=15, first_run=False):
+    """Monta o relatório de um caminho de entrada"""
+    entries = profile_imports(STARTUP_PATHS[path_name])
+    # O total é a soma dos módulos de nível superior (os demais já estão no cumulativo)
+    total_us = sum(cumulative for _, _, cumulative, level in entries if level == 0)
+    slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]
+
+    report = {
+        "caminho": path_name,
+        "modulos_importados": len(entries),
+        "tempo_total_importacao_ms": round(total_us / 1000, 1),
+        "mais_lentos_self_ms": [(name, round(self_us / 1000, 1)) for name, self_us, _, _ in slowest],
+    }
+    # O painel administrativo exige login, então a primeira renderização só é medida
+    # para a tela de login e para os links de cliente
+    if first_run and path_name in ("login", "token", "cliente"):
+        token = {"token": "token-invalido-para-perfil", "cliente": pick_share_token()}.get(path_name, "")
+        report["primeira_renderizacao_s"] = round(measure_first_run(token)["seconds"], 3)
+    return report
+
+
+def print_report(report):
+    print(f"== {report['caminho']} ==")
+    print(f"Módulos importados: {report['modulos_importados']}")
+    print(f"Tempo total de importação: {report['tempo_total_importacao_ms']} ms")
+    if "primeira_renderizacao_s" in report:
+        print(f"Primeira renderização (AppTest): {report['primeira_renderizacao_s']} s")
+    print("Módulos mais lentos (self):")
+    for name, self_ms in report["mais_lentos_self_ms"]:
+        print(f"  {self_ms:>9.1f} ms  {name}")
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("caminhos", nargs="*", help=f"Caminhos a medir: {', '.join(STARTUP_PATHS)} (padrão: todos)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--primeira-renderizacao", action="store_true",
+                        help="Mede também a primeira execução de app.py com AppTest")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.caminhos if name not in STARTUP_PATHS]
+    if unknown:
+        parser.error(f"Caminho(s) desconhecido(s): {', '.join(unknown)}")
+
+    reports = [build_report(name, args.top, args.primeira_renderizacao) for name in (args.caminhos or STARTUP_PATHS)]
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+    else:
+        for report in reports:
+            print_report(report)
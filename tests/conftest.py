@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos da aplicação ficam na raiz do repositório
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Diretório temporário como diretório atual (arquivos de dados relativos ficam nele)"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+import streamlit as st
+
+import data
+import file_lock
+import json_codec
+
+
+@pytest.fixture
+def session(workdir, monkeypatch):
+    """data.json (DATA_DIR padrão) com P1 ativo e A1 na partição fria, carregado na sessão"""
+    json_codec.dump_file(data.DATA_FILE, {
+        "_revision": 1,
+        "archived_ids": ["A1"],
+        "processes": [
+            {"id": "P1", "_rev": 1, "status": "Em andamento", "events": []},
+            {"id": "P2", "_rev": 1, "status": "Pendente", "events": []},
+        ],
+    })
+    json_codec.dump_file(data.ARCHIVE_FILE, {"processes": [{"id": "A1", "archived": True, "events": []}]})
+
+    # Toda gravação das duas partições deve acontecer com a trava de data.json
+    writes = []
+    dump_file = json_codec.dump_file
+
+    def recording_dump_file(path, document, *args, **kwargs):
+        entry = file_lock._locks.get(os.path.abspath(data.DATA_FILE))
+        writes.append((os.path.basename(path), bool(entry and entry[2])))
+        return dump_file(path, document, *args, **kwargs)
+
+    monkeypatch.setattr(json_codec, "dump_file", recording_dump_file)
+    # Carregar aplica as migrações de esquema (e grava): só interessam as gravações seguintes
+    st.session_state.data = data.load_data()
+    writes.clear()
+    yield writes
+    st.session_state.clear()
+
+
+def _ids(document):
+    return [process["id"] for process in document["processes"]]
+
+
+def test_archive_process_moves_the_record_to_the_cold_partition(session):
+    assert data.archive_process("P1")
+
+    disk = json_codec.load_file(data.DATA_FILE)
+    archive = json_codec.load_file(data.ARCHIVE_FILE)
+    assert _ids(disk) == ["P2"]
+    assert sorted(_ids(archive)) == ["A1", "P1"]
+    assert sorted(disk["archived_ids"]) == sorted(st.session_state.data["archived_ids"]) == ["A1", "P1"]
+    assert _ids(st.session_state.data) == ["P2"]
+    archived = data.get_archived_index()["P1"]
+    assert archived["archived"] and archived["events"][-1]["description"] == "Processo arquivado"
+    # A partição fria é gravada antes de data.json, as duas sob a trava
+    assert session == [("data_archived.json.gz", True), ("data.json", True)]
+
+
+def test_unarchive_process_moves_the_record_back(session):
+    assert data.unarchive_process("A1")
+
+    disk = json_codec.load_file(data.DATA_FILE)
+    assert sorted(_ids(disk)) == ["A1", "P1", "P2"]
+    assert _ids(json_codec.load_file(data.ARCHIVE_FILE)) == []
+    assert disk["archived_ids"] == st.session_state.data["archived_ids"] == []
+    restored = next(process for process in disk["processes"] if process["id"] == "A1")
+    assert restored["archived"] is False
+    assert "A1" not in data.get_archived_index()
+    # data.json primeiro, depois a remoção da partição fria, as duas sob a trava
+    assert session == [("data.json", True), ("data_archived.json.gz", True)]
+
+
+def test_archive_then_unarchive_round_trip(session):
+    assert data.archive_process("P2")
+    assert data.unarchive_process("P2")
+
+    disk = json_codec.load_file(data.DATA_FILE)
+    assert sorted(_ids(disk)) == ["P1", "P2"]
+    assert _ids(json_codec.load_file(data.ARCHIVE_FILE)) == ["A1"]
+    assert disk["archived_ids"] == ["A1"]
+
+
+def test_unknown_process_is_not_archived(session):
+    assert not data.archive_process("X9")
+    assert not data.unarchive_process("X9")
+    assert session == []
+
+
+def test_move_archived_to_cold_moves_flagged_processes(session):
+    document = {"processes": [
+        {"id": "P1", "events": []},
+        {"id": "P3", "archived": True, "events": []},
+    ]}
+
+    assert data.move_archived_to_cold(document) == 1
+
+    assert _ids(document) == ["P1"]
+    assert sorted(document["archived_ids"]) == ["A1", "P3"]
+    assert sorted(_ids(json_codec.load_file(data.ARCHIVE_FILE))) == ["A1", "P3"]
+    assert session == [("data_archived.json.gz", True)]
+
+
+def test_move_archived_to_cold_with_replace_keeps_only_the_given_archived(session):
+    document = {"processes": [{"id": "P3", "archived": True, "events": []}]}
+
+    assert data.move_archived_to_cold(document, replace=True) == 1
+
+    assert document["archived_ids"] == ["P3"]
+    assert _ids(json_codec.load_file(data.ARCHIVE_FILE)) == ["P3"]
+
+
+def test_move_archived_to_cold_rebuilds_missing_archived_ids(session):
+    document = {"processes": [{"id": "P1", "events": []}]}
+
+    assert data.move_archived_to_cold(document) == 0
+
+    assert document["archived_ids"] == ["A1"]
+    assert session == []
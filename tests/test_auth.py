@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from components import auth
+
+
+@pytest.fixture(autouse=True)
+def fast_hashes(monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_HASH_ITERATIONS", 1000)
+    monkeypatch.setattr(auth, "_verification_cache", {})
+
+
+@pytest.fixture
+def verifications(monkeypatch):
+    """Conta as verificações de hash de fato calculadas"""
+    calls = []
+    verify = auth.verify_password
+
+    def counting(password, stored_password):
+        calls.append(password)
+        return verify(password, stored_password)
+
+    monkeypatch.setattr(auth, "verify_password", counting)
+    return calls
+
+
+def _user(password="segredo"):
+    return {"id": "u1", "password": auth.get_password_hash(password)}
+
+
+def test_hash_format_and_verification():
+    stored = auth.get_password_hash("segredo")
+
+    algorithm, iterations, salt, digest = stored.split("$")
+    assert (algorithm, iterations) == (auth.PASSWORD_HASH_ALGORITHM, "1000")
+    assert auth.get_password_hash("segredo") != stored  # salt aleatório
+    assert auth.verify_password("segredo", stored)
+    assert not auth.verify_password("outra", stored)
+    assert not auth.verify_password("segredo", "pbkdf2_sha256$x$y")
+    assert not auth.verify_password("segredo", "")
+
+
+def test_legacy_plaintext_passwords():
+    assert auth.verify_password("segredo", "segredo")
+    assert not auth.verify_password("outra", "segredo")
+    assert auth.password_needs_rehash("segredo")
+    assert not auth.password_needs_rehash(auth.get_password_hash("segredo"))
+    assert auth.password_needs_rehash(auth.get_password_hash("segredo", iterations=500))
+
+
+def test_successful_verification_is_cached(verifications):
+    user = _user()
+
+    assert auth.check_user_password(user, "segredo")
+    assert auth.check_user_password(user, "segredo")
+    assert verifications == ["segredo"]
+
+
+def test_failures_are_not_cached(verifications):
+    user = _user()
+
+    assert not auth.check_user_password(user, "errada")
+    assert not auth.check_user_password(user, "errada")
+    assert verifications == ["errada", "errada"]
+
+
+def test_cache_entry_expires(verifications, monkeypatch):
+    user = _user()
+    now = [1000.0]
+    monkeypatch.setattr(auth.time, "monotonic", lambda: now[0])
+
+    auth.check_user_password(user, "segredo")
+    now[0] += auth.VERIFICATION_CACHE_TTL + 1
+    auth.check_user_password(user, "segredo")
+
+    assert verifications == ["segredo", "segredo"]
+
+
+def test_password_change_invalidates_cache(verifications):
+    user = _user()
+    auth.check_user_password(user, "segredo")
+
+    user["password"] = auth.get_password_hash("nova")
+
+    assert not auth.check_user_password(user, "segredo")
+    assert auth.check_user_password(user, "nova")
+    assert verifications == ["segredo", "segredo", "nova"]
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(auth, "VERIFICATION_CACHE_MAX_ENTRIES", 3)
+    for i in range(5):
+        user = {"id": f"u{i}", "password": "legada"}
+        assert auth.check_user_password(user, "legada")
+
+    assert len(auth._verification_cache) == 3
+
+
+def test_plaintext_users_file_is_migrated_outside_the_cache(workdir):
+    with open(auth.USERS_FILE, "w") as f:
+        json.dump({"users": [{"id": "u1", "email": "U@x.com", "password": "segredo", "role": "admin"}]}, f)
+    auth._load_user_store.clear()
+
+    user = auth.find_user("u@x.com")
+
+    assert auth.is_password_hashed(user["password"])
+    with open(auth.USERS_FILE) as f:
+        assert auth.is_password_hashed(json.load(f)["users"][0]["password"])
+    assert auth.check_user_password(user, "segredo")
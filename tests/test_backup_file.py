@@ -0,0 +1,122 @@
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+import backup_file
+import backups
+import json_codec
+from backup_file import InvalidBackupError, export_backup, restore_backup, validate_process
+
+
+@pytest.fixture
+def data_dir(workdir, monkeypatch):
+    monkeypatch.setattr(backups, "DATA_DIR", ".")
+    monkeypatch.setattr(backup_file, "DATA_FILE", "data.json")
+    monkeypatch.setattr(backup_file, "ARCHIVE_FILE", "data_archived.json.gz")
+    json_codec.dump_file("data.json", {
+        "schema_version": 5,
+        "_revision": 7,
+        "config": {"storage_days_per_period": 30},
+        "processes": [
+            {"id": "P1", "_rev": 3, "status": "Em andamento", "eta": "10/01/2024", "events": []},
+            {"id": "P2", "_rev": 1, "status": "Pendente", "events": []},
+        ],
+    })
+    return workdir
+
+
+def _backup(*processes, header=None):
+    header = header or {"format": "jgr-backup", "version": 1, "data": {"schema_version": 5}, "processes": len(processes)}
+    lines = [json.dumps(header)] + [json.dumps(process) for process in processes]
+    return io.BytesIO(gzip.compress("\n".join(lines).encode("utf-8")))
+
+
+def _read(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _files():
+    """Bytes dos arquivos de dados (None se não existe)"""
+    return [_read(path) for path in ("data.json", "data_archived.json.gz")]
+
+
+def test_validate_process():
+    assert validate_process({"id": "P1", "eta": "10/01/2024", "storage_days": "12", "events": []}) == []
+    assert validate_process({"id": ""}) == ["sem 'id'"]
+    assert validate_process("texto") == ["não é um objeto JSON"]
+    errors = validate_process({"id": "P1", "eta": "31/02/2024", "storage_days": "dez", "archived": "sim",
+                               "_rev": "1", "events": [{"description": 5}]})
+    assert len(errors) == 5
+
+
+def test_export_and_restore_round_trip(data_dir):
+    before = json_codec.load_file("data.json")
+    with export_backup() as backup:
+        content = backup.read()
+
+    counts = restore_backup(io.BytesIO(content))
+
+    assert counts == {"processes": 2, "archived": 0}
+    after = json_codec.load_file("data.json")
+    # Processos iguais mantêm a revisão; o arquivo recebe um _revision novo
+    assert after["processes"] == before["processes"]
+    assert after["_revision"] == 8
+    assert after["config"] == before["config"]
+    # O estado anterior virou um backup
+    assert [snapshot["label"] for snapshot in backups.list_snapshots()] == [backups.PRE_RESTORE_LABEL]
+
+
+def test_restore_splits_archived_and_bumps_changed_revisions(data_dir):
+    counts = restore_backup(_backup(
+        {"id": "P1", "_rev": 1, "status": "Concluído", "eta": "10/01/2024", "events": []},
+        {"id": "P3", "status": "Pendente", "archived": True, "events": []},
+    ))
+
+    assert counts == {"processes": 1, "archived": 1}
+    data = json_codec.load_file("data.json")
+    assert [(process["id"], process["_rev"], process["status"]) for process in data["processes"]] == [
+        ("P1", 4, "Concluído")]
+    assert data["archived_ids"] == ["P3"]
+    assert [process["id"] for process in json_codec.load_file("data_archived.json.gz")["processes"]] == ["P3"]
+
+
+@pytest.mark.parametrize("backup, message", [
+    (lambda: _backup({"id": "P1", "eta": "amanhã"}), "'eta' não é uma data"),
+    (lambda: _backup({"id": "P1"}, {"id": "P1"}), "ID repetido"),
+    (lambda: _backup({"id": "P1"}, header={"format": "jgr-backup", "version": 1, "data": {}, "processes": 3}),
+     "incompleto: 1 de 3"),
+    (lambda: _backup(header={"format": "jgr-backup", "version": 9, "data": {}}), "mais novo que o suportado"),
+    (lambda: io.BytesIO(gzip.compress(b'{"format": "jgr-backup", "version": 1, "data": {}}\n{"id": ')),
+     "JSON inválido"),
+    (lambda: io.BytesIO(gzip.compress(b'{"format": "jgr-backup", "version": 1, "data": {}, "processes": 1}\n'
+                                      b'{"id": "P1"}\n')[:-12]), "ilegível ou incompleto"),
+    (lambda: io.BytesIO(b'{"config": {}}'), "lista de processos"),
+])
+def test_invalid_backups_leave_data_untouched(data_dir, backup, message):
+    before = _files()
+
+    with pytest.raises(InvalidBackupError) as error:
+        restore_backup(backup())
+
+    assert any(message in text for text in error.value.errors), error.value.errors
+    assert _files() == before
+    assert backups.snapshot_ids() == []
+    # Nenhum temporário sobra no diretório
+    assert not [path for path in data_dir.iterdir() if path.name.startswith(".tmp-")]
+
+
+def test_legacy_single_document_backup_is_accepted(data_dir):
+    legacy = {"config": {"x": 1}, "processes": [{"id": "P9", "status": "Pendente", "events": []}]}
+
+    counts = restore_backup(io.BytesIO(json.dumps(legacy).encode("utf-8")))
+
+    assert counts == {"processes": 1, "archived": 0}
+    data = json_codec.load_file("data.json")
+    assert [process["id"] for process in data["processes"]] == ["P9"]
+    assert data["config"] == {"x": 1}
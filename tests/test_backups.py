@@ -0,0 +1,81 @@
+import os
+from datetime import datetime
+
+import pytest
+
+import backups
+import json_codec
+from data_watcher import _digest, process_fingerprints
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(backups, "DATA_DIR", str(tmp_path / "data"))
+    os.makedirs(tmp_path / "data")
+    return str(tmp_path / "backups")
+
+
+def _write(name, processes, **meta):
+    json_codec.dump_file(backups.data_path(name), dict(meta, processes=processes))
+
+
+def _read(name):
+    return json_codec.load_file(backups.data_path(name))
+
+
+def test_fingerprints_do_not_depend_on_key_order_or_codec(monkeypatch):
+    process = {"id": "P1", "status": "Concluído", "events": [{"id": "e", "description": "ação   \x1f"}]}
+    reordered = {"events": process["events"], "status": "Concluído", "id": "P1"}
+    with_orjson = process_fingerprints([process])
+    assert process_fingerprints([reordered]) == with_orjson
+
+    monkeypatch.setattr(json_codec, "orjson", None)
+    assert process_fingerprints([reordered]) == with_orjson
+
+
+def test_restore_empties_archive_missing_from_snapshot(dirs):
+    _write("data.json", [{"id": "P1", "status": "A"}], _revision=1)
+    snapshot_id = backups.create_backup(backup_dir=dirs, created=datetime(2024, 1, 1, 10))
+
+    _write("data.json", [], _revision=2, archived_ids=["P1"])
+    _write("data_archived.json.gz", [{"id": "P1", "status": "A"}], schema_version=5)
+
+    restored = backups.restore_snapshot(snapshot_id, backup_dir=dirs)
+
+    assert restored == {"data.json": 1, "data_archived.json.gz": 0}
+    assert [process["id"] for process in _read("data.json")["processes"]] == ["P1"]
+    archive = _read("data_archived.json.gz")
+    assert archive["processes"] == []
+    assert archive["schema_version"] == 5
+
+
+def test_unchanged_data_creates_no_new_backup(dirs):
+    _write("data.json", [{"id": "P1"}])
+    first = backups.create_backup(backup_dir=dirs, created=datetime(2024, 1, 1, 10))
+    assert backups.create_backup(backup_dir=dirs, created=datetime(2024, 1, 1, 11)) == first
+
+
+def test_legacy_hashes_are_converted_for_diff(dirs):
+    _write("data.json", [{"id": "P1", "status": "A"}, {"id": "P2", "status": "B"}])
+    snapshot_id = backups.create_backup(backup_dir=dirs, created=datetime(2024, 1, 1, 10))
+
+    # Manifesto e objetos como gravados antes de HASH_FORMAT (hash de json_codec.dumps)
+    manifest = backups.load_snapshot(snapshot_id, dirs)
+    del manifest["hash_format"]
+    for process_id, digest in list(manifest["files"]["data.json"]["processes"].items()):
+        process = json_codec.load_file(backups._object_path(dirs, digest))
+        legacy = _digest(json_codec.dumps(process)).hex()
+        path = backups._object_path(dirs, legacy)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        json_codec.dump_file(path, process)
+        manifest["files"]["data.json"]["processes"][process_id] = legacy
+    json_codec.dump_file(backups._manifest_path(dirs, snapshot_id), manifest)
+
+    _write("data.json", [{"id": "P1", "status": "A"}, {"id": "P2", "status": "C"}])
+
+    assert backups.diff_snapshots(snapshot_id, backup_dir=dirs) == {"P2": "alterado"}
+    assert backups.load_process(snapshot_id, "P2", dirs)["status"] == "B"
+    # O próximo backup é completo, com hashes no formato atual
+    new_id = backups.create_backup(backup_dir=dirs, created=datetime(2024, 1, 1, 11))
+    new_manifest = backups.load_snapshot(new_id, dirs)
+    assert (new_manifest["kind"], new_manifest["hash_format"]) == ("full", backups.HASH_FORMAT)
@@ -0,0 +1,137 @@
+import os
+
+import pytest
+import streamlit as st
+
+import data
+import data_watcher
+import json_codec
+from migrations import current_schema_version
+
+
+@pytest.fixture
+def session(workdir):
+    """data.json (DATA_DIR padrão, já migrado) com três processos, carregado na sessão"""
+    json_codec.dump_file(data.DATA_FILE, {
+        "schema_version": current_schema_version(),
+        "_revision": 1,
+        "archived_ids": [],
+        "processes": [
+            {"id": "P1", "_rev": 1, "status": "Em andamento", "events": []},
+            {"id": "P2", "_rev": 1, "status": "Pendente", "events": []},
+            {"id": "P3", "_rev": 1, "status": "Pendente", "events": []},
+        ],
+    })
+    assert data.sync_session_data()
+    yield st.session_state
+    st.session_state.clear()
+
+
+def _external_write(change):
+    """Altera data.json como outra réplica ou um script faria"""
+    document = json_codec.load_file(data.DATA_FILE)
+    change(document)
+    document["_revision"] += 1
+    json_codec.dump_file(data.DATA_FILE, document)
+
+
+def _records(session):
+    return {process["id"]: process for process in session.data["processes"]}
+
+
+def test_unchanged_file_is_not_reloaded(session):
+    records = _records(session)
+
+    assert not data.sync_session_data()
+
+    assert _records(session) == records
+    assert all(_records(session)[process_id] is record for process_id, record in records.items())
+
+
+def test_rewrite_with_same_content_is_not_reloaded(session):
+    stat = os.stat(data.DATA_FILE)
+    os.utime(data.DATA_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    data_object = session.data
+
+    assert not data.sync_session_data()
+
+    assert session.data is data_object
+    # A assinatura passa a ter o mtime novo: a próxima verificação é só um os.stat
+    assert session.data_signature.mtime_ns == stat.st_mtime_ns + 10**9
+
+
+def test_only_changed_processes_are_rebuilt(session):
+    before = _records(session)
+    _external_write(lambda document: document["processes"][0].update(status="Concluído", _rev=2))
+
+    assert data.sync_session_data()
+
+    after = _records(session)
+    assert after["P1"] is not before["P1"]
+    assert after["P1"]["status"] == "Concluído"
+    assert after["P2"] is before["P2"]
+    assert after["P3"] is before["P3"]
+    assert session.data["_revision"] == json_codec.load_file(data.DATA_FILE)["_revision"]
+
+
+def test_new_and_deleted_processes_are_applied(session):
+    def change(document):
+        del document["processes"][1]
+        document["processes"].append({"id": "P4", "_rev": 1, "status": "Pendente", "events": []})
+
+    _external_write(change)
+
+    assert data.sync_session_data()
+
+    assert [process["id"] for process in session.data["processes"]] == ["P1", "P3", "P4"]
+    assert set(session._process_fingerprints) == {"P1", "P3", "P4"}
+
+
+def test_file_needing_normalization_is_fully_reloaded(session):
+    before = _records(session)
+    # Um processo arquivado gravado em data.json (script antigo) vai para a partição fria
+    _external_write(lambda document: document["processes"][2].update(archived=True))
+
+    assert data.sync_session_data()
+
+    after = _records(session)
+    assert sorted(after) == ["P1", "P2"]
+    assert after["P1"] is not before["P1"]
+    assert session.data["archived_ids"] == ["P3"]
+
+
+def test_reload_error_falls_back_to_full_reload(session, monkeypatch):
+    def failing_reload(*args):
+        raise ValueError("falha simulada")
+
+    monkeypatch.setattr(data, "_reload_changed_processes", failing_reload)
+    before = _records(session)
+    _external_write(lambda document: document["processes"][1].update(status="Concluído", _rev=2))
+
+    assert data.sync_session_data()
+
+    after = _records(session)
+    assert after["P2"]["status"] == "Concluído"
+    assert after["P1"] is not before["P1"]
+
+
+def test_read_if_changed_skips_unchanged_file(workdir):
+    json_codec.dump_file("data.json", {"processes": []})
+    document, signature = data_watcher.read_file("data.json")
+
+    assert document == {"processes": []}
+    assert data_watcher.read_if_changed("data.json", signature) == (None, signature)
+
+    json_codec.dump_file("data.json", {"processes": [{"id": "P1"}]})
+    document, changed = data_watcher.read_if_changed("data.json", signature)
+    assert document == {"processes": [{"id": "P1"}]}
+    assert changed.digest != signature.digest
+
+
+def test_process_fingerprints_ignore_key_order():
+    first = data_watcher.process_fingerprints([{"id": "P1", "status": "A", "ref": "R"}])
+    second = data_watcher.process_fingerprints([{"ref": "R", "status": "A", "id": "P1"}])
+    changed = data_watcher.process_fingerprints([{"id": "P1", "status": "B", "ref": "R"}])
+
+    assert first == second
+    assert first != changed
@@ -0,0 +1,154 @@
+import smtplib
+import threading
+import time
+
+import pytest
+
+import email_queue
+from email_queue import EmailQueue, SMTPConfig
+
+CONFIG = SMTPConfig(server="smtp.example.com", username="user", password="secret")
+
+
+class FakeSMTP:
+    """Servidor SMTP falso: registra conexões e mensagens; falha as primeiras `failures` entregas"""
+
+    connections = []
+    failures = 0
+    lock = threading.Lock()
+
+    def __init__(self, server, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        with FakeSMTP.lock:
+            FakeSMTP.connections.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def noop(self):
+        return (421, b"closed") if self.closed else (250, b"OK")
+
+    def send_message(self, msg):
+        with FakeSMTP.lock:
+            if FakeSMTP.failures:
+                FakeSMTP.failures -= 1
+                self.closed = True
+                raise smtplib.SMTPServerDisconnected("conexão encerrada")
+        self.sent.append(msg["To"])
+
+    def quit(self):
+        self.closed = True
+
+    close = quit
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    monkeypatch.setattr(FakeSMTP, "connections", [])
+    monkeypatch.setattr(FakeSMTP, "failures", 0)
+    monkeypatch.setattr(email_queue.smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+
+def _sent(fake_smtp):
+    return [to_email for conn in fake_smtp.connections for to_email in conn.sent]
+
+
+def test_next_batch_groups_queued_emails_up_to_batch_size(fake_smtp):
+    # Sem threads de entrega: o lote é montado só com o que já está na fila
+    email_q = EmailQueue(workers=0, batch_size=3)
+    email_q.enqueue_many(CONFIG, [f"c{i}@example.com" for i in range(5)], "Assunto", "Mensagem")
+
+    assert [job.to_email for job in email_q._next_batch()] == ["c0@example.com", "c1@example.com", "c2@example.com"]
+    assert [job.to_email for job in email_q._next_batch()] == ["c3@example.com", "c4@example.com"]
+
+
+def test_batch_is_sent_over_one_connection(fake_smtp):
+    email_q = EmailQueue(workers=0, batch_size=10)
+    recipients = [f"c{i}@example.com" for i in range(4)]
+    jobs = email_q.enqueue_many(CONFIG, recipients, "Assunto", "Mensagem")
+
+    worker = threading.Thread(target=email_q._run, daemon=True)
+    worker.start()
+    assert email_q.wait_until_idle(timeout=5)
+
+    assert all(job.wait(0) for job in jobs)
+    assert len(fake_smtp.connections) == 1
+    assert fake_smtp.connections[0].sent == recipients
+    assert email_q.stats()["sent"] == 4
+
+
+def test_idle_connection_is_reused_between_batches(fake_smtp):
+    email_q = EmailQueue(workers=1)
+
+    for i in range(3):
+        assert email_q.enqueue(CONFIG, f"c{i}@example.com", "Assunto", "Mensagem").wait(5)
+
+    # Cada lote pega a conexão ociosa do pool (ainda viva pelo NOOP)
+    assert len(fake_smtp.connections) == 1
+    assert _sent(fake_smtp) == ["c0@example.com", "c1@example.com", "c2@example.com"]
+
+
+def test_failed_delivery_is_retried_with_exponential_backoff(fake_smtp, monkeypatch):
+    delays = []
+    timer = threading.Timer
+
+    def recording_timer(interval, function):
+        delays.append(interval)
+        return timer(0, function)
+
+    monkeypatch.setattr(email_queue.threading, "Timer", recording_timer)
+    fake_smtp.failures = 2
+    email_q = EmailQueue(workers=1, max_retries=3, backoff_base=0.5, backoff_max=10)
+
+    job = email_q.enqueue(CONFIG, "cliente@example.com", "Assunto", "Mensagem")
+
+    assert job.wait(5)
+    assert job.attempts == 3
+    assert delays == [0.5, 1.0]
+    # A conexão encerrada é descartada: cada tentativa abre uma nova
+    assert len(fake_smtp.connections) == 3
+    assert email_q.wait_until_idle(timeout=5)
+    stats = email_q.stats()
+    assert (stats["sent"], stats["retried"], stats["failed"], stats["pending"]) == (1, 2, 0, 0)
+
+
+def test_delivery_fails_after_max_retries(fake_smtp, monkeypatch):
+    timer = threading.Timer
+    monkeypatch.setattr(email_queue.threading, "Timer", lambda interval, function: timer(0, function))
+    fake_smtp.failures = 10
+    email_q = EmailQueue(workers=1, max_retries=2, backoff_base=0.01)
+
+    job = email_q.enqueue(CONFIG, "cliente@example.com", "Assunto", "Mensagem")
+
+    assert not job.wait(5)
+    assert job.done.is_set()
+    assert job.attempts == 3
+    assert isinstance(job.error, smtplib.SMTPServerDisconnected)
+    assert email_q.wait_until_idle(timeout=5)
+    assert email_q.stats()["failed"] == 1
+
+
+def test_throughput_only_counts_batches_inside_the_window(monkeypatch):
+    monkeypatch.setattr(email_queue, "RATE_WINDOW_SECONDS", 10.0)
+    email_q = EmailQueue(workers=0)
+    now = time.perf_counter()
+    # Um lote antigo (fora da janela) e dois recentes: 30 mensagens em 2 segundos
+    email_q._recent_batches.extend([
+        (now - 100.0, now - 99.0, 1000),
+        (now - 3.0, now - 2.0, 10),
+        (now - 2.0, now - 1.0, 20),
+    ])
+
+    stats = email_q.stats()
+
+    assert stats["messages_per_second"] == pytest.approx(15.0)
+    assert len(email_q._recent_batches) == 2
+
+
+def test_throughput_is_zero_without_recent_batches():
+    assert EmailQueue(workers=0).stats()["messages_per_second"] == 0.0
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from events import (PERIOD_EVENT_USER, compact_period_events, event_timestamp, insert_event, is_sorted,
+                    new_event, parse_event_date)
+
+
+def _period(day, start, expiry):
+    return new_event(f"Período atualizado automaticamente: início {start}, vencimento {expiry}",
+                     user=PERIOD_EVENT_USER, when=datetime(2024, 1, day, 0, 5))
+
+
+def test_parse_event_date_formats():
+    assert parse_event_date("05/01/24") == "2024-01-05T00:00:00"
+    assert parse_event_date("05/01/2024 13:30") == "2024-01-05T13:30:00"
+    assert parse_event_date("2024-01-05") == "2024-01-05T00:00:00"
+    assert parse_event_date("ontem") == ""
+
+
+def test_insert_event_keeps_chronological_order():
+    process = {}
+    insert_event(process, new_event("C", when=datetime(2024, 3, 1)))
+    insert_event(process, new_event("A", when=datetime(2024, 1, 1)))
+    insert_event(process, new_event("B", when=datetime(2024, 2, 1)))
+    # Eventos antigos, só com "date" (DD/MM/AA), ordenam pela data calculada
+    insert_event(process, {"id": "x", "date": "15/01/24", "description": "A2"})
+
+    assert [event["description"] for event in process["events"]] == ["A", "A2", "B", "C"]
+    assert is_sorted(process["events"])
+
+
+def test_insert_event_with_same_timestamp_keeps_insertion_order():
+    when = datetime(2024, 1, 1, 12)
+    process = {"events": []}
+    for description in ("primeiro", "segundo", "terceiro"):
+        insert_event(process, new_event(description, when=when))
+
+    assert [event["description"] for event in process["events"]] == ["primeiro", "segundo", "terceiro"]
+
+
+def test_compact_collapses_runs_of_period_events():
+    events = [
+        new_event("Processo criado", when=datetime(2024, 1, 1)),
+        _period(2, "02/01/2024", "09/01/2024"),
+        _period(9, "10/01/2024", "16/01/2024"),
+        _period(16, "17/01/2024", "23/01/2024"),
+        new_event("Documentos recebidos", when=datetime(2024, 1, 20)),
+        _period(23, "24/01/2024", "30/01/2024"),
+    ]
+    first_period_id = events[1]["id"]
+
+    assert compact_period_events(events) == 2
+
+    assert [bool(event.get("rollup")) for event in events] == [False, True, False, False]
+    assert [event["description"] for event in (events[0], events[2])] == ["Processo criado", "Documentos recebidos"]
+    summary = events[1]
+    assert summary["id"] == first_period_id
+    assert summary["rollup"] == {
+        "count": 3,
+        "from": "2024-01-02T00:05:00",
+        "from_date": "02/01/2024",
+        "period_start": "02/01/2024",
+        "period_expiry": "23/01/2024",
+    }
+    # O resumo fica na posição do último evento da sequência
+    assert event_timestamp(summary) == "2024-01-16T00:05:00"
+    # Sequência de um único evento fica como está
+    assert "rollup" not in events[3]
+
+
+def test_compact_again_extends_the_summary():
+    events = [_period(2, "02/01/2024", "09/01/2024"), _period(9, "10/01/2024", "16/01/2024")]
+    compact_period_events(events)
+    events.append(_period(16, "17/01/2024", "23/01/2024"))
+
+    assert compact_period_events(events) == 1
+    [summary] = events
+    assert (summary["rollup"]["count"], summary["rollup"]["period_start"], summary["rollup"]["period_expiry"]) == (
+        3, "02/01/2024", "23/01/2024")
+    # Nada a compactar: a lista não muda
+    assert compact_period_events(events) == 0
+
+
+def test_period_events_from_other_users_are_not_compacted():
+    events = [_period(2, "02/01/2024", "09/01/2024"), _period(9, "10/01/2024", "16/01/2024")]
+    events[1]["user"] = "Admin"
+
+    assert compact_period_events(events) == 0
@@ -0,0 +1,48 @@
+import pytest
+
+import data
+import json_codec
+
+
+@pytest.fixture
+def data_dir(workdir, monkeypatch):
+    """DATA_DIR em ./data, com o data.json antigo no diretório atual"""
+    directory = workdir / "data"
+    monkeypatch.setattr(data, "DATA_DIR", str(directory))
+    monkeypatch.setattr(data, "DATA_FILE", str(directory / "data.json"))
+    monkeypatch.setattr(data, "ARCHIVE_FILE", str(directory / "data_archived.json.gz"))
+    monkeypatch.setattr(data, "LEGACY_DATA_FILE", "data.json")
+    json_codec.dump_file("data.json", {"_revision": 3, "processes": [{"id": "P1", "_rev": 2, "events": []}]})
+    return directory
+
+
+def test_legacy_file_is_copied_on_first_load(data_dir):
+    loaded = data.load_data()
+
+    assert [process["id"] for process in loaded["processes"]] == ["P1"]
+    assert json_codec.load_file(data.DATA_FILE)["processes"][0]["id"] == "P1"
+    # O arquivo antigo fica como estava
+    assert json_codec.load_file("data.json")["_revision"] == 3
+
+
+def test_legacy_archive_is_copied_with_the_data_file(data_dir):
+    json_codec.dump_file("data_archived.json.gz", {"processes": [{"id": "A1", "events": []}]})
+
+    assert data.migrate_legacy_data_file()
+
+    assert json_codec.load_file(data.ARCHIVE_FILE)["processes"][0]["id"] == "A1"
+
+
+def test_existing_data_file_is_not_replaced(data_dir):
+    data_dir.mkdir()
+    json_codec.dump_file(data.DATA_FILE, {"_revision": 9, "processes": []})
+
+    assert not data.migrate_legacy_data_file()
+    assert json_codec.load_file(data.DATA_FILE)["_revision"] == 9
+
+
+def test_nothing_to_migrate_without_legacy_file(data_dir, monkeypatch):
+    monkeypatch.setattr(data, "LEGACY_DATA_FILE", "ausente.json")
+
+    assert not data.migrate_legacy_data_file()
+    assert not (data_dir / "data.json").exists()
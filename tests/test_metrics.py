@@ -0,0 +1,88 @@
+import json
+import math
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import metrics
+from metrics import REGISTRY, parse_exposition, record_rerun
+
+
+def _samples(families, name):
+    return families[name]["samples"]
+
+
+def test_rerun_is_exposed_as_counter_and_histogram():
+    before = metrics.RERUNS.get(page="test_page")
+    record_rerun("test_page", time.perf_counter() - 0.2)
+
+    families = parse_exposition(REGISTRY.render())
+
+    assert families["app_reruns_total"]["type"] == "counter"
+    assert ("app_reruns_total", {"page": "test_page"}, before + 1) in _samples(families, "app_reruns_total")
+
+    histogram = families["app_rerun_duration_seconds"]
+    assert histogram["type"] == "histogram"
+    buckets = {float(labels["le"].replace("+Inf", "inf")): value
+               for name, labels, value in histogram["samples"]
+               if name == "app_rerun_duration_seconds_bucket" and labels["page"] == "test_page"}
+    assert sorted(buckets) == list(metrics.DEFAULT_BUCKETS) + [math.inf]
+    # 0,2 s: fora dos buckets até 0,1 e dentro de todos a partir de 0,25
+    assert buckets[0.1] == 0
+    assert buckets[0.25] == buckets[math.inf] == before + 1
+    count = [value for name, labels, value in histogram["samples"]
+             if name == "app_rerun_duration_seconds_count" and labels == {"page": "test_page"}]
+    assert count == [before + 1]
+
+
+def test_share_token_validation_is_counted_by_result(workdir):
+    from components import share
+
+    expiry = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    with open(share.SHARE_FILE, "w") as f:
+        json.dump({"links": [{"token": "abc", "process_id": "P1", "expiry_date": expiry, "is_active": True}]}, f)
+    valid = metrics.TOKEN_VALIDATIONS.get(result="valid")
+    invalid = metrics.TOKEN_VALIDATIONS.get(result="invalid")
+
+    assert share.validate_share_token("abc") == "P1"
+    assert share.validate_share_token("outro") is None
+
+    samples = _samples(parse_exposition(REGISTRY.render()), "app_share_token_validations_total")
+    assert ("app_share_token_validations_total", {"result": "valid"}, valid + 1) in samples
+    assert ("app_share_token_validations_total", {"result": "invalid"}, invalid + 1) in samples
+
+
+def test_labels_are_escaped():
+    counter = metrics.Counter("test_escaped_total", "Teste", ["page"])
+    counter.inc(page='a"b\\c')
+    text = "\n".join(counter.header() + counter.samples()) + "\n"
+
+    # Aspas e barras no rótulo não quebram a linha da amostra
+    [(name, labels, value)] = parse_exposition(text)["test_escaped_total"]["samples"]
+    assert (name, list(labels), value) == ("test_escaped_total", ["page"], 1.0)
+
+
+def test_parse_exposition_rejects_inconsistent_histogram():
+    text = (
+        "# TYPE h histogram\n"
+        'h_bucket{le="1"} 2\n'
+        'h_bucket{le="+Inf"} 1\n'
+        "h_sum 1\n"
+        "h_count 1\n"
+    )
+    with pytest.raises(ValueError):
+        parse_exposition(text)
+
+
+def test_active_sessions_is_omitted_without_the_session_manager(monkeypatch):
+    from streamlit.runtime import Runtime
+
+    # Runtime sem o SessionManager interno (ex.: outra versão do Streamlit)
+    monkeypatch.setattr(Runtime, "exists", staticmethod(lambda: True))
+    monkeypatch.setattr(Runtime, "instance", staticmethod(lambda: object()))
+
+    families = parse_exposition(REGISTRY.render())
+
+    assert metrics.ACTIVE_SESSIONS.get() is None
+    assert not _samples(families, "app_active_sessions")
@@ -0,0 +1,72 @@
+from migrations import SCHEMA_VERSION_KEY, current_schema_version, migrate, needs_migration
+
+
+def _legacy_data():
+    """Arquivo anterior ao versionamento (sem schema_version)"""
+    return {
+        "processes": [
+            {
+                "id": "P1",
+                "type": "FCL 1 X 40",
+                "events": [
+                    {"date": "10/12/23", "description": "Chegada", "user": "Admin"},
+                    {"id": "e1", "date": "05/01/2024", "description": "Período atualizado automaticamente: "
+                     "início 05/01/2024, vencimento 11/01/2024", "user": "Sistema"},
+                    {"id": "e2", "date": "12/01/2024", "description": "Período atualizado automaticamente: "
+                     "início 12/01/2024, vencimento 18/01/2024", "user": "Sistema"},
+                    {"id": "e0", "date": "01/12/2023", "description": "Processo criado", "user": "Admin"},
+                ],
+            },
+            {"id": "P2", "type": "exportacao", "archived": True},
+        ]
+    }
+
+
+def test_migrates_legacy_file_to_current_version():
+    data = _legacy_data()
+    assert needs_migration(data)
+
+    applied = migrate(data)
+
+    assert [version for version, _ in applied] == [1, 2, 3, 4, 5]
+    assert data[SCHEMA_VERSION_KEY] == current_schema_version() == 5
+    assert not needs_migration(data)
+
+    p1, p2 = data["processes"]
+    # v2 e v3: tipo padrão, tipo de carga antigo movido para container_type
+    assert (p1["type"], p1["container_type"], p1["archived"]) == ("importacao", "FCL 1 X 40", False)
+    assert (p2["type"], p2["archived"]) == ("exportacao", True)
+    events = p1["events"]
+    # v1: todos os eventos com ID
+    assert all(event.get("id") for event in events)
+    # v4: timestamp calculado a partir de "date" e ordem cronológica
+    assert [event["description"] for event in events][:2] == ["Processo criado", "Chegada"]
+    assert events[1]["timestamp"] == "2023-12-10T00:00:00"
+    # v5: as duas viradas de período seguidas viram um resumo
+    assert len(events) == 3
+    assert events[2]["rollup"]["count"] == 2
+    assert events[2]["id"] == "e1"
+
+
+def test_migration_is_idempotent_and_skips_current_version():
+    data = _legacy_data()
+    migrate(data)
+    migrated = repr(data)
+
+    assert migrate(data) == []
+    # Arquivo regravado sem versão por um script externo: migrar de novo não muda nada
+    del data[SCHEMA_VERSION_KEY]
+    migrate(data)
+    assert repr(data) == migrated
+
+
+def test_partial_migration_applies_only_newer_versions():
+    data = {SCHEMA_VERSION_KEY: 3, "processes": [{"id": "P1", "type": "LCL", "events": [
+        {"id": "a", "date": "02/01/2024", "description": "B"},
+        {"id": "b", "date": "01/01/2024", "description": "A"},
+    ]}]}
+
+    assert [version for version, _ in migrate(data)] == [4, 5]
+    # v3 não roda de novo
+    assert data["processes"][0]["type"] == "LCL"
+    assert [event["description"] for event in data["processes"][0]["events"]] == ["A", "B"]
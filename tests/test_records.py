@@ -0,0 +1,82 @@
+import json
+import pickle
+
+import pytest
+
+import json_codec
+from records import MISSING, Event, Process, compact_processes, to_json
+
+
+def _process():
+    return {
+        "id": "P1",
+        "status": "Em andamento",
+        "eta": "10/01/2024",
+        "campo_novo": {"a": 1},
+        "events": [{"id": "e1", "date": "01/01/2024", "description": "Criado", "user": "Admin", "extra": True}],
+    }
+
+
+def test_round_trip_is_lossless():
+    data = _process()
+    record = Process.from_dict(data)
+
+    assert isinstance(record.events[0], Event)
+    assert record.to_dict() == data
+    assert json.loads(json.dumps(record, default=to_json)) == data
+    assert json_codec.loads(json_codec.dumps(record)) == data
+
+
+def test_behaves_like_a_dict():
+    record = Process.from_dict(_process())
+
+    assert record["status"] == "Em andamento"
+    assert record.get("po", "") == ""
+    assert "po" not in record and "eta" in record and "campo_novo" in record
+    assert list(record) == ["id", "status", "eta", "events", "campo_novo"]
+    assert len(record) == 5
+    with pytest.raises(KeyError):
+        record["po"]
+
+    record["po"] = "PO-1"
+    record["outro"] = 2
+    del record["eta"]
+    del record["campo_novo"]
+    assert record.get("eta") is None and record.eta is MISSING
+    assert dict(record.items()) == {"id": "P1", "status": "Em andamento", "po": "PO-1",
+                                    "events": record["events"], "outro": 2}
+    with pytest.raises(KeyError):
+        del record["eta"]
+    with pytest.raises(KeyError):
+        del record["inexistente"]
+
+
+def test_events_assigned_as_dicts_become_records():
+    record = Process.from_dict({"id": "P1"})
+    record["events"] = [{"id": "e1", "description": "x"}]
+
+    assert isinstance(record["events"][0], Event)
+
+
+def test_interned_values_are_shared():
+    status = "".join(["Em ", "andamento"])
+    first, second = compact_processes([{"id": "1", "status": "Em andamento"}, {"id": "2", "status": status}])
+
+    assert first["status"] is second["status"]
+
+
+def test_copy_is_a_plain_dict():
+    record = Process.from_dict(_process())
+    copy = record.copy()
+
+    assert type(copy) is dict
+    copy["status"] = "Concluído"
+    assert record["status"] == "Em andamento"
+
+
+def test_missing_survives_pickle():
+    record = Process.from_dict({"id": "P1"})
+    restored = pickle.loads(pickle.dumps(record))
+
+    assert restored.status is MISSING
+    assert restored.to_dict() == {"id": "P1"}
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import json_codec
+import scheduler
+from events import new_event
+
+
+def _br(day):
+    return day.strftime("%d/%m/%Y")
+
+
+@pytest.fixture
+def data_file(workdir):
+    """data.json relativo (DATA_DIR padrão) com um processo vencido e um em dia"""
+    today = date.today()
+    path = workdir / "data.json"
+    json_codec.dump_file(str(path), {
+        "_revision": 1,
+        "config": {"storage_days_per_period": 5},
+        "processes": [
+            {"id": "P1", "_rev": 1, "port_entry_date": _br(today - timedelta(days=12)),
+             "current_period_start": _br(today - timedelta(days=12)),
+             "current_period_expiry": _br(today - timedelta(days=8)), "storage_days": 11,
+             "events": [new_event("Processo criado", when=datetime.now() - timedelta(days=12))]},
+            {"id": "P2", "_rev": 1, "port_entry_date": _br(today - timedelta(days=2)),
+             "current_period_start": _br(today - timedelta(days=2)),
+             "current_period_expiry": _br(today + timedelta(days=2)), "storage_days": 1,
+             "events": []},
+        ],
+    })
+    return path
+
+
+def _processes(path):
+    return {process["id"]: process for process in json_codec.load_file(str(path))["processes"]}
+
+
+def test_roll_over_periods_advances_expired_periods(data_file):
+    data = json_codec.load_file(str(data_file))
+    today = date.today()
+
+    assert scheduler.roll_over_periods(data, today) == ["P1"]
+
+    rolled, current = data["processes"]
+    # Dois períodos de 5 dias vencidos: o atual começa 2 dias atrás
+    assert rolled["current_period_start"] == _br(today - timedelta(days=2))
+    assert rolled["current_period_expiry"] == _br(today + timedelta(days=2))
+    assert rolled["events"][-1]["user"] == "Sistema"
+    assert data["last_rollover"] == today.isoformat()
+    assert current["current_period_expiry"] == _br(today + timedelta(days=2))
+
+
+def test_roll_over_periods_bumps_rev_only_on_rollover(data_file):
+    data = json_codec.load_file(str(data_file))
+
+    scheduler.roll_over_periods(data)
+
+    rolled, current = data["processes"]
+    assert rolled["_rev"] == 2
+    # storage_days é derivado: recalculado, mas sem nova revisão
+    assert current["storage_days"] == 2
+    assert current["_rev"] == 1
+
+
+def test_run_daily_maintenance_writes_the_rollover(data_file):
+    assert scheduler.run_daily_maintenance() == ["P1"]
+
+    disk = json_codec.load_file(str(data_file))
+    assert disk["last_rollover"] == date.today().isoformat()
+    assert disk["_revision"] == 2
+    processes = _processes(data_file)
+    assert processes["P1"]["_rev"] == 2
+    assert processes["P2"]["storage_days"] == 2
+
+
+def test_run_daily_maintenance_skips_when_already_run_today(data_file):
+    scheduler.run_daily_maintenance()
+    before = data_file.read_bytes()
+
+    assert scheduler.run_daily_maintenance() is None
+    assert data_file.read_bytes() == before
+    # --forcar roda de novo (sem períodos a virar)
+    assert scheduler.run_daily_maintenance(force=True) == []
+
+
+def test_run_daily_maintenance_without_data_file(workdir):
+    assert scheduler.run_daily_maintenance() is None
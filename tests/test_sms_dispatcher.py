@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from sms_dispatcher import FakeSmsTransport, RateLimiter, SmsDispatcher, SmsTransport
+
+
+def test_transport_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SmsTransport()
+
+
+def test_rate_limiter_allows_a_burst_then_paces():
+    limiter = RateLimiter(rate=20, burst=3)
+
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    burst_elapsed = time.monotonic() - started
+    for _ in range(4):
+        limiter.acquire()
+    elapsed = time.monotonic() - started
+
+    assert burst_elapsed < 0.05
+    # As 4 fichas além da rajada saem a 20/s
+    assert elapsed == pytest.approx(4 / 20, abs=0.08)
+    assert elapsed >= 0.15
+
+
+def test_rate_limiter_disabled_with_zero_rate():
+    limiter = RateLimiter(rate=0)
+
+    started = time.monotonic()
+    for _ in range(100):
+        limiter.acquire()
+
+    assert time.monotonic() - started < 0.05
+
+
+def test_batch_is_sent_concurrently_within_the_rate_limit():
+    transport = FakeSmsTransport(latency=0.05)
+    dispatcher = SmsDispatcher(transport, max_workers=4, rate_per_second=50, burst=4)
+    messages = [(f"+55119000000{i:02d}", f"Mensagem {i}") for i in range(12)]
+
+    started = time.monotonic()
+    futures = dispatcher.send_batch(messages)
+    assert dispatcher.wait_all(futures, timeout=5) == (12, 0)
+    elapsed = time.monotonic() - started
+    dispatcher.shutdown()
+
+    assert sorted(to_phone for _, to_phone, _ in transport.sent) == sorted(to_phone for to_phone, _ in messages)
+    assert all(future.result().startswith("fake-") for future in futures)
+    # Em sequência seriam 12 x 50 ms; com 4 envios simultâneos, bem menos
+    assert elapsed < 0.45
+    # Depois da rajada, o limite de 50/s espaça os envios
+    timestamps = sorted(sent_at for sent_at, _, _ in transport.sent)
+    assert timestamps[-1] - timestamps[0] >= (12 - 4) / 50 - 0.02
+    assert dispatcher.stats() == {"sent": 12, "failed": 0, "retried": 0, "pending": 0}
+
+
+def test_transient_failure_is_retried():
+    transport = FakeSmsTransport(transient_failures=2)
+    dispatcher = SmsDispatcher(transport, max_workers=1, rate_per_second=0, max_retries=2, backoff_base=0.01)
+
+    future = dispatcher.send("+5511900000000", "Mensagem")
+
+    assert future.result(timeout=5) == "fake-1"
+    assert transport.attempts == 3
+    assert dispatcher.stats() == {"sent": 1, "failed": 0, "retried": 2, "pending": 0}
+    dispatcher.shutdown()
+
+
+def test_failure_is_reported_after_max_retries():
+    transport = FakeSmsTransport(fail_numbers={"+5511900000001"})
+    dispatcher = SmsDispatcher(transport, max_workers=2, rate_per_second=0, max_retries=1, backoff_base=0.01)
+
+    futures = dispatcher.send_batch([("+5511900000000", "Mensagem"), ("+5511900000001", "Mensagem")])
+
+    assert dispatcher.wait_all(futures, timeout=5) == (1, 1)
+    assert isinstance(futures[1].exception(), RuntimeError)
+    assert transport.attempts == 3
+    assert dispatcher.stats() == {"sent": 1, "failed": 1, "retried": 1, "pending": 0}
+    dispatcher.shutdown()
@@ -0,0 +1,183 @@
+import copy
+import os
+from datetime import datetime
+
+import pytest
+
+import data
+import json_codec
+from data import ConflictError, snapshot_process, write_changes
+from events import new_event
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    monkeypatch.setattr(data, "DATA_FILE", path)
+    json_codec.dump_file(path, {
+        "_revision": 1,
+        "processes": [
+            {"id": "P1", "_rev": 1, "status": "Em andamento", "invoice": "INV-1", "ref": "R1", "events": [
+                new_event("Processo criado", when=datetime(2024, 1, 10, 9, 0)),
+            ]},
+            {"id": "P2", "_rev": 1, "status": "Pendente", "events": []},
+        ],
+    })
+    return path
+
+
+def _session(path):
+    """Dados como uma sessão os leu, e as bases para mesclar"""
+    loaded = json_codec.load_file(path)
+    return loaded, {process["id"]: snapshot_process(process) for process in loaded["processes"]}
+
+
+def _process(session_data, process_id):
+    return next(process for process in session_data["processes"] if process["id"] == process_id)
+
+
+def _disk_process(path, process_id):
+    return _process(json_codec.load_file(path), process_id)
+
+
+def test_different_fields_are_merged(data_file):
+    first, first_bases = _session(data_file)
+    second, second_bases = _session(data_file)
+
+    _process(first, "P1")["status"] = "Concluído"
+    assert write_changes(first, changed=["P1"], bases={"P1": first_bases["P1"]})
+
+    _process(second, "P1")["invoice"] = "INV-2"
+    # A segunda sessão estava atrasada em relação ao arquivo: False, mas grava mesclado
+    assert not write_changes(second, changed=["P1"], bases={"P1": second_bases["P1"]})
+
+    disk = _disk_process(data_file, "P1")
+    assert (disk["status"], disk["invoice"], disk["_rev"]) == ("Concluído", "INV-2", 3)
+    # O registro da sessão passa a ser o mesclado
+    assert _process(second, "P1")["status"] == "Concluído"
+
+
+def test_same_field_is_a_conflict(data_file):
+    first, first_bases = _session(data_file)
+    second, second_bases = _session(data_file)
+
+    _process(first, "P1")["status"] = "Concluído"
+    write_changes(first, changed=["P1"], bases={"P1": first_bases["P1"]})
+
+    _process(second, "P1")["status"] = "Cancelado"
+    _process(second, "P1")["invoice"] = "INV-2"
+    with pytest.raises(ConflictError) as error:
+        write_changes(second, changed=["P1"], bases={"P1": second_bases["P1"]})
+
+    assert error.value.fields == {"P1": ["status"]}
+    disk = _disk_process(data_file, "P1")
+    assert (disk["status"], disk["invoice"], disk["_rev"]) == ("Concluído", "INV-1", 2)
+
+
+def test_same_value_on_both_sides_is_not_a_conflict(data_file):
+    first, first_bases = _session(data_file)
+    second, second_bases = _session(data_file)
+
+    _process(first, "P1")["status"] = "Concluído"
+    write_changes(first, changed=["P1"], bases={"P1": first_bases["P1"]})
+    _process(second, "P1")["status"] = "Concluído"
+    write_changes(second, changed=["P1"], bases={"P1": second_bases["P1"]})
+
+    assert _disk_process(data_file, "P1")["status"] == "Concluído"
+
+
+def test_stale_write_without_base_is_a_conflict(data_file):
+    first, first_bases = _session(data_file)
+    second, _ = _session(data_file)
+
+    _process(first, "P1")["status"] = "Concluído"
+    write_changes(first, changed=["P1"], bases={"P1": first_bases["P1"]})
+    _process(second, "P1")["invoice"] = "INV-2"
+
+    with pytest.raises(ConflictError) as error:
+        write_changes(second, changed=["P1"])
+    assert error.value.fields == {"P1": []}
+
+
+def test_other_processes_written_by_others_are_preserved(data_file):
+    first, first_bases = _session(data_file)
+    second, second_bases = _session(data_file)
+
+    _process(first, "P1")["status"] = "Concluído"
+    write_changes(first, changed=["P1"], bases={"P1": first_bases["P1"]})
+    _process(second, "P2")["status"] = "Atrasado"
+    write_changes(second, changed=["P2"], bases={"P2": second_bases["P2"]})
+
+    assert _disk_process(data_file, "P1")["status"] == "Concluído"
+    assert _disk_process(data_file, "P2")["status"] == "Atrasado"
+    assert json_codec.load_file(data_file)["_revision"] == 3
+
+
+def test_concurrent_event_adds_are_merged_in_order(data_file):
+    first, first_bases = _session(data_file)
+    second, second_bases = _session(data_file)
+
+    later = new_event("Documentos recebidos", user="Ana", when=datetime(2024, 3, 1, 14, 0))
+    earlier = new_event("Navio atracou", user="Bruno", when=datetime(2024, 2, 1, 8, 0))
+    _process(first, "P1")["events"].append(later)
+    write_changes(first, changed=["P1"], bases={"P1": first_bases["P1"]})
+    _process(second, "P1")["events"].append(earlier)
+    write_changes(second, changed=["P1"], bases={"P1": second_bases["P1"]})
+
+    descriptions = [event["description"] for event in _disk_process(data_file, "P1")["events"]]
+    assert descriptions == ["Processo criado", "Navio atracou", "Documentos recebidos"]
+
+
+def test_event_edited_on_both_sides_is_a_conflict(data_file):
+    first, first_bases = _session(data_file)
+    second, second_bases = _session(data_file)
+
+    _process(first, "P1")["events"][0]["description"] = "Processo aberto"
+    write_changes(first, changed=["P1"], bases={"P1": first_bases["P1"]})
+    _process(second, "P1")["events"][0]["description"] = "Processo iniciado"
+
+    with pytest.raises(ConflictError) as error:
+        write_changes(second, changed=["P1"], bases={"P1": second_bases["P1"]})
+    assert error.value.fields == {"P1": ["events"]}
+
+
+def test_merge_events_keeps_local_deletion_of_unchanged_event():
+    base = [new_event("A", when=datetime(2024, 1, 1)), new_event("B", when=datetime(2024, 1, 2))]
+    local = [copy.deepcopy(base[0])]
+    disk = copy.deepcopy(base) + [new_event("C", when=datetime(2024, 1, 3))]
+
+    merged, conflict = data._merge_events(base, local, disk)
+
+    assert not conflict
+    assert [event["description"] for event in merged] == ["A", "C"]
+
+
+def test_merge_events_conflicts_on_delete_of_edited_event():
+    base = [new_event("A", when=datetime(2024, 1, 1))]
+    disk = copy.deepcopy(base)
+    disk[0]["description"] = "A editado"
+
+    merged, conflict = data._merge_events(base, [], disk)
+
+    assert conflict
+    assert [event["description"] for event in merged] == ["A editado"]
+
+
+def test_lock_file_lives_next_to_the_data_file(data_file):
+    loaded, bases = _session(data_file)
+    _process(loaded, "P2")["status"] = "Atrasado"
+    write_changes(loaded, changed=["P2"], bases={"P2": bases["P2"]})
+
+    assert os.path.exists(data_file + ".lock")
+
+
+def test_merge_events_does_not_compact_untouched_period_events():
+    periods = [new_event(f"Período atualizado automaticamente: início 0{day}/01/2024, vencimento 0{day + 1}/01/2024",
+                         user="Sistema", when=datetime(2024, 1, day)) for day in (1, 2, 3)]
+    base = copy.deepcopy(periods)
+    local = copy.deepcopy(periods) + [new_event("Documentos recebidos", when=datetime(2024, 1, 5))]
+
+    merged, conflict = data._merge_events(base, local, copy.deepcopy(periods))
+
+    assert not conflict
+    assert [event["description"] for event in merged] == [event["description"] for event in local]
@@ -2,22 +2,35 @@ import pandas as pd
 import streamlit as st
 from datetime import datetime
 import io
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
-from twilio.rest import Client
+from events import compact_period_events, insert_event, new_event
+from instrumentation import timed, payload_size
+from metrics import EXPORT_DURATION
 
 def format_date(date_str):
     """Format date string to DD/MM/YYYY"""
     if pd.isna(date_str) or date_str == "":
         return ""
+    # Colunas datetime64 do DataFrame de processos já chegam como Timestamp
+    if isinstance(date_str, datetime):
+        return date_str.strftime("%d/%m/%Y")
     try:
         date_obj = pd.to_datetime(date_str, dayfirst=True)
         return date_obj.strftime("%d/%m/%Y")
     except:
         return date_str
 
+def parse_date_dayfirst(date_str):
+    """Converte uma data DD/MM/AAAA (ou outro formato dia-primeiro) para Timestamp
+
+    O formato DD/MM/AAAA, usado em todos os registros atuais, é lido com strptime,
+    bem mais rápido que pd.to_datetime para valores isolados.
+    """
+    try:
+        return pd.Timestamp(datetime.strptime(date_str, "%d/%m/%Y"))
+    except (TypeError, ValueError):
+        return pd.to_datetime(date_str, dayfirst=True)
+
 def calculate_free_time_expiry(eta_date, free_time_days):
     """Calculate free time expiry date based on ETA and free time days"""
     if pd.isna(eta_date) or eta_date == "" or not free_time_days:
@@ -47,20 +60,21 @@ def calculate_storage_days(entry_date):
     if pd.isna(entry_date) or entry_date == "":
         return 0  # Retorna número inteiro
     try:
-        entry_obj = pd.to_datetime(entry_date, dayfirst=True)
+        entry_obj = parse_date_dayfirst(entry_date)
         today = pd.to_datetime(datetime.now().date())
         days = (today - entry_obj).days
         return max(0, days)  # Retorna número inteiro, não string
     except:
         return 0  # Retorna número inteiro
 
-def check_period_expiry(process):
+def check_period_expiry(process, days_per_period=None):
     """
     Verifica se o período atual de armazenagem expirou e precisa ser atualizado.
     Lida com múltiplos períodos expirados, atualizando até a data mais recente.
     
     Args:
         process: Dicionário com informações do processo
+        days_per_period: Dias por período; se None, usa a configuração da sessão (padrão 30)
         
     Returns:
         tuple: (precisa_atualizar, novo_inicio, novo_vencimento)
@@ -74,19 +88,21 @@ def check_period_expiry(process):
     
     try:
         # Converter para objetos datetime
-        expiry_date = pd.to_datetime(period_expiry, dayfirst=True)
+        expiry_date = parse_date_dayfirst(period_expiry)
         today = pd.to_datetime(datetime.now().date())
         
         # Determinar os dias por período (padrão: 30 dias)
-        days_per_period = 30  # Valor padrão
-        
-        try:
-            # Tentar obter o valor configurado
-            from streamlit import session_state
-            if "data" in session_state and "config" in session_state.data:
-                days_per_period = session_state.data["config"].get("storage_days_per_period", 30)
-        except:
-            pass
+        if days_per_period is None:
+            days_per_period = 30  # Valor padrão
+            
+            try:
+                # Tentar obter o valor configurado
+                from streamlit import session_state
+                if "data" in session_state and "config" in session_state.data:
+                    days_per_period = session_state.data["config"].get("storage_days_per_period", 30)
+            except:
+                pass
+        days_per_period = int(days_per_period)
         
         # Verificar se a data de vencimento já passou
         if expiry_date < today:
@@ -96,7 +112,7 @@ def check_period_expiry(process):
             # Número máximo de períodos a avançar para evitar loop infinito
             max_periods = 24  # Limite para 2 anos
             current_expiry = expiry_date
-            current_start = pd.to_datetime(period_start, dayfirst=True) if period_start else None
+            current_start = parse_date_dayfirst(period_start) if period_start else None
             
             # Avançar períodos até chegar à data atual
             for _ in range(max_periods):
@@ -156,6 +172,45 @@ def update_period_dates(process):
     
     return False
 
+def apply_period_rollover(process, days_per_period=None):
+    """
+    Avança o período de armazenagem vencido do processo, registrando o evento automático.
+    Eventos automáticos seguidos (sem eventos manuais entre eles) são compactados em
+    um único evento de resumo (ver events.compact_period_events).
+    
+    Args:
+        process: Dicionário (ou records.Process) com informações do processo
+        days_per_period: Dias por período; se None, usa a configuração da sessão
+        
+    Returns:
+        bool: True se o período foi atualizado
+    """
+    needs_update, new_start, new_expiry = check_period_expiry(process, days_per_period)
+    if not (needs_update and new_start and new_expiry):
+        return False
+    
+    process["current_period_start"] = new_start
+    process["current_period_expiry"] = new_expiry
+    
+    now = datetime.now().strftime("%d/%m/%Y")
+    insert_event(process, new_event(
+        f"Período atualizado automaticamente: início {new_start}, vencimento {new_expiry}",
+        "Sistema"
+    ))
+    compact_period_events(process["events"])
+    process["last_update"] = now
+    return True
+
+def refresh_storage_days(process):
+    """Recalcula os dias armazenados (inteiro) a partir da data de entrada no porto/recinto"""
+    if process.get("port_entry_date"):
+        process["storage_days"] = calculate_storage_days(process["port_entry_date"])
+    elif "storage_days" in process:
+        try:
+            process["storage_days"] = int(process["storage_days"])
+        except (ValueError, TypeError):
+            process["storage_days"] = 0
+
 def get_status_color(status):
     """Get color for status indicator"""
     status_colors = {
@@ -178,12 +233,14 @@ def get_status_color(status):
     }
     return status_colors.get(status, "orange")
 
+@timed("export_to_excel", bytes_written=payload_size)
+@EXPORT_DURATION.time(format="excel")
 def export_to_excel(df):
     """Export dataframe to Excel"""
     output = io.BytesIO()
     
     # This avoids the LSP error by explicitly specifying the engine
-    writer = pd.ExcelWriter(output, engine='xlsxwriter')
+    writer = pd.ExcelWriter(output, engine='xlsxwriter', date_format='dd/mm/yyyy', datetime_format='dd/mm/yyyy')
     
     df.to_excel(writer, index=False, sheet_name='Processos')
     
@@ -211,9 +268,11 @@ def export_to_excel(df):
     writer.close()
     return output.getvalue()
 
+@timed("export_to_csv", bytes_written=payload_size)
+@EXPORT_DURATION.time(format="csv")
 def export_to_csv(df):
     """Export dataframe to CSV"""
-    return df.to_csv(index=False).encode('utf-8')
+    return df.to_csv(index=False, date_format='%d/%m/%Y').encode('utf-8')
 
 def get_status_from_dates(date_str, expected_date_str):
     """Determine status based on dates"""
@@ -234,66 +293,127 @@ def get_status_from_dates(date_str, expected_date_str):
     except:
         return "Pendente"
 
-def send_email(to_email, subject, message):
-    """Send an email using SMTP"""
+def get_smtp_config():
+    """Build the SMTP configuration from session state or environment variables"""
+    from email_queue import SMTPConfig
+    
+    smtp_server = st.session_state.get('smtp_server', os.environ.get('SMTP_SERVER', ''))
+    smtp_port = int(st.session_state.get('smtp_port', os.environ.get('SMTP_PORT', 587)))
+    smtp_username = st.session_state.get('smtp_username', os.environ.get('SMTP_USERNAME', ''))
+    smtp_password = st.session_state.get('smtp_password', os.environ.get('SMTP_PASSWORD', ''))
+    from_email = st.session_state.get('from_email', os.environ.get('FROM_EMAIL', smtp_username))
+    use_tls = str(st.session_state.get('smtp_use_tls', os.environ.get('SMTP_USE_TLS', 'true'))).lower() not in ('0', 'false', 'no')
+    
+    return SMTPConfig(
+        server=smtp_server,
+        port=smtp_port,
+        username=smtp_username,
+        password=smtp_password,
+        from_email=from_email,
+        use_tls=use_tls
+    )
+
+def send_email(to_email, subject, message, wait=False, timeout=60):
+    """Send an email using SMTP
+    
+    The message is handed to the background delivery queue (email_queue), which
+    reuses authenticated SMTP connections and retries with backoff, so the
+    Streamlit script thread does not block on the server.
+    
+    Args:
+        wait: If True, block until the message is delivered (or definitively fails)
+        timeout: Maximum seconds to wait when wait=True
+    
+    Returns:
+        bool: With wait=False, True only means the message was queued (delivery
+        failures are logged by email_queue); with wait=True, True means delivered
+    """
     # Note: For this to work, you need to set SMTP configuration
     # For Gmail, you might need an app-specific password
     try:
         # Try to get configurations from session state or environment variables
-        smtp_server = st.session_state.get('smtp_server', os.environ.get('SMTP_SERVER', ''))
-        smtp_port = int(st.session_state.get('smtp_port', os.environ.get('SMTP_PORT', 587)))
-        smtp_username = st.session_state.get('smtp_username', os.environ.get('SMTP_USERNAME', ''))
-        smtp_password = st.session_state.get('smtp_password', os.environ.get('SMTP_PASSWORD', ''))
-        from_email = st.session_state.get('from_email', os.environ.get('FROM_EMAIL', smtp_username))
+        config = get_smtp_config()
         
         # If configuration is incomplete, show a configuration form
-        if not smtp_server or not smtp_username or not smtp_password:
+        if not config.server or not config.username or not config.password:
             st.warning("Configuração de email incompleta. Configure nas configurações.")
             return False
         
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = from_email
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(message, 'plain'))
-        
-        # Connect to server and send
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(smtp_username, smtp_password)
-        server.send_message(msg)
-        server.quit()
+        from email_queue import get_email_queue
+        job = get_email_queue().enqueue(config, to_email, subject, message)
         
+        if wait:
+            return job.wait(timeout)
         return True
     except Exception as e:
         st.error(f"Erro ao enviar email: {e}")
         return False
 
-def send_sms(to_phone, message):
-    """Send SMS via Twilio"""
+def send_bulk_email(recipients, subject, message):
+    """Queue the same email for several recipients. Returns the number of queued messages."""
     try:
-        # Get Twilio credentials
-        account_sid = os.environ.get('TWILIO_ACCOUNT_SID')
-        auth_token = os.environ.get('TWILIO_AUTH_TOKEN')
-        from_phone = os.environ.get('TWILIO_PHONE_NUMBER')
+        config = get_smtp_config()
         
-        # Check if credentials are available
-        if not account_sid or not auth_token or not from_phone:
+        if not config.server or not config.username or not config.password:
+            st.warning("Configuração de email incompleta. Configure nas configurações.")
+            return 0
+        
+        from email_queue import get_email_queue
+        return len(get_email_queue().enqueue_many(config, recipients, subject, message))
+    except Exception as e:
+        st.error(f"Erro ao enviar emails: {e}")
+        return 0
+
+def get_sms_dispatcher():
+    """Return the shared SMS dispatcher, or None if Twilio is not configured
+
+    The fake transport (SMS_TRANSPORT=fake) needs no Twilio credentials.
+    """
+    from sms_dispatcher import get_sms_dispatcher as get_shared_dispatcher, uses_fake_transport
+    
+    account_sid = os.environ.get('TWILIO_ACCOUNT_SID')
+    auth_token = os.environ.get('TWILIO_AUTH_TOKEN')
+    from_phone = os.environ.get('TWILIO_PHONE_NUMBER')
+    
+    # Check if credentials are available
+    if not uses_fake_transport() and (not account_sid or not auth_token or not from_phone):
+        return None
+    
+    return get_shared_dispatcher(account_sid, auth_token, from_phone)
+
+def send_sms(to_phone, message, wait=False, timeout=30):
+    """Send SMS via Twilio
+    
+    The message goes through the shared SMS dispatcher (one Twilio client,
+    concurrent sends within the configured rate limit).
+    
+    Args:
+        wait: If True, block until the message is sent and report the real result
+        timeout: Maximum seconds to wait when wait=True
+    """
+    try:
+        dispatcher = get_sms_dispatcher()
+        if dispatcher is None:
             st.warning("Configuração do Twilio incompleta. Configure nas configurações.")
             return False
         
-        # Initialize Twilio client
-        client = Client(account_sid, auth_token)
-        
-        # Send message
-        message = client.messages.create(
-            body=message,
-            from_=from_phone,
-            to=to_phone
-        )
-        
+        future = dispatcher.send(to_phone, message)
+        if wait:
+            future.result(timeout=timeout)
         return True
     except Exception as e:
         st.error(f"Erro ao enviar SMS: {e}")
         return False
+
+def send_sms_batch(to_phones, message):
+    """Send the same SMS to several numbers without blocking. Returns the number of scheduled messages."""
+    try:
+        dispatcher = get_sms_dispatcher()
+        if dispatcher is None:
+            st.warning("Configuração do Twilio incompleta. Configure nas configurações.")
+            return 0
+        
+        return len(dispatcher.send_batch([(phone, message) for phone in to_phones]))
+    except Exception as e:
+        st.error(f"Erro ao enviar SMS: {e}")
+        return 0